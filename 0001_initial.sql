@@ -10,6 +10,12 @@ DROP TABLE IF EXISTS fixtures;
 DROP TABLE IF EXISTS events;
 DROP TABLE IF EXISTS statistics;
 DROP TABLE IF EXISTS standings;
+DROP TABLE IF EXISTS team_form;
+DROP TABLE IF EXISTS head_to_head;
+DROP TABLE IF EXISTS odds_prices;
+DROP TABLE IF EXISTS odds_selection_analytics;
+DROP TABLE IF EXISTS odds_market_analytics;
+DROP TABLE IF EXISTS odds_events;
 DROP TABLE IF EXISTS user_favorites;
 DROP TABLE IF EXISTS payment_transactions;
 
@@ -202,6 +208,96 @@ CREATE TABLE IF NOT EXISTS standings (
   UNIQUE(league_id, team_id, season)
 );
 
+-- Team form table (materialized recent results, oldest first)
+CREATE TABLE IF NOT EXISTS team_form (
+  team_id INTEGER PRIMARY KEY,
+  form TEXT,
+  recent_fixture_ids TEXT,
+  win INTEGER NOT NULL DEFAULT 0,
+  draw INTEGER NOT NULL DEFAULT 0,
+  lose INTEGER NOT NULL DEFAULT 0,
+  last_fixture_date DATETIME,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (team_id) REFERENCES teams(team_id)
+);
+
+-- Head-to-head table (team_a_id is the lower team_id of the pair)
+CREATE TABLE IF NOT EXISTS head_to_head (
+  team_a_id INTEGER NOT NULL,
+  team_b_id INTEGER NOT NULL,
+  played INTEGER NOT NULL DEFAULT 0,
+  team_a_wins INTEGER NOT NULL DEFAULT 0,
+  team_b_wins INTEGER NOT NULL DEFAULT 0,
+  draws INTEGER NOT NULL DEFAULT 0,
+  team_a_goals INTEGER NOT NULL DEFAULT 0,
+  team_b_goals INTEGER NOT NULL DEFAULT 0,
+  recent_fixture_ids TEXT,
+  last_fixture_date DATETIME,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (team_a_id, team_b_id),
+  FOREIGN KEY (team_a_id) REFERENCES teams(team_id),
+  FOREIGN KEY (team_b_id) REFERENCES teams(team_id)
+);
+
+-- Odds events table (polled from The Odds API)
+CREATE TABLE IF NOT EXISTS odds_events (
+  event_id TEXT PRIMARY KEY,
+  sport_key TEXT NOT NULL,
+  sport_title TEXT,
+  commence_time DATETIME,
+  home_team TEXT,
+  away_team TEXT,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Odds prices table (latest American price per bookmaker/market/outcome)
+CREATE TABLE IF NOT EXISTS odds_prices (
+  event_id TEXT NOT NULL,
+  bookmaker_key TEXT NOT NULL,
+  bookmaker_title TEXT,
+  market_key TEXT NOT NULL,
+  outcome_name TEXT NOT NULL,
+  price INTEGER NOT NULL,
+  point REAL,
+  last_update DATETIME,
+  created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (event_id, bookmaker_key, market_key, outcome_name),
+  FOREIGN KEY (event_id) REFERENCES odds_events(event_id)
+);
+
+-- Odds selection analytics table (best price and consensus per selection)
+CREATE TABLE IF NOT EXISTS odds_selection_analytics (
+  event_id TEXT NOT NULL,
+  market_key TEXT NOT NULL,
+  outcome_name TEXT NOT NULL,
+  point REAL NOT NULL DEFAULT 0,
+  best_bookmaker_key TEXT NOT NULL,
+  best_price INTEGER NOT NULL,
+  implied_probability REAL,
+  consensus_probability REAL,
+  value_edge REAL,
+  is_value BOOLEAN NOT NULL DEFAULT 0,
+  bookmakers INTEGER NOT NULL,
+  computed_at DATETIME NOT NULL,
+  PRIMARY KEY (event_id, market_key, outcome_name, point)
+);
+
+-- Odds market analytics table (margins and arbitrage per market line)
+CREATE TABLE IF NOT EXISTS odds_market_analytics (
+  event_id TEXT NOT NULL,
+  market_key TEXT NOT NULL,
+  line REAL NOT NULL DEFAULT 0,
+  min_overround REAL,
+  avg_overround REAL,
+  best_price_total REAL,
+  is_arbitrage BOOLEAN NOT NULL DEFAULT 0,
+  outcomes INTEGER NOT NULL,
+  computed_at DATETIME NOT NULL,
+  PRIMARY KEY (event_id, market_key, line)
+);
+
 -- User favorites table
 CREATE TABLE IF NOT EXISTS user_favorites (
   favorite_id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -246,6 +342,7 @@ CREATE INDEX idx_standings_league_id ON standings(league_id);
 CREATE INDEX idx_standings_team_id ON standings(team_id);
 CREATE INDEX idx_user_favorites_user_id ON user_favorites(user_id);
 CREATE INDEX idx_payment_transactions_user_id ON payment_transactions(user_id);
+CREATE INDEX idx_odds_events_sport_key ON odds_events(sport_key, commence_time);
 
 -- Insert test user
 INSERT INTO users (username, email, password_hash, is_admin) VALUES 
@@ -1,13 +1,90 @@
 import { NextResponse } from 'next/server';
-import { fetchOddsFromAPI, transformOddsApiResponse } from '../../../../lib/odds-api';
+import { D1Database } from '@cloudflare/workers-types';
+import { DatabaseService } from '../../../../database';
+import { fetchOddsFromAPI, transformOddsApiResponse, OddsApiResponse } from '../../../../lib/odds-api';
 import { getMockBettingOdds } from '../../../../lib/betting';
 
+// Convert The Odds API events to our BettingOdds format for compatibility
+function toBettingOdds(apiOdds: OddsApiResponse[]) {
+  const transformedOdds = transformOddsApiResponse(apiOdds);
+  const bettingOdds = transformedOdds.map((odds) => {
+    // Use best odds or first available bookmaker
+    const firstBookmaker = Object.values(odds.bookmakers)[0];
+
+    return {
+      id: odds.id,
+      home_team: odds.home_team,
+      away_team: odds.away_team,
+      league: odds.sport_title,
+      start_time: odds.commence_time,
+      moneyline: odds.best_odds.moneyline ? {
+        home: odds.best_odds.moneyline.home.odds,
+        away: odds.best_odds.moneyline.away.odds,
+        ...(odds.best_odds.moneyline.draw && { draw: odds.best_odds.moneyline.draw.odds }),
+      } : firstBookmaker?.moneyline || { home: 0, away: 0 },
+      spread: odds.best_odds.spread ? {
+        home: odds.best_odds.spread.home.odds,
+        away: odds.best_odds.spread.away.odds,
+        line: odds.best_odds.spread.home.line,
+      } : firstBookmaker?.spread || { home: 0, away: 0, line: 0 },
+      total: odds.best_odds.total ? {
+        over: odds.best_odds.total.over.odds,
+        under: odds.best_odds.total.under.odds,
+        line: odds.best_odds.total.over.line,
+      } : firstBookmaker?.total || { over: 0, under: 0, line: 0 },
+      last_updated: odds.last_updated,
+    };
+  });
+  return { bettingOdds, transformedOdds };
+}
+
 export async function GET(request: Request) {
   try {
     const { searchParams } = new URL(request.url);
-    const sport = searchParams.get('sport') || 'soccer';
+    // Default to the sport odds_data_fetcher.py polls by default; a group
+    // such as 'soccer' also matches every stored soccer_* league
+    const sport = searchParams.get('sport') || 'soccer_epl';
     const useMock = searchParams.get('mock') === 'true' || !process.env.ODDS_API_KEY;
 
+    // Odds stored by odds_data_fetcher.py come first, so provider calls
+    // depend on its poll interval rather than on traffic
+    const db = (process.env as unknown as { DB?: D1Database }).DB;
+    if (db && searchParams.get('mock') !== 'true') {
+      try {
+        const dbService = new DatabaseService(db);
+        const storedOdds = await dbService.getStoredOdds(sport);
+        if (storedOdds.length > 0) {
+          const { bettingOdds, transformedOdds } = toBettingOdds(storedOdds);
+          // Attach the value and arbitrage flags computed by odds_analytics.py
+          const oddsWithAnalytics = await Promise.all(bettingOdds.map(async (odds) => {
+            const { selections, markets } = await dbService.getOddsAnalytics(odds.id);
+            return {
+              ...odds,
+              analytics: {
+                value_selections: selections
+                  .filter(selection => selection.is_value)
+                  .map(({ market_key, outcome_name, best_bookmaker_key, best_price, value_edge }) => ({
+                    market_key, outcome_name, best_bookmaker_key, best_price, value_edge,
+                  })),
+                arbitrage_markets: markets
+                  .filter(market => market.is_arbitrage)
+                  .map(market => market.market_key),
+              },
+            };
+          }));
+          return NextResponse.json({
+            success: true,
+            odds: oddsWithAnalytics,
+            last_updated: new Date().toISOString(),
+            source: 'database',
+            raw_data: transformedOdds,
+          });
+        }
+      } catch (dbError) {
+        console.error('Error reading stored odds, falling back to The Odds API:', dbError);
+      }
+    }
+
     // If no API key or mock requested, return mock data
     if (useMock) {
       const odds = getMockBettingOdds();
@@ -19,40 +96,10 @@ export async function GET(request: Request) {
       });
     }
 
-    // Fetch real odds from The Odds API
+    // Fallback when nothing is stored for the sport: fetch from The Odds API
     try {
       const apiOdds = await fetchOddsFromAPI(sport, ['us'], ['h2h', 'spreads', 'totals']);
-      const transformedOdds = transformOddsApiResponse(apiOdds);
-      
-      // Convert to our BettingOdds format for compatibility
-      const bettingOdds = transformedOdds.map((odds) => {
-        // Use best odds or first available bookmaker
-        const firstBookmaker = Object.values(odds.bookmakers)[0];
-        
-        return {
-          id: odds.id,
-          home_team: odds.home_team,
-          away_team: odds.away_team,
-          league: odds.sport_title,
-          start_time: odds.commence_time,
-          moneyline: odds.best_odds.moneyline ? {
-            home: odds.best_odds.moneyline.home.odds,
-            away: odds.best_odds.moneyline.away.odds,
-            ...(odds.best_odds.moneyline.draw && { draw: odds.best_odds.moneyline.draw.odds }),
-          } : firstBookmaker?.moneyline || { home: 0, away: 0 },
-          spread: odds.best_odds.spread ? {
-            home: odds.best_odds.spread.home.odds,
-            away: odds.best_odds.spread.away.odds,
-            line: odds.best_odds.spread.home.line,
-          } : firstBookmaker?.spread || { home: 0, away: 0, line: 0 },
-          total: odds.best_odds.total ? {
-            over: odds.best_odds.total.over.odds,
-            under: odds.best_odds.total.under.odds,
-            line: odds.best_odds.total.over.line,
-          } : firstBookmaker?.total || { over: 0, under: 0, line: 0 },
-          last_updated: odds.last_updated,
-        };
-      });
+      const { bettingOdds, transformedOdds } = toBettingOdds(apiOdds);
 
       return NextResponse.json({
         success: true,
@@ -0,0 +1,51 @@
+import { NextRequest, NextResponse } from 'next/server';
+import { D1Database } from '@cloudflare/workers-types';
+import { DatabaseService } from '../../../../../database';
+
+// Recent form of a team and, with ?opponent=ID, its head-to-head record
+// against that team, read from the tables materialized by team_form.py
+export async function GET(request: NextRequest, { params }: { params: { id: string } }) {
+  try {
+    const teamId = Number(params.id);
+    const opponentParam = request.nextUrl.searchParams.get('opponent');
+    const opponentId = opponentParam ? Number(opponentParam) : null;
+
+    if (!Number.isInteger(teamId) || (opponentId !== null && !Number.isInteger(opponentId))) {
+      return NextResponse.json({ success: false, error: 'Invalid team id' }, { status: 400 });
+    }
+
+    const db = (process.env as unknown as { DB?: D1Database }).DB;
+    if (!db) {
+      return NextResponse.json({ success: true, form: null, head_to_head: null });
+    }
+
+    const dbService = new DatabaseService(db);
+    const form = await dbService.getTeamForm(teamId);
+
+    let headToHead = null;
+    if (opponentId !== null && opponentId !== teamId) {
+      const h2h = await dbService.getHeadToHead(teamId, opponentId);
+      if (h2h) {
+        // Stored once per pair with the lower team_id as team_a; orient it to teamId
+        const isTeamA = h2h.team_a_id === teamId;
+        headToHead = {
+          played: h2h.played,
+          wins: isTeamA ? h2h.team_a_wins : h2h.team_b_wins,
+          opponent_wins: isTeamA ? h2h.team_b_wins : h2h.team_a_wins,
+          draws: h2h.draws,
+          goals_for: isTeamA ? h2h.team_a_goals : h2h.team_b_goals,
+          goals_against: isTeamA ? h2h.team_b_goals : h2h.team_a_goals,
+          last_fixture_date: h2h.last_fixture_date,
+        };
+      }
+    }
+
+    return NextResponse.json({ success: true, form, head_to_head: headToHead });
+  } catch (error) {
+    console.error('Error fetching team form:', error);
+    return NextResponse.json(
+      { success: false, error: 'Failed to fetch team form' },
+      { status: 500 }
+    );
+  }
+}
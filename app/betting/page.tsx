@@ -16,7 +16,7 @@ export default function BettingPage() {
     const fetchOdds = async () => {
       setIsLoading(true);
       try {
-        const response = await fetch('/api/betting/odds');
+        const response = await fetch('/api/betting/odds?sport=soccer_epl');
         const data = await response.json();
         
         if (data.success && data.odds) {
@@ -8,6 +8,7 @@ export default function FixtureDetailPage() {
   const params = useParams();
   const fixtureId = params?.id as string;
   const [fixture, setFixture] = useState<any>(null);
+  const [headToHead, setHeadToHead] = useState<any>(null);
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
@@ -15,6 +16,8 @@ export default function FixtureDetailPage() {
     const mockFixtures: Record<string, any> = {
       '1': {
         fixture_id: 1,
+        home_team_id: 1,
+        away_team_id: 7,
         home_team_name: 'Manchester United',
         away_team_name: 'Chelsea',
         league_name: 'Premier League',
@@ -27,6 +30,8 @@ export default function FixtureDetailPage() {
       },
       '2': {
         fixture_id: 2,
+        home_team_id: 8,
+        away_team_id: 9,
         home_team_name: 'Arsenal',
         away_team_name: 'Tottenham',
         league_name: 'Premier League',
@@ -39,6 +44,8 @@ export default function FixtureDetailPage() {
       },
       '3': {
         fixture_id: 3,
+        home_team_id: 3,
+        away_team_id: 10,
         home_team_name: 'Barcelona',
         away_team_name: 'Atletico Madrid',
         league_name: 'La Liga',
@@ -51,6 +58,8 @@ export default function FixtureDetailPage() {
       },
       '4': {
         fixture_id: 4,
+        home_team_id: 11,
+        away_team_id: 12,
         home_team_name: 'AC Milan',
         away_team_name: 'Inter Milan',
         league_name: 'Serie A',
@@ -70,6 +79,15 @@ export default function FixtureDetailPage() {
     setIsLoading(false);
   }, [fixtureId]);
 
+  useEffect(() => {
+    if (!fixture) return;
+    // Head-to-head record from the head_to_head table, from the home team's side
+    fetch(`/api/teams/${fixture.home_team_id}/form?opponent=${fixture.away_team_id}`)
+      .then((res) => res.json())
+      .then((data) => setHeadToHead(data.head_to_head || null))
+      .catch((err) => console.error('Error fetching head-to-head:', err));
+  }, [fixture]);
+
   if (isLoading) {
     return (
       <div className="max-w-7xl mx-auto py-8 px-4 sm:px-6 lg:px-8">
@@ -170,16 +188,39 @@ export default function FixtureDetailPage() {
         </div>
       </div>
 
+      {headToHead && headToHead.played > 0 && (
+        <div className="bg-white rounded-lg shadow-md p-6 mb-6">
+          <h3 className="text-lg font-bold mb-4 text-center">Head to Head ({headToHead.played} matches)</h3>
+          <div className="grid grid-cols-3 text-center">
+            <div>
+              <p className="text-3xl font-bold">{headToHead.wins}</p>
+              <p className="text-sm text-gray-600">{fixture.home_team_name} wins</p>
+            </div>
+            <div>
+              <p className="text-3xl font-bold">{headToHead.draws}</p>
+              <p className="text-sm text-gray-600">Draws</p>
+            </div>
+            <div>
+              <p className="text-3xl font-bold">{headToHead.opponent_wins}</p>
+              <p className="text-sm text-gray-600">{fixture.away_team_name} wins</p>
+            </div>
+          </div>
+          <p className="text-sm text-gray-500 text-center mt-4">
+            Goals: {headToHead.goals_for} - {headToHead.goals_against}
+          </p>
+        </div>
+      )}
+
       <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
         <Link
-          href={`/teams/1`}
+          href={`/teams/${fixture.home_team_id}`}
           className="bg-white rounded-lg shadow-md p-4 hover:shadow-lg transition-shadow"
         >
           <h3 className="font-bold text-lg">{fixture.home_team_name}</h3>
           <p className="text-sm text-gray-600 mt-1">View team details →</p>
         </Link>
         <Link
-          href={`/teams/2`}
+          href={`/teams/${fixture.away_team_id}`}
           className="bg-white rounded-lg shadow-md p-4 hover:shadow-lg transition-shadow"
         >
           <h3 className="font-bold text-lg">{fixture.away_team_name}</h3>
@@ -9,6 +9,7 @@ export default function TeamDetailPage() {
   const teamId = params?.id as string;
   const [team, setTeam] = useState<any>(null);
   const [fixtures, setFixtures] = useState<any[]>([]);
+  const [form, setForm] = useState<any>(null);
   const [isLoading, setIsLoading] = useState(true);
 
   useEffect(() => {
@@ -107,6 +108,14 @@ export default function TeamDetailPage() {
     setIsLoading(false);
   }, [teamId]);
 
+  useEffect(() => {
+    // Recent form from the team_form table
+    fetch(`/api/teams/${teamId}/form`)
+      .then((res) => res.json())
+      .then((data) => setForm(data.form || null))
+      .catch((err) => console.error('Error fetching team form:', err));
+  }, [teamId]);
+
   if (isLoading) {
     return (
       <div className="max-w-7xl mx-auto py-8 px-4 sm:px-6 lg:px-8">
@@ -139,6 +148,12 @@ export default function TeamDetailPage() {
     });
   };
 
+  const resultColors: Record<string, string> = {
+    W: 'bg-green-500',
+    D: 'bg-gray-400',
+    L: 'bg-red-500',
+  };
+
   return (
     <div className="max-w-7xl mx-auto py-8 px-4 sm:px-6 lg:px-8">
       <Link href="/teams" className="text-blue-600 hover:text-blue-800 mb-4 inline-block">
@@ -170,6 +185,26 @@ export default function TeamDetailPage() {
         </div>
       </div>
 
+      {form?.form && (
+        <div className="bg-white rounded-lg shadow-md p-6 mb-6">
+          <h2 className="text-2xl font-bold mb-4">Recent Form</h2>
+          <div className="flex items-center gap-2 mb-2">
+            {/* Oldest result first, latest last */}
+            {form.form.split('').map((result: string, index: number) => (
+              <span
+                key={index}
+                className={`w-8 h-8 rounded-full flex items-center justify-center text-white text-sm font-bold ${resultColors[result] || 'bg-gray-300'}`}
+              >
+                {result}
+              </span>
+            ))}
+          </div>
+          <p className="text-sm text-gray-600">
+            {form.win} won, {form.draw} drawn, {form.lose} lost in the last {form.form.length} matches
+          </p>
+        </div>
+      )}
+
       {fixtures.length > 0 && (
         <div>
           <h2 className="text-2xl font-bold mb-4">Upcoming Fixtures</h2>
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Historical Backfill Script
+
+This script backfills teams and fixtures for a range of seasons. Instead of
+writing one statement per record like the regular fetch methods, records are
+staged into local files and bulk-loaded (LOAD DATA LOCAL INFILE or large
+multi-row inserts) inside a single transaction per league-season.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import mysql.connector
+from datetime import datetime
+from sports_data_fetcher import (
+    SportsDataFetcher, DB_CONFIG, APIRequestError, DatabaseError
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("backfill.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("backfill")
+
+# Columns staged for each table, in file/insert order
+TEAM_COLUMNS = [
+    "api_team_id", "name", "country_id", "logo_url", "founded",
+    "venue_name", "venue_capacity", "venue_city",
+]
+
+FIXTURE_COLUMNS = [
+    "api_fixture_id", "league_id", "home_team_id", "away_team_id",
+    "fixture_date", "status", "round", "season", "venue", "referee",
+    "home_score", "away_score", "halftime_home_score", "halftime_away_score",
+    "fulltime_home_score", "fulltime_away_score", "extratime_home_score",
+    "extratime_away_score", "penalty_home_score", "penalty_away_score",
+]
+
+# Session-scoped staging tables. TEMPORARY tables do not cause implicit
+# commits, so they can be created and filled inside the load transaction.
+CREATE_TEAM_STAGE = """
+CREATE TEMPORARY TABLE IF NOT EXISTS backfill_teams (
+    api_team_id INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    country_id INT,
+    logo_url VARCHAR(255),
+    founded INT,
+    venue_name VARCHAR(100),
+    venue_capacity INT,
+    venue_city VARCHAR(100)
+)
+"""
+
+CREATE_FIXTURE_STAGE = """
+CREATE TEMPORARY TABLE IF NOT EXISTS backfill_fixtures (
+    api_fixture_id INT PRIMARY KEY,
+    league_id INT NOT NULL,
+    home_team_id INT NOT NULL,
+    away_team_id INT NOT NULL,
+    fixture_date DATETIME,
+    status VARCHAR(20),
+    round VARCHAR(50),
+    season INT,
+    venue VARCHAR(100),
+    referee VARCHAR(100),
+    home_score INT,
+    away_score INT,
+    halftime_home_score INT,
+    halftime_away_score INT,
+    fulltime_home_score INT,
+    fulltime_away_score INT,
+    extratime_home_score INT,
+    extratime_away_score INT,
+    penalty_home_score INT,
+    penalty_away_score INT
+)
+"""
+
+
+def _tsv_value(value):
+    """Encode a value using the default LOAD DATA escaping rules."""
+    if value is None:
+        return "\\N"
+    value = str(value)
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def team_row(team_data, country_ids):
+    """Flatten a /teams response item into a TEAM_COLUMNS tuple."""
+    team = team_data["team"]
+    venue = team_data.get("venue") or {}
+    return (
+        team["id"],
+        team["name"],
+        country_ids.get(team.get("country")),
+        team.get("logo"),
+        team.get("founded"),
+        venue.get("name"),
+        venue.get("capacity"),
+        venue.get("city"),
+    )
+
+
+def fixture_row(fixture_data, league_id, season, team_ids):
+    """Flatten a /fixtures response item into a FIXTURE_COLUMNS tuple.
+
+    Returns None when either team is unknown, matching fetch_fixtures.
+    """
+    fixture = fixture_data["fixture"]
+    league = fixture_data["league"]
+    teams = fixture_data["teams"]
+    goals = fixture_data["goals"]
+    score = fixture_data["score"]
+
+    home_team_id = team_ids.get(teams["home"]["id"])
+    away_team_id = team_ids.get(teams["away"]["id"])
+    if not home_team_id or not away_team_id:
+        return None
+
+    fixture_date = None
+    if fixture.get("date"):
+        try:
+            fixture_date = datetime.fromisoformat(
+                fixture["date"].replace("Z", "+00:00")
+            ).strftime("%Y-%m-%d %H:%M:%S")
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid date format for fixture {fixture['id']}: {fixture.get('date')}")
+
+    return (
+        fixture["id"],
+        league_id,
+        home_team_id,
+        away_team_id,
+        fixture_date,
+        fixture.get("status", {}).get("short"),
+        league.get("round"),
+        season,
+        fixture.get("venue", {}).get("name"),
+        fixture.get("referee"),
+        goals.get("home"),
+        goals.get("away"),
+        score.get("halftime", {}).get("home"),
+        score.get("halftime", {}).get("away"),
+        score.get("fulltime", {}).get("home"),
+        score.get("fulltime", {}).get("away"),
+        score.get("extratime", {}).get("home"),
+        score.get("extratime", {}).get("away"),
+        score.get("penalty", {}).get("home"),
+        score.get("penalty", {}).get("away"),
+    )
+
+
+class HistoricalBackfill:
+    """Bulk-load teams and fixtures for many league-seasons."""
+
+    def __init__(self, staging_dir="backfill_staging", method="load",
+                 batch_size=1000, keep_staging=False):
+        """Initialize the backfill.
+
+        Args:
+            staging_dir (str): Directory for staged TSV files
+            method (str): 'load' for LOAD DATA LOCAL INFILE, 'insert' for
+                multi-row INSERT batches
+            batch_size (int): Rows per multi-row INSERT when method='insert'
+            keep_staging (bool): Keep staged files after a successful load
+        """
+        if method not in ("load", "insert"):
+            raise ValueError(f"Invalid load method: {method}")
+
+        self.fetcher = SportsDataFetcher()
+        self.staging_dir = staging_dir
+        self.method = method
+        self.batch_size = batch_size
+        self.keep_staging = keep_staging
+        self.country_ids = {}
+
+    @property
+    def db_conn(self):
+        return self.fetcher.db_conn
+
+    @property
+    def db_cursor(self):
+        return self.fetcher.db_cursor
+
+    def connect_to_database(self):
+        """Open a connection that allows LOAD DATA LOCAL INFILE.
+
+        The connection is shared with the underlying fetcher so API request
+        logging keeps working during the backfill.
+        """
+        try:
+            self.fetcher.db_conn = mysql.connector.connect(
+                **DB_CONFIG, allow_local_infile=(self.method == "load")
+            )
+            self.fetcher.db_cursor = self.fetcher.db_conn.cursor(dictionary=True)
+            logger.info("Successfully connected to the database")
+        except mysql.connector.Error as err:
+            logger.error(f"Database connection error: {err}")
+            raise DatabaseError(f"Failed to connect to database: {err}")
+
+        self.db_cursor.execute(CREATE_TEAM_STAGE)
+        self.db_cursor.execute(CREATE_FIXTURE_STAGE)
+
+        self.db_cursor.execute("SELECT country_id, name FROM countries")
+        self.country_ids = {row["name"]: row["country_id"] for row in self.db_cursor.fetchall()}
+
+    def _set_bulk_session(self, enabled):
+        """Defer FK and unique checks for the current session.
+
+        This is safe here because teams are merged before the fixtures that
+        reference them, fixtures with unknown teams are never staged, and the
+        staging tables deduplicate on the API id primary key.
+        """
+        value = 0 if enabled else 1
+        self.db_cursor.execute(f"SET SESSION foreign_key_checks = {value}")
+        self.db_cursor.execute(f"SET SESSION unique_checks = {value}")
+
+    def _select_leagues(self, league_ids=None):
+        """Return (league_id, api_league_id) rows to backfill."""
+        if league_ids:
+            placeholders = ", ".join(["%s"] * len(league_ids))
+            self.db_cursor.execute(
+                f"SELECT league_id, api_league_id FROM leagues WHERE league_id IN ({placeholders})",
+                tuple(league_ids)
+            )
+        else:
+            self.db_cursor.execute("SELECT league_id, api_league_id FROM leagues")
+        return self.db_cursor.fetchall()
+
+    def _stage_file(self, table, league_id, season, rows):
+        """Write rows to a TSV file in the staging directory."""
+        os.makedirs(self.staging_dir, exist_ok=True)
+        path = os.path.join(self.staging_dir, f"{table}_{league_id}_{season}.tsv")
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            for row in rows:
+                f.write("\t".join(_tsv_value(v) for v in row))
+                f.write("\n")
+        return path
+
+    def _load_stage(self, stage_table, columns, rows, path):
+        """Fill a staging table from a staged file or multi-row inserts."""
+        self.db_cursor.execute(f"DELETE FROM {stage_table}")
+        if not rows:
+            return
+
+        column_list = ", ".join(columns)
+        if self.method == "load":
+            self.db_cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {stage_table} "
+                f"CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' ({column_list})",
+                (os.path.abspath(path),)
+            )
+        else:
+            # executemany() rewrites this into multi-row INSERT statements
+            query = (
+                f"INSERT INTO {stage_table} ({column_list}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))})"
+            )
+            for start in range(0, len(rows), self.batch_size):
+                self.db_cursor.executemany(query, rows[start:start + self.batch_size])
+
+    def _merge_stage(self, stage_table, target_table, key, columns):
+        """Update matching rows and insert new ones from a staging table."""
+        assignments = ", ".join(f"t.{col} = s.{col}" for col in columns if col != key)
+        self.db_cursor.execute(f"""
+            UPDATE {target_table} t
+            JOIN {stage_table} s ON t.{key} = s.{key}
+            SET {assignments}, t.updated_at = NOW()
+        """)
+        updated = self.db_cursor.rowcount
+
+        column_list = ", ".join(columns)
+        select_list = ", ".join(f"s.{col}" for col in columns)
+        self.db_cursor.execute(f"""
+            INSERT INTO {target_table} ({column_list})
+            SELECT {select_list} FROM {stage_table} s
+            LEFT JOIN {target_table} t ON t.{key} = s.{key}
+            WHERE t.{key} IS NULL
+        """)
+        inserted = self.db_cursor.rowcount
+        return updated, inserted
+
+    def backfill_league_season(self, league_id, api_league_id, season):
+        """Backfill teams and fixtures for one league-season in one transaction."""
+        logger.info(f"Backfilling league_id={league_id}, season={season}...")
+        start_time = time.time()
+        params = {"league": api_league_id, "season": season}
+
+        # Fetch everything up front so the transaction only covers DB work
+        teams_data = self.fetcher.make_api_request("teams", params)
+        fixtures_data = self.fetcher.make_api_request("fixtures", params)
+
+        staged_files = []
+        try:
+            self._set_bulk_session(True)
+
+            # Teams
+            team_rows = [team_row(t, self.country_ids) for t in teams_data]
+            path = self._stage_file("teams", league_id, season, team_rows)
+            staged_files.append(path)
+            self._load_stage("backfill_teams", TEAM_COLUMNS, team_rows, path)
+            teams_updated, teams_inserted = self._merge_stage(
+                "backfill_teams", "teams", "api_team_id", TEAM_COLUMNS
+            )
+
+            # Resolve API team ids for this league-season in one query
+            team_ids = {}
+            if team_rows:
+                self.db_cursor.execute("""
+                    SELECT t.api_team_id, t.team_id FROM teams t
+                    JOIN backfill_teams s ON t.api_team_id = s.api_team_id
+                """)
+                team_ids = {row["api_team_id"]: row["team_id"] for row in self.db_cursor.fetchall()}
+
+            # Fixtures may reference teams outside this league's team list
+            # (e.g. cup opponents), so resolve any missing ones as well
+            missing = {
+                side["id"]
+                for f in fixtures_data
+                for side in (f["teams"]["home"], f["teams"]["away"])
+                if side.get("id") not in team_ids
+            }
+            missing.discard(None)
+            if missing:
+                placeholders = ", ".join(["%s"] * len(missing))
+                self.db_cursor.execute(
+                    f"SELECT api_team_id, team_id FROM teams WHERE api_team_id IN ({placeholders})",
+                    tuple(missing)
+                )
+                team_ids.update({row["api_team_id"]: row["team_id"] for row in self.db_cursor.fetchall()})
+
+            if team_rows:
+                self.db_cursor.executemany(
+                    "INSERT IGNORE INTO league_teams (league_id, team_id, season) VALUES (%s, %s, %s)",
+                    [(league_id, team_ids[row[0]], season) for row in team_rows if row[0] in team_ids]
+                )
+
+            # Fixtures
+            fixture_rows = []
+            for fixture_data in fixtures_data:
+                row = fixture_row(fixture_data, league_id, season, team_ids)
+                if row is None:
+                    logger.warning(f"Skipping fixture {fixture_data['fixture']['id']} - missing team IDs")
+                    continue
+                fixture_rows.append(row)
+
+            path = self._stage_file("fixtures", league_id, season, fixture_rows)
+            staged_files.append(path)
+            self._load_stage("backfill_fixtures", FIXTURE_COLUMNS, fixture_rows, path)
+            fixtures_updated, fixtures_inserted = self._merge_stage(
+                "backfill_fixtures", "fixtures", "api_fixture_id", FIXTURE_COLUMNS
+            )
+
+            self.db_conn.commit()
+        except mysql.connector.Error as err:
+            logger.error(f"Error backfilling league {league_id}, season {season}: {err}")
+            self.db_conn.rollback()
+            raise DatabaseError(f"Backfill failed for league {league_id}, season {season}: {err}")
+        finally:
+            self._set_bulk_session(False)
+
+        if not self.keep_staging:
+            for path in staged_files:
+                os.remove(path)
+
+        logger.info(
+            f"Backfilled league {league_id}, season {season} in {time.time() - start_time:.2f}s: "
+            f"teams {teams_inserted} new/{teams_updated} updated, "
+            f"fixtures {fixtures_inserted} new/{fixtures_updated} updated"
+        )
+
+    def run(self, from_season, to_season, league_ids=None):
+        """Backfill every selected league for each season in the range."""
+        try:
+            self.connect_to_database()
+            leagues = self._select_leagues(league_ids)
+
+            if not leagues:
+                logger.warning("No leagues matched the backfill filter")
+                return
+
+            failures = []
+            for season in range(from_season, to_season + 1):
+                for league in leagues:
+                    try:
+                        self.backfill_league_season(league["league_id"], league["api_league_id"], season)
+                    except (APIRequestError, DatabaseError) as err:
+                        failures.append((league["league_id"], season))
+                        logger.error(f"Backfill of league {league['league_id']}, season {season} failed: {err}")
+
+            if failures:
+                logger.warning(f"Backfill completed with {len(failures)} failed league-seasons: {failures}")
+            else:
+                logger.info("Backfill completed successfully")
+        finally:
+            self.fetcher.close_database_connection()
+
+
+def main():
+    """Main function to run the historical backfill."""
+    parser = argparse.ArgumentParser(description="Backfill historical seasons using bulk loads")
+    parser.add_argument("--from-season", type=int, required=True, help="First season to backfill")
+    parser.add_argument("--to-season", type=int, help="Last season to backfill (default: --from-season)")
+    parser.add_argument("--league", type=int, nargs="+", help="League IDs to backfill (default: all leagues)")
+    parser.add_argument("--method", choices=["load", "insert"], default="load",
+                        help="Bulk load method: LOAD DATA LOCAL INFILE or multi-row INSERT (default: load)")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Rows per multi-row INSERT when --method insert (default: 1000)")
+    parser.add_argument("--staging-dir", type=str, default="backfill_staging",
+                        help="Directory for staged files (default: backfill_staging)")
+    parser.add_argument("--keep-staging", action="store_true", help="Keep staged files after loading")
+
+    args = parser.parse_args()
+    to_season = args.to_season or args.from_season
+
+    if to_season < args.from_season:
+        logger.error("--to-season must not be earlier than --from-season")
+        sys.exit(1)
+
+    backfill = HistoricalBackfill(
+        staging_dir=args.staging_dir,
+        method=args.method,
+        batch_size=args.batch_size,
+        keep_staging=args.keep_staging,
+    )
+
+    try:
+        backfill.run(args.from_season, to_season, args.league)
+    except Exception as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Bet Settlement Engine
+
+This module settles pending bets once their fixture has a final result. The
+ingest path hands over fixtures that just finished; their pending bets are
+read through the (fixture_id, status) index, graded as arrays with NumPy and
+written back together with the wallet balance changes in one transaction per
+batch.
+
+Moneyline, spread and total bets are settled on the regulation-time score.
+A push (spread or total landing exactly on the line) and any bet on a
+cancelled or abandoned fixture is marked cancelled and its stake refunded.
+"""
+
+import sys
+import logging
+import argparse
+import numpy as np
+import mysql.connector
+from sports_data_fetcher import SportsDataFetcher, FINISHED_STATUSES, VOID_STATUSES, DatabaseError
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("bet_settlement.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("bet_settlement")
+
+BET_TYPES = ("moneyline", "spread", "total")
+BATCH_SIZE = 5000
+
+# Grading outcomes
+WON, LOST, PUSH, UNGRADED = 1, -1, 0, 2
+
+
+def grade_bets(bet_types, sides, lines, home_scores, away_scores):
+    """Grade bets against final scores.
+
+    Args:
+        bet_types (array): 'moneyline', 'spread' or 'total' per bet
+        sides (array): 'home', 'away', 'draw', 'over' or 'under' per bet
+        lines (array): Spread or total line per bet (NaN for moneyline)
+        home_scores (array): Final home score of each bet's fixture
+        away_scores (array): Final away score of each bet's fixture
+
+    Returns:
+        numpy.ndarray: WON, LOST, PUSH or UNGRADED per bet
+    """
+    bet_types = np.asarray(bet_types)
+    sides = np.asarray(sides)
+    lines = np.asarray(lines, dtype=np.float64)
+    margin = np.asarray(home_scores, dtype=np.float64) - np.asarray(away_scores, dtype=np.float64)
+    total = np.asarray(home_scores, dtype=np.float64) + np.asarray(away_scores, dtype=np.float64)
+
+    # Signed result from the bettor's point of view: > 0 won, < 0 lost, 0 push
+    result = np.full(len(bet_types), np.nan)
+
+    moneyline = bet_types == "moneyline"
+    result = np.where(moneyline & (sides == "home"), np.where(margin > 0, 1, -1), result)
+    result = np.where(moneyline & (sides == "away"), np.where(margin < 0, 1, -1), result)
+    result = np.where(moneyline & (sides == "draw"), np.where(margin == 0, 1, -1), result)
+
+    spread = bet_types == "spread"
+    result = np.where(spread & (sides == "home"), margin + lines, result)
+    result = np.where(spread & (sides == "away"), lines - margin, result)
+
+    totals = bet_types == "total"
+    result = np.where(totals & (sides == "over"), total - lines, result)
+    result = np.where(totals & (sides == "under"), lines - total, result)
+
+    grades = np.full(len(bet_types), UNGRADED, dtype=np.int8)
+    graded = ~np.isnan(result)
+    grades[graded] = np.sign(result[graded]).astype(np.int8)
+    return grades
+
+
+class BetSettlementEngine:
+    """Class to settle pending bets on finished fixtures."""
+
+    def __init__(self, db_conn, batch_size=BATCH_SIZE):
+        """Initialize the engine.
+
+        Args:
+            db_conn: Open MySQL connection
+            batch_size (int): Maximum number of bets settled per transaction
+        """
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor(dictionary=True)
+        self.batch_size = batch_size
+
+    def load_results(self, fixture_ids):
+        """Load final or void results for fixtures.
+
+        Returns:
+            dict: fixture_id -> (home_score, away_score), None for void fixtures
+        """
+        statuses = FINISHED_STATUSES + VOID_STATUSES
+        self.db_cursor.execute(
+            f"""
+            SELECT fixture_id, status,
+                   COALESCE(fulltime_home_score, home_score) AS home_score,
+                   COALESCE(fulltime_away_score, away_score) AS away_score
+            FROM fixtures
+            WHERE fixture_id IN ({', '.join(['%s'] * len(fixture_ids))})
+              AND status IN ({', '.join(['%s'] * len(statuses))})
+            """,
+            (*fixture_ids, *statuses)
+        )
+
+        results = {}
+        for row in self.db_cursor.fetchall():
+            if row["status"] in VOID_STATUSES:
+                results[row["fixture_id"]] = None
+            elif row["home_score"] is not None and row["away_score"] is not None:
+                results[row["fixture_id"]] = (row["home_score"], row["away_score"])
+        return results
+
+    def _settle_batch(self, results, after_bet_id=0):
+        """Settle one batch of pending bets in a single transaction.
+
+        Batches are paged by bet_id, so bets left pending (ungraded) are not
+        selected again by the next batch.
+
+        Args:
+            results (dict): fixture_id -> (home_score, away_score), None if void
+            after_bet_id (int): Last bet_id of the previous batch
+
+        Returns:
+            tuple: (bets settled, last bet_id of the batch), None when no bets are left
+        """
+        fixture_ids = list(results)
+        # Locks the batch so a concurrent settlement run can't pay it twice
+        self.db_cursor.execute(
+            f"""
+            SELECT bet_id, user_id, fixture_id, bet_type, side, line, stake, potential_payout
+            FROM bets
+            WHERE fixture_id IN ({', '.join(['%s'] * len(fixture_ids))})
+              AND status = 'pending'
+              AND bet_type IN ({', '.join(['%s'] * len(BET_TYPES))})
+              AND bet_id > %s
+            ORDER BY bet_id
+            LIMIT %s
+            FOR UPDATE
+            """,
+            (*fixture_ids, *BET_TYPES, after_bet_id, self.batch_size)
+        )
+        bets = self.db_cursor.fetchall()
+        if not bets:
+            self.db_conn.rollback()
+            return None
+
+        scores = [results[bet["fixture_id"]] for bet in bets]
+        void = np.array([score is None for score in scores])
+        grades = grade_bets(
+            [bet["bet_type"] for bet in bets],
+            [bet["side"] for bet in bets],
+            [np.nan if bet["line"] is None else float(bet["line"]) for bet in bets],
+            [score[0] if score else 0 for score in scores],
+            [score[1] if score else 0 for score in scores],
+        )
+        grades[void] = PUSH
+
+        stakes = np.array([bet["stake"] for bet in bets], dtype=object)
+        payouts = np.array([bet["potential_payout"] for bet in bets], dtype=object)
+        bet_ids = np.array([bet["bet_id"] for bet in bets])
+        users = np.array([bet["user_id"] for bet in bets], dtype=object)
+
+        for status, grade, payout_column in (("won", WON, "potential_payout"),
+                                             ("lost", LOST, "0"),
+                                             ("cancelled", PUSH, "stake")):
+            ids = bet_ids[grades == grade].tolist()
+            if ids:
+                self.db_cursor.execute(
+                    f"""
+                    UPDATE bets
+                    SET status = %s, payout = {payout_column}, settled_at = NOW()
+                    WHERE bet_id IN ({', '.join(['%s'] * len(ids))})
+                    """,
+                    (status, *ids)
+                )
+
+        # Aggregate wallet changes per user; amounts stay Decimal to avoid rounding drift
+        settled = grades != UNGRADED
+        wallet_changes = {}
+        for user_id, grade, stake, payout in zip(users[settled], grades[settled],
+                                                 stakes[settled], payouts[settled]):
+            balance, pending, won, lost = wallet_changes.get(user_id, (0, 0, 0, 0))
+            if grade == WON:
+                balance, won = balance + payout, won + payout
+            elif grade == LOST:
+                lost += stake
+            else:
+                balance += stake
+            wallet_changes[user_id] = (balance, pending + stake, won, lost)
+
+        if wallet_changes:
+            self.db_cursor.executemany(
+                """
+                INSERT INTO wallets (user_id, balance, pending_bets, total_won, total_lost)
+                VALUES (%s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    balance = balance + VALUES(balance),
+                    pending_bets = pending_bets + VALUES(pending_bets),
+                    total_won = total_won + VALUES(total_won),
+                    total_lost = total_lost + VALUES(total_lost)
+                """,
+                [(user_id, balance, -pending, won, lost)
+                 for user_id, (balance, pending, won, lost) in wallet_changes.items()]
+            )
+
+        self.db_conn.commit()
+
+        ungraded = int((~settled).sum())
+        if ungraded:
+            logger.warning(f"Left {ungraded} bets with an unknown side pending")
+        logger.info(
+            f"Settled {int(settled.sum())} bets: {int((grades == WON).sum())} won, "
+            f"{int((grades == LOST).sum())} lost, {int((grades == PUSH).sum())} refunded"
+        )
+        return int(settled.sum()), bets[-1]["bet_id"]
+
+    def settle_fixtures(self, fixture_ids):
+        """Settle every pending bet on the given fixtures.
+
+        Args:
+            fixture_ids (list): Fixture IDs that reached a final or void status
+
+        Returns:
+            int: Number of bets settled
+        """
+        if not fixture_ids:
+            return 0
+
+        try:
+            results = self.load_results(list(fixture_ids))
+            if not results:
+                return 0
+
+            count = 0
+            last_bet_id = 0
+            while True:
+                batch = self._settle_batch(results, last_bet_id)
+                if batch is None:
+                    break
+                settled, last_bet_id = batch
+                count += settled
+            return count
+        except mysql.connector.Error as err:
+            logger.error(f"Error settling bets: {err}")
+            self.db_conn.rollback()
+            raise DatabaseError(f"Failed to settle bets: {err}")
+
+    def settle_all(self):
+        """Settle pending bets on every finished or void fixture (catch-up sweep)."""
+        try:
+            self.db_cursor.execute(
+                """
+                SELECT DISTINCT fixture_id
+                FROM bets
+                WHERE status = 'pending'
+                """
+            )
+            fixture_ids = [row["fixture_id"] for row in self.db_cursor.fetchall()]
+        except mysql.connector.Error as err:
+            logger.error(f"Error loading pending bets: {err}")
+            raise DatabaseError(f"Failed to load pending bets: {err}")
+
+        count = 0
+        for start in range(0, len(fixture_ids), 1000):
+            count += self.settle_fixtures(fixture_ids[start:start + 1000])
+        return count
+
+
+def main():
+    """Main function to settle bets."""
+    parser = argparse.ArgumentParser(description="Settle pending bets on finished fixtures")
+    parser.add_argument("--fixture", type=int, nargs="+", help="Fixture IDs to settle")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Settle pending bets on every finished or void fixture")
+
+    args = parser.parse_args()
+
+    if not args.fixture and not args.sweep:
+        logger.error("No action specified. Use --fixture or --sweep.")
+        sys.exit(1)
+
+    fetcher = SportsDataFetcher()
+
+    try:
+        fetcher.connect_to_database()
+        engine = BetSettlementEngine(fetcher.db_conn)
+        if args.sweep:
+            engine.settle_all()
+        else:
+            engine.settle_fixtures(args.fixture)
+    except DatabaseError as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+    finally:
+        fetcher.close_database_connection()
+
+if __name__ == "__main__":
+    main()
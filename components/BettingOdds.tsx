@@ -55,6 +55,25 @@ export default function BettingOddsComponent({ odds }: BettingOddsProps) {
         </div>
       </div>
 
+      {odds.analytics && (odds.analytics.value_selections.length > 0 || odds.analytics.arbitrage_markets.length > 0) && (
+        <div className="flex flex-wrap gap-2 mb-4">
+          {odds.analytics.arbitrage_markets.map((market) => (
+            <span key={`arb-${market}`} className="text-xs font-medium bg-purple-100 text-purple-700 rounded px-2 py-1">
+              Arbitrage: {market}
+            </span>
+          ))}
+          {odds.analytics.value_selections.map((selection) => (
+            <span
+              key={`value-${selection.market_key}-${selection.outcome_name}`}
+              className="text-xs font-medium bg-green-100 text-green-700 rounded px-2 py-1"
+            >
+              Value: {selection.outcome_name} {formatAmericanOdds(selection.best_price)} @ {selection.best_bookmaker_key}
+              {selection.value_edge !== null && ` (+${(selection.value_edge * 100).toFixed(1)}%)`}
+            </span>
+          ))}
+        </div>
+      )}
+
       {/* Tabs */}
       <div className="border-b border-gray-200 mb-4">
         <nav className="flex -mb-px">
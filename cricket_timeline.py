@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Cricket Timeline Consumer Script
+
+This script follows live cricket matches ball by ball. CricketAPI returns the
+whole match timeline on every call, so the consumer remembers how far into
+each match's timeline it has processed and only applies the events after
+that point. Innings totals, batting and bowling figures and run rates are
+kept in memory and updated per delivery; after each poll only the rows that
+changed are written, in one transaction. A poll therefore costs CPU and
+database writes in proportion to the new balls, not to the match length.
+
+Rows are written with their absolute values, so a restarted consumer rebuilds
+its state from the full timeline once and writes the same rows again. If the
+provider rewrites an already processed part of the timeline, that match is
+rebuilt from the start.
+
+The match, its tournament, season and teams are created from the timeline's
+sport_event before its first innings rows, since those reference them;
+rows that already exist are left alone.
+
+The timeline fields read for each event are listed in DELIVERY_PATHS.
+"""
+
+import sys
+import time
+from datetime import datetime, timezone
+import logging
+import argparse
+import mysql.connector
+from json_extract import compile_extractor
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("cricket_timeline.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("cricket_timeline")
+
+POLL_INTERVAL = 15
+BALLS_PER_OVER = 6
+
+# Timeline event types that are deliveries
+DELIVERY_TYPES = ("ball", "wicket", "boundary", "extra")
+DELIVERY_PATHS = (
+    "id",
+    "type",
+    "inning",
+    "batting_team",
+    "batsman.id",
+    "batsman.name",
+    "bowler.id",
+    "bowler.name",
+    "runs.batsman",
+    "runs.extras",
+    "extras_type",
+    "dismissal.type",
+    "dismissal.batsman.id",
+    "dismissal.fielder.id",
+)
+(EVENT_ID, EVENT_TYPE, EVENT_INNING, EVENT_BATTING_TEAM, EVENT_BATSMAN, EVENT_BATSMAN_NAME,
+ EVENT_BOWLER, EVENT_BOWLER_NAME, EVENT_BAT_RUNS, EVENT_EXTRA_RUNS, EVENT_EXTRAS_TYPE,
+ EVENT_DISMISSAL, EVENT_DISMISSED, EVENT_FIELDER) = range(len(DELIVERY_PATHS))
+extract_delivery = compile_extractor(DELIVERY_PATHS)
+
+# Timeline sport_event -> the rows the innings reference; v2 timelines carry
+# the tournament as sport_event_context.competition
+MATCH_PATHS = (
+    "sport_event.sport_event_context.competition.id",
+    "sport_event.sport_event_context.competition.name",
+    "sport_event.sport_event_context.season.id",
+    "sport_event.sport_event_context.season.name",
+    "sport_event.sport_event_context.season.year",
+    "sport_event.scheduled",
+    "sport_event.venue.name",
+    "sport_event.venue.city_name",
+    "sport_event_status.status",
+)
+(MATCH_TOURNAMENT, MATCH_TOURNAMENT_NAME, MATCH_SEASON, MATCH_SEASON_NAME, MATCH_SEASON_YEAR,
+ MATCH_SCHEDULED, MATCH_VENUE, MATCH_CITY, MATCH_STATUS) = range(len(MATCH_PATHS))
+extract_match = compile_extractor(MATCH_PATHS)
+MATCH_FORMATS = ("test", "odi", "t20")
+
+# Wides and no-balls are re-bowled and charged to the bowler; byes and leg byes are not
+NOT_LEGAL_EXTRAS = ("wide", "no_ball")
+BOWLER_EXTRAS = ("wide", "no_ball")
+# Dismissals not credited to the bowler
+NOT_BOWLER_WICKETS = ("run_out", "retired_hurt", "retired_out", "obstructing_the_field", "timed_out")
+
+
+def overs_notation(balls):
+    """Legal balls as cricket overs, e.g. 23 balls -> 3.5."""
+    return balls // BALLS_PER_OVER + (balls % BALLS_PER_OVER) / 10
+
+
+def per_over(runs, balls):
+    """Runs per six legal balls, None before the first ball."""
+    return round(runs * BALLS_PER_OVER / balls, 2) if balls else None
+
+
+def _datetime(value):
+    """ISO timestamp of the API as a naive UTC datetime for DATETIME columns."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def match_format(tournament_name):
+    """'test', 'odi' or 't20' from a tournament name, 'unknown' if it names none."""
+    words = (tournament_name or "").lower().replace("-", "").split()
+    return next((name for name in MATCH_FORMATS if name in words), "unknown")
+
+
+class BattingFigures:
+    __slots__ = ("runs", "balls", "fours", "sixes", "how_out", "bowled_by", "caught_by", "position")
+
+    def __init__(self, position):
+        self.runs = self.balls = self.fours = self.sixes = 0
+        self.how_out = self.bowled_by = self.caught_by = None
+        self.position = position
+
+    @property
+    def strike_rate(self):
+        return round(self.runs * 100 / self.balls, 2) if self.balls else None
+
+
+class BowlingFigures:
+    __slots__ = ("balls", "maidens", "runs", "wickets", "dots", "fours", "sixes", "wides",
+                 "no_balls", "over_balls", "over_runs")
+
+    def __init__(self):
+        self.balls = self.maidens = self.runs = self.wickets = self.dots = 0
+        self.fours = self.sixes = self.wides = self.no_balls = 0
+        # Legal balls and runs conceded in the bowler's current over
+        self.over_balls = self.over_runs = 0
+
+    @property
+    def economy_rate(self):
+        return per_over(self.runs, self.balls)
+
+
+class InningsState:
+    """Running totals of one innings, with the rows changed since the last write."""
+
+    def __init__(self, innings_id, number, batting_team_id, bowling_team_id):
+        self.innings_id = innings_id
+        self.number = number
+        self.batting_team_id = batting_team_id
+        self.bowling_team_id = bowling_team_id
+        self.runs = self.wickets = self.balls = self.extras = 0
+        self.batting = {}   # player_id -> BattingFigures
+        self.bowling = {}   # player_id -> BowlingFigures
+        self.dirty = True
+        self.dirty_batters = set()
+        self.dirty_bowlers = set()
+
+    @property
+    def run_rate(self):
+        return per_over(self.runs, self.balls)
+
+    def batter(self, player_id):
+        if player_id not in self.batting:
+            self.batting[player_id] = BattingFigures(len(self.batting) + 1)
+        self.dirty_batters.add(player_id)
+        return self.batting[player_id]
+
+    def bowler(self, player_id):
+        if player_id not in self.bowling:
+            self.bowling[player_id] = BowlingFigures()
+        self.dirty_bowlers.add(player_id)
+        return self.bowling[player_id]
+
+    def apply(self, row):
+        """Apply one delivery to the totals and figures."""
+        bat_runs = row[EVENT_BAT_RUNS] or 0
+        extra_runs = row[EVENT_EXTRA_RUNS] or 0
+        extras_type = row[EVENT_EXTRAS_TYPE]
+        legal = extras_type not in NOT_LEGAL_EXTRAS
+
+        self.runs += bat_runs + extra_runs
+        self.extras += extra_runs
+        self.balls += legal
+        self.dirty = True
+
+        if row[EVENT_BATSMAN]:
+            batter = self.batter(row[EVENT_BATSMAN])
+            batter.runs += bat_runs
+            batter.balls += extras_type != "wide"
+            batter.fours += bat_runs == 4
+            batter.sixes += bat_runs == 6
+
+        if row[EVENT_BOWLER]:
+            bowler = self.bowler(row[EVENT_BOWLER])
+            conceded = bat_runs + (extra_runs if extras_type in BOWLER_EXTRAS else 0)
+            bowler.runs += conceded
+            bowler.over_runs += conceded
+            bowler.wides += extras_type == "wide"
+            bowler.no_balls += extras_type == "no_ball"
+            bowler.fours += bat_runs == 4
+            bowler.sixes += bat_runs == 6
+            if legal:
+                bowler.balls += 1
+                bowler.dots += bat_runs + extra_runs == 0
+                bowler.over_balls += 1
+                if bowler.over_balls == BALLS_PER_OVER:
+                    bowler.maidens += bowler.over_runs == 0
+                    bowler.over_balls = bowler.over_runs = 0
+
+        if row[EVENT_DISMISSAL]:
+            self.wickets += 1
+            out = self.batter(row[EVENT_DISMISSED] or row[EVENT_BATSMAN])
+            out.how_out = row[EVENT_DISMISSAL]
+            out.caught_by = row[EVENT_FIELDER]
+            if row[EVENT_DISMISSAL] not in NOT_BOWLER_WICKETS and row[EVENT_BOWLER]:
+                out.bowled_by = row[EVENT_BOWLER]
+                self.bowling[row[EVENT_BOWLER]].wickets += 1
+
+    def clear_dirty(self):
+        self.dirty = False
+        self.dirty_batters.clear()
+        self.dirty_bowlers.clear()
+
+
+class MatchState:
+    """How far a match's timeline has been processed, and its innings."""
+
+    def __init__(self, match_id, team_ids, match_row=None, team_rows=()):
+        self.match_id = match_id
+        self.team_ids = team_ids  # "home"/"away" -> team_id
+        # Rows created before the first innings write; None once stored
+        self.match_row = match_row
+        self.team_rows = list(team_rows)
+        self.processed = 0
+        self.last_event_id = None
+        self.innings = {}  # innings number -> InningsState
+
+    def innings_for(self, number, batting_side):
+        if number not in self.innings:
+            bowling_side = "away" if batting_side == "home" else "home"
+            self.innings[number] = InningsState(
+                f"{self.match_id}:{number}", number,
+                self.team_ids.get(batting_side), self.team_ids.get(bowling_side)
+            )
+        return self.innings[number]
+
+
+class CricketTimelineConsumer:
+    """Class to apply new timeline deliveries of live cricket matches."""
+
+    def __init__(self, db_conn, api):
+        """Initialize the consumer.
+
+        Args:
+            db_conn: Open database connection
+            api (CricketAPI): Client to fetch match timelines with
+        """
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor(dictionary=True)
+        self.api = api
+        self.matches = {}  # match_id -> MatchState
+        self.players = {}  # player_id -> name, collected until written
+        self.known_players = set()
+
+    def _match_state(self, match_id, timeline):
+        competitors = (timeline.get("sport_event") or {}).get("competitors") or []
+        team_ids = {competitor.get("qualifier"): competitor.get("id") for competitor in competitors}
+        team_rows = [
+            (competitor["id"], competitor.get("name") or competitor["id"], competitor.get("abbreviation"))
+            for competitor in competitors if competitor.get("id")
+        ]
+        row = extract_match(timeline)
+        return MatchState(match_id, team_ids, row, team_rows)
+
+    def _write_match(self, state):
+        """Create the match, tournament, season and teams of a match if they don't exist."""
+        row = state.match_row
+        if row[MATCH_TOURNAMENT] is None or row[MATCH_SEASON] is None:
+            logger.warning(f"Timeline of {state.match_id} has no tournament or season, not creating the match")
+            return
+        self.db_cursor.execute(
+            "INSERT IGNORE INTO cricket_tournaments (tournament_id, name, format) VALUES (%s, %s, %s)",
+            (row[MATCH_TOURNAMENT], row[MATCH_TOURNAMENT_NAME] or row[MATCH_TOURNAMENT],
+             match_format(row[MATCH_TOURNAMENT_NAME]))
+        )
+        self.db_cursor.execute(
+            "INSERT IGNORE INTO cricket_seasons (season_id, tournament_id, name, year) VALUES (%s, %s, %s, %s)",
+            (row[MATCH_SEASON], row[MATCH_TOURNAMENT], row[MATCH_SEASON_NAME] or row[MATCH_SEASON],
+             row[MATCH_SEASON_YEAR])
+        )
+        if state.team_rows:
+            placeholder = ", ".join(["(%s, %s, %s)"] * len(state.team_rows))
+            self.db_cursor.execute(
+                f"INSERT IGNORE INTO cricket_teams (team_id, name, short_name) VALUES {placeholder}",
+                [value for team in state.team_rows for value in team]
+            )
+        self.db_cursor.execute(
+            """
+            INSERT IGNORE INTO cricket_matches
+                (match_id, season_id, tournament_id, match_format, status, scheduled_time,
+                 venue_name, city, home_team_id, away_team_id)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            (state.match_id, row[MATCH_SEASON], row[MATCH_TOURNAMENT], match_format(row[MATCH_TOURNAMENT_NAME]),
+             row[MATCH_STATUS] or "live", _datetime(row[MATCH_SCHEDULED]), row[MATCH_VENUE], row[MATCH_CITY],
+             state.team_ids.get("home"), state.team_ids.get("away"))
+        )
+
+    def consume(self, match_id, timeline):
+        """Apply the events of a timeline that haven't been processed yet.
+
+        Args:
+            match_id (str): SportRadar match ID
+            timeline (dict): CricketAPI.get_match_timeline() result
+
+        Returns:
+            int: Number of new deliveries applied
+        """
+        events = timeline.get("timeline") or []
+        state = self.matches.get(match_id)
+
+        # The last processed event must still be where it was; otherwise the
+        # provider corrected earlier events and the match is rebuilt
+        if state is not None and state.processed and (
+            len(events) < state.processed or events[state.processed - 1].get("id") != state.last_event_id
+        ):
+            logger.warning(f"Timeline of {match_id} changed before event {state.last_event_id}, rebuilding")
+            state = None
+        if state is None:
+            state = self._match_state(match_id, timeline)
+            self.matches[match_id] = state
+
+        deliveries = 0
+        for event in events[state.processed:]:
+            row = extract_delivery(event)
+            if row[EVENT_TYPE] in DELIVERY_TYPES and row[EVENT_INNING]:
+                innings = state.innings_for(row[EVENT_INNING], row[EVENT_BATTING_TEAM])
+                innings.apply(row)
+                for id_field, name_field in ((EVENT_BATSMAN, EVENT_BATSMAN_NAME), (EVENT_BOWLER, EVENT_BOWLER_NAME),
+                                             (EVENT_DISMISSED, None), (EVENT_FIELDER, None)):
+                    if row[id_field] and row[id_field] not in self.known_players:
+                        # A fielder's name isn't in the event; the ID stands in until the profile is stored
+                        name = row[name_field] if name_field is not None else None
+                        self.players.setdefault(row[id_field], name or row[id_field])
+                deliveries += 1
+
+        if len(events) > state.processed:
+            state.processed = len(events)
+            state.last_event_id = events[-1].get("id")
+        return deliveries
+
+    def _upsert(self, table, columns, rows, keep=1):
+        """Multi-row upsert replacing every column after the first `keep`."""
+        if not rows:
+            return
+        update = ", ".join(f"{column} = VALUES({column})" for column in columns[keep:])
+        placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        self.db_cursor.execute(
+            f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES {", ".join([placeholder] * len(rows))}
+            ON DUPLICATE KEY UPDATE {update}
+            """,
+            [value for row in rows for value in row]
+        )
+
+    def write(self, match_ids=None):
+        """Write the innings, batting and bowling rows changed since the last write.
+
+        Returns:
+            int: Number of rows written
+        """
+        innings_rows, batting_rows, bowling_rows = [], [], []
+        changed = []
+        new_matches = []
+        for match_id, state in self.matches.items():
+            if match_ids is not None and match_id not in match_ids:
+                continue
+            if state.match_row is not None and state.innings:
+                new_matches.append(state)
+            for innings in state.innings.values():
+                if innings.dirty:
+                    innings_rows.append((
+                        innings.innings_id, state.match_id, innings.number, innings.batting_team_id,
+                        innings.bowling_team_id, innings.runs, innings.wickets,
+                        overs_notation(innings.balls), innings.extras
+                    ))
+                for player_id in innings.dirty_batters:
+                    batter = innings.batting[player_id]
+                    batting_rows.append((
+                        f"{innings.innings_id}:{player_id}", innings.innings_id, player_id, batter.runs,
+                        batter.balls, batter.fours, batter.sixes, batter.strike_rate, batter.how_out,
+                        batter.bowled_by, batter.caught_by, batter.position
+                    ))
+                for player_id in innings.dirty_bowlers:
+                    bowler = innings.bowling[player_id]
+                    bowling_rows.append((
+                        f"{innings.innings_id}:{player_id}", innings.innings_id, player_id,
+                        overs_notation(bowler.balls), bowler.maidens, bowler.runs, bowler.wickets,
+                        bowler.economy_rate, bowler.dots, bowler.fours, bowler.sixes, bowler.wides,
+                        bowler.no_balls
+                    ))
+                changed.append(innings)
+
+        if not (innings_rows or batting_rows or bowling_rows):
+            return 0
+
+        try:
+            # The match and teams referenced by the innings must exist
+            for state in new_matches:
+                self._write_match(state)
+            # Players referenced by the figures must exist; known players are left alone
+            if self.players:
+                placeholder = ", ".join(["(%s, %s)"] * len(self.players))
+                self.db_cursor.execute(
+                    f"INSERT IGNORE INTO cricket_players (player_id, full_name) VALUES {placeholder}",
+                    [value for player in self.players.items() for value in player]
+                )
+            self._upsert("cricket_innings", (
+                "innings_id", "match_id", "innings_number", "batting_team_id", "bowling_team_id",
+                "runs", "wickets", "overs", "extras"
+            ), innings_rows)
+            self._upsert("cricket_batting_stats", (
+                "batting_stat_id", "innings_id", "player_id", "runs", "balls_faced", "fours", "sixes",
+                "strike_rate", "how_out", "bowled_by", "caught_by", "position"
+            ), batting_rows)
+            self._upsert("cricket_bowling_stats", (
+                "bowling_stat_id", "innings_id", "player_id", "overs", "maidens", "runs", "wickets",
+                "economy_rate", "dots", "fours_conceded", "sixes_conceded", "wides", "no_balls"
+            ), bowling_rows)
+            self.db_conn.commit()
+        except mysql.connector.Error:
+            self.db_conn.rollback()
+            raise
+
+        for state in new_matches:
+            state.match_row = None
+            state.team_rows = []
+        self.known_players.update(self.players)
+        self.players.clear()
+        for innings in changed:
+            innings.clear_dirty()
+        return len(innings_rows) + len(batting_rows) + len(bowling_rows)
+
+    def poll(self, match_id):
+        """Fetch a match timeline, apply the new deliveries and write the changes.
+
+        Returns:
+            tuple: (new deliveries, rows written)
+        """
+        deliveries = self.consume(match_id, self.api.get_match_timeline(match_id))
+        written = self.write([match_id])
+        if deliveries:
+            state = self.matches[match_id]
+            current = state.innings[max(state.innings)]
+            logger.info(
+                f"{match_id}: {deliveries} new deliveries, innings {current.number} "
+                f"{current.runs}/{current.wickets} in {overs_notation(current.balls)} overs "
+                f"(run rate {current.run_rate}), {written} rows written"
+            )
+        return deliveries, written
+
+    def scoreboard(self, match_id):
+        """Return the in-memory totals of a match's innings."""
+        state = self.matches.get(match_id)
+        if state is None:
+            return []
+        return [
+            {
+                "innings": innings.number,
+                "batting_team_id": innings.batting_team_id,
+                "runs": innings.runs,
+                "wickets": innings.wickets,
+                "overs": overs_notation(innings.balls),
+                "extras": innings.extras,
+                "run_rate": innings.run_rate,
+            }
+            for innings in sorted(state.innings.values(), key=lambda innings: innings.number)
+        ]
+
+
+def main():
+    """Main function to follow cricket match timelines."""
+    parser = argparse.ArgumentParser(description="Apply cricket match timelines ball by ball")
+    parser.add_argument("--match", type=str, nargs="+", required=True, help="SportRadar match IDs to follow")
+    parser.add_argument("--interval", type=int, default=POLL_INTERVAL,
+                        help=f"Seconds between polls (default: {POLL_INTERVAL})")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+
+    args = parser.parse_args()
+
+    from sports_data_fetcher import DB_CONFIG
+    from storage import get_backend
+    from sportradar_data_fetcher import CricketAPI, close_shared_session
+
+    try:
+        db_conn = get_backend(DB_CONFIG).connect()
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        sys.exit(1)
+
+    consumer = CricketTimelineConsumer(db_conn, CricketAPI())
+    try:
+        while True:
+            for match_id in args.match:
+                try:
+                    consumer.poll(match_id)
+                except Exception as err:
+                    logger.error(f"Error polling {match_id}: {err}")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        logger.info("Cricket timeline consumer interrupted by user.")
+    finally:
+        close_shared_session()
+        db_conn.close()
+
+if __name__ == "__main__":
+    main()
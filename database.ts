@@ -1,4 +1,5 @@
 import { D1Database } from '@cloudflare/workers-types';
+import { OddsApiResponse } from './lib/odds-api';
 
 // Type definitions for our database tables
 export interface User {
@@ -95,6 +96,70 @@ export interface Standing {
   updated_at: string;
 }
 
+export interface TeamForm {
+  team_id: number;
+  form: string | null;
+  recent_fixture_ids: string | null;
+  win: number;
+  draw: number;
+  lose: number;
+  last_fixture_date: string | null;
+  updated_at: string;
+}
+
+export interface HeadToHead {
+  team_a_id: number;
+  team_b_id: number;
+  played: number;
+  team_a_wins: number;
+  team_b_wins: number;
+  draws: number;
+  team_a_goals: number;
+  team_b_goals: number;
+  recent_fixture_ids: string | null;
+  last_fixture_date: string | null;
+  updated_at: string;
+}
+
+export interface OddsPrice {
+  event_id: string;
+  bookmaker_key: string;
+  bookmaker_title: string | null;
+  market_key: string;
+  outcome_name: string;
+  price: number;
+  point: number | null;
+  last_update: string | null;
+  updated_at: string;
+}
+
+export interface OddsSelectionAnalytics {
+  event_id: string;
+  market_key: string;
+  outcome_name: string;
+  point: number;
+  best_bookmaker_key: string;
+  best_price: number;
+  implied_probability: number | null;
+  consensus_probability: number | null;
+  value_edge: number | null;
+  is_value: number;
+  bookmakers: number;
+  computed_at: string;
+}
+
+export interface OddsMarketAnalytics {
+  event_id: string;
+  market_key: string;
+  line: number;
+  min_overround: number | null;
+  avg_overround: number | null;
+  best_price_total: number | null;
+  is_arbitrage: number;
+  outcomes: number;
+  computed_at: string;
+}
+
 export interface PaymentTransaction {
   transaction_id: number;
   user_id: number;
@@ -242,6 +307,88 @@ export class DatabaseService {
     return result.results || [];
   }
 
+  // Form and head-to-head methods (materialized by team_form.py)
+  async getTeamForm(teamId: number): Promise<TeamForm | null> {
+    const form = await this.db.prepare(
+      'SELECT * FROM team_form WHERE team_id = ?'
+    ).bind(teamId).first<TeamForm>();
+    return form || null;
+  }
+
+  async getHeadToHead(teamId: number, opponentId: number): Promise<HeadToHead | null> {
+    // Pairs are stored once with the lower team_id as team_a
+    const h2h = await this.db.prepare(
+      'SELECT * FROM head_to_head WHERE team_a_id = ? AND team_b_id = ?'
+    ).bind(Math.min(teamId, opponentId), Math.max(teamId, opponentId)).first<HeadToHead>();
+    return h2h || null;
+  }
+
+  // Odds methods (stored by odds_data_fetcher.py)
+  // sportKey is a polled key such as 'soccer_epl' or a group such as 'soccer'
+  async getStoredOdds(sportKey: string): Promise<OddsApiResponse[]> {
+    const result = await this.db.prepare(`
+      SELECT e.sport_key, e.sport_title, e.commence_time, e.home_team, e.away_team, p.*
+      FROM odds_events e
+      JOIN odds_prices p ON p.event_id = e.event_id
+      WHERE (e.sport_key = ? OR e.sport_key LIKE ? ESCAPE '\\')
+        AND e.commence_time >= datetime('now', '-1 day')
+      ORDER BY e.commence_time, e.event_id, p.bookmaker_key, p.market_key
+    `).bind(sportKey, `${sportKey}\\_%`).all<OddsPrice & { sport_key: string, sport_title: string, commence_time: string, home_team: string, away_team: string }>();
+
+    // Rebuild the nested event/bookmaker/market/outcome shape returned by The Odds API
+    const events = new Map<string, OddsApiResponse>();
+    for (const row of result.results || []) {
+      let event = events.get(row.event_id);
+      if (!event) {
+        event = {
+          id: row.event_id,
+          sport_key: row.sport_key,
+          sport_title: row.sport_title,
+          commence_time: row.commence_time,
+          home_team: row.home_team,
+          away_team: row.away_team,
+          bookmakers: [],
+        };
+        events.set(row.event_id, event);
+      }
+
+      let bookmaker = event.bookmakers.find(b => b.key === row.bookmaker_key);
+      if (!bookmaker) {
+        bookmaker = { key: row.bookmaker_key, title: row.bookmaker_title || row.bookmaker_key, last_update: row.last_update || row.updated_at, markets: [] };
+        event.bookmakers.push(bookmaker);
+      }
+
+      let market = bookmaker.markets.find(m => m.key === row.market_key);
+      if (!market) {
+        market = { key: row.market_key, last_update: row.last_update || row.updated_at, outcomes: [] };
+        bookmaker.markets.push(market);
+      }
+
+      market.outcomes.push(row.point === null
+        ? { name: row.outcome_name, price: row.price }
+        : { name: row.outcome_name, price: row.price, point: row.point });
+    }
+    return Array.from(events.values());
+  }
+
+  async getOddsAnalytics(eventId: string): Promise<{
+    selections: OddsSelectionAnalytics[],
+    markets: OddsMarketAnalytics[]
+  }> {
+    const selectionsResult = await this.db.prepare(
+      'SELECT * FROM odds_selection_analytics WHERE event_id = ? ORDER BY market_key, point, outcome_name'
+    ).bind(eventId).all<OddsSelectionAnalytics>();
+
+    const marketsResult = await this.db.prepare(
+      'SELECT * FROM odds_market_analytics WHERE event_id = ? ORDER BY market_key, line'
+    ).bind(eventId).all<OddsMarketAnalytics>();
+
+    return {
+      selections: selectionsResult.results || [],
+      markets: marketsResult.results || []
+    };
+  }
+
   // Search methods
   async searchSports(query: string): Promise<{
     leagues: League[],
@@ -6,6 +6,7 @@ CREATE TABLE countries (
     name VARCHAR(100) NOT NULL,
     code VARCHAR(3),  -- Alpha code of the country (2-6 characters)
     flag_url VARCHAR(255),  -- URL to country flag image
+    UNIQUE KEY uq_countries_name (name),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -22,6 +23,7 @@ CREATE TABLE leagues (
     season_end DATE,
     current_season INT,
     FOREIGN KEY (country_id) REFERENCES countries(country_id),
+    UNIQUE KEY uq_leagues_api_league_id (api_league_id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -38,6 +40,7 @@ CREATE TABLE teams (
     venue_capacity INT,
     venue_city VARCHAR(100),
     FOREIGN KEY (country_id) REFERENCES countries(country_id),
+    UNIQUE KEY uq_teams_api_team_id (api_team_id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -66,6 +69,7 @@ CREATE TABLE players (
     height VARCHAR(10),
     weight VARCHAR(10),
     photo_url VARCHAR(255),
+    UNIQUE KEY uq_players_api_player_id (api_player_id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -109,9 +113,11 @@ CREATE TABLE fixtures (
     extratime_away_score INT,
     penalty_home_score INT,
     penalty_away_score INT,
+    details_updated_at DATETIME,  -- When events and statistics were last fetched
     FOREIGN KEY (league_id) REFERENCES leagues(league_id),
     FOREIGN KEY (home_team_id) REFERENCES teams(team_id),
     FOREIGN KEY (away_team_id) REFERENCES teams(team_id),
+    UNIQUE KEY uq_fixtures_api_fixture_id (api_fixture_id),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
@@ -144,6 +150,7 @@ CREATE TABLE statistics (
     stat_value VARCHAR(50) NOT NULL,  -- Could be numeric or percentage
     FOREIGN KEY (fixture_id) REFERENCES fixtures(fixture_id),
     FOREIGN KEY (team_id) REFERENCES teams(team_id),
+    UNIQUE KEY uq_statistics_fixture_team_type (fixture_id, team_id, stat_type),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -167,7 +174,9 @@ CREATE TABLE player_statistics (
     FOREIGN KEY (fixture_id) REFERENCES fixtures(fixture_id),
     FOREIGN KEY (player_id) REFERENCES players(player_id),
     FOREIGN KEY (team_id) REFERENCES teams(team_id),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    UNIQUE KEY uq_player_statistics_fixture_player (fixture_id, player_id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Standings Table
@@ -203,15 +212,240 @@ CREATE TABLE api_request_log (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- API Request Hourly Table (request log rows rolled up by log_retention.py)
+CREATE TABLE api_request_hourly (
+    hour_start DATETIME NOT NULL,
+    endpoint VARCHAR(100) NOT NULL,
+    response_status INT NOT NULL,  -- 0 when the request got no response
+    request_count INT NOT NULL,
+    total_response_time DECIMAL(14,3) NOT NULL,  -- in seconds
+    max_response_time DECIMAL(10,3),
+    PRIMARY KEY (hour_start, endpoint, response_status)
+);
+
+-- Team Form Table (materialized from finished fixtures by team_form.py)
+CREATE TABLE team_form (
+    team_id INT PRIMARY KEY,
+    form VARCHAR(10),  -- Last 10 results, oldest first (W, D, L)
+    recent_fixture_ids VARCHAR(255),  -- Comma-separated fixture_ids matching form
+    win INT NOT NULL DEFAULT 0,  -- Wins within the form window
+    draw INT NOT NULL DEFAULT 0,
+    lose INT NOT NULL DEFAULT 0,
+    last_fixture_date DATETIME,
+    FOREIGN KEY (team_id) REFERENCES teams(team_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Head-to-Head Table (all-time record per team pair, materialized by team_form.py)
+CREATE TABLE head_to_head (
+    team_a_id INT NOT NULL,  -- Lower team_id of the pair
+    team_b_id INT NOT NULL,  -- Higher team_id of the pair
+    played INT NOT NULL DEFAULT 0,
+    team_a_wins INT NOT NULL DEFAULT 0,
+    team_b_wins INT NOT NULL DEFAULT 0,
+    draws INT NOT NULL DEFAULT 0,
+    team_a_goals INT NOT NULL DEFAULT 0,
+    team_b_goals INT NOT NULL DEFAULT 0,
+    recent_fixture_ids VARCHAR(255),  -- Last 10 meetings, oldest first
+    last_fixture_date DATETIME,
+    PRIMARY KEY (team_a_id, team_b_id),
+    FOREIGN KEY (team_a_id) REFERENCES teams(team_id),
+    FOREIGN KEY (team_b_id) REFERENCES teams(team_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Ingest Work Units Table (league-season leases claimed by sharded workers)
+CREATE TABLE ingest_work_units (
+    unit_id INT PRIMARY KEY AUTO_INCREMENT,
+    league_id INT NOT NULL,
+    season INT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, running, done, failed
+    worker_id VARCHAR(100),  -- host:pid of the worker holding the lease
+    lease_token VARCHAR(36),  -- Changes on every claim so stale workers can't complete a unit
+    lease_expires_at DATETIME,
+    heartbeat_at DATETIME,
+    attempts INT NOT NULL DEFAULT 0,
+    last_error TEXT,
+    FOREIGN KEY (league_id) REFERENCES leagues(league_id),
+    UNIQUE KEY (league_id, season),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Odds Events Table (events polled from The Odds API by odds_data_fetcher.py)
+CREATE TABLE odds_events (
+    event_id VARCHAR(64) PRIMARY KEY,  -- The Odds API event id
+    sport_key VARCHAR(100) NOT NULL,
+    sport_title VARCHAR(100),
+    commence_time DATETIME,
+    home_team VARCHAR(100),
+    away_team VARCHAR(100),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Odds Prices Table (latest price per bookmaker/market/outcome)
+CREATE TABLE odds_prices (
+    event_id VARCHAR(64) NOT NULL,
+    bookmaker_key VARCHAR(50) NOT NULL,
+    bookmaker_title VARCHAR(100),
+    market_key VARCHAR(50) NOT NULL,  -- h2h, spreads, totals
+    outcome_name VARCHAR(100) NOT NULL,
+    price INT NOT NULL,  -- American odds
+    point DECIMAL(6,2),  -- Handicap or total line
+    last_update DATETIME,  -- Bookmaker's last update for the market
+    PRIMARY KEY (event_id, bookmaker_key, market_key, outcome_name),
+    FOREIGN KEY (event_id) REFERENCES odds_events(event_id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Odds History Blocks Table (delta-encoded price changes per series, see odds_history.py)
+CREATE TABLE odds_history_blocks (
+    block_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    event_id VARCHAR(64) NOT NULL,
+    bookmaker_key VARCHAR(50) NOT NULL,
+    market_key VARCHAR(50) NOT NULL,
+    outcome_name VARCHAR(100) NOT NULL,
+    block_start DATETIME NOT NULL,  -- Time of the first change in the block (UTC)
+    block_end DATETIME NOT NULL,  -- Time of the last change in the block (UTC)
+    point_count INT NOT NULL,
+    prev_price INT,  -- Price in effect before the block, NULL for the first block
+    prev_point DECIMAL(6,2),
+    last_price INT NOT NULL,
+    last_point DECIMAL(6,2),
+    time_deltas BLOB,  -- Zigzag varint seconds since the previous change
+    price_deltas BLOB,  -- Zigzag varint price changes
+    point_deltas BLOB,  -- Varint point changes in hundredths, 0 marks no point
+    UNIQUE KEY (event_id, bookmaker_key, market_key, outcome_name, block_start),
+    INDEX idx_odds_history_blocks_event_end (event_id, block_end)
+);
+
+-- Odds History Series Table (opening and latest price per series)
+CREATE TABLE odds_history_series (
+    event_id VARCHAR(64) NOT NULL,
+    bookmaker_key VARCHAR(50) NOT NULL,
+    market_key VARCHAR(50) NOT NULL,
+    outcome_name VARCHAR(100) NOT NULL,
+    opened_at DATETIME NOT NULL,
+    open_price INT NOT NULL,
+    open_point DECIMAL(6,2),
+    latest_at DATETIME NOT NULL,
+    latest_price INT NOT NULL,
+    latest_point DECIMAL(6,2),
+    change_count INT NOT NULL DEFAULT 1,
+    PRIMARY KEY (event_id, bookmaker_key, market_key, outcome_name)
+);
+
+-- Odds History OHLC Table (open/high/low/close per series and hourly interval)
+CREATE TABLE odds_history_ohlc (
+    event_id VARCHAR(64) NOT NULL,
+    bookmaker_key VARCHAR(50) NOT NULL,
+    market_key VARCHAR(50) NOT NULL,
+    outcome_name VARCHAR(100) NOT NULL,
+    interval_start DATETIME NOT NULL,
+    open_price INT NOT NULL,  -- First price recorded in the interval
+    high_price INT NOT NULL,
+    low_price INT NOT NULL,
+    close_price INT NOT NULL,  -- Last price recorded in the interval
+    open_point DECIMAL(6,2),
+    close_point DECIMAL(6,2),
+    changes INT NOT NULL DEFAULT 1,
+    PRIMARY KEY (event_id, market_key, bookmaker_key, outcome_name, interval_start)
+);
+
+-- Odds Selection Analytics Table (best price and consensus per selection, see odds_analytics.py)
+CREATE TABLE odds_selection_analytics (
+    event_id VARCHAR(64) NOT NULL,
+    market_key VARCHAR(50) NOT NULL,
+    outcome_name VARCHAR(100) NOT NULL,
+    point DECIMAL(6,2) NOT NULL DEFAULT 0,  -- 0 for markets without a line
+    best_bookmaker_key VARCHAR(50) NOT NULL,
+    best_price INT NOT NULL,  -- American odds
+    implied_probability DECIMAL(8,6),  -- Of the best price
+    consensus_probability DECIMAL(8,6),  -- Mean no-vig probability across bookmakers
+    value_edge DECIMAL(8,6),  -- Expected return of the best price at the consensus probability
+    is_value BOOLEAN NOT NULL DEFAULT FALSE,
+    bookmakers INT NOT NULL,
+    computed_at DATETIME NOT NULL,
+    PRIMARY KEY (event_id, market_key, outcome_name, point)
+);
+
+-- Odds Market Analytics Table (margins and arbitrage per event market line)
+CREATE TABLE odds_market_analytics (
+    event_id VARCHAR(64) NOT NULL,
+    market_key VARCHAR(50) NOT NULL,
+    line DECIMAL(6,2) NOT NULL DEFAULT 0,  -- Home-side spread or total, 0 for h2h
+    min_overround DECIMAL(8,6),  -- Lowest bookmaker margin (sum of implied probabilities)
+    avg_overround DECIMAL(8,6),
+    best_price_total DECIMAL(8,6),  -- Sum of implied probabilities of the best prices
+    is_arbitrage BOOLEAN NOT NULL DEFAULT FALSE,  -- best_price_total below 1 with every outcome priced
+    outcomes INT NOT NULL,
+    computed_at DATETIME NOT NULL,
+    PRIMARY KEY (event_id, market_key, line)
+);
+
+-- Bets Table (settled server-side by bet_settlement.py)
+CREATE TABLE bets (
+    bet_id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    user_id VARCHAR(100) NOT NULL,
+    fixture_id INT NOT NULL,
+    bet_type VARCHAR(20) NOT NULL,  -- moneyline, spread, total, props
+    selection VARCHAR(100) NOT NULL,  -- Display text shown in the bet slip
+    side VARCHAR(10) NOT NULL,  -- home, away, draw, over, under
+    line DECIMAL(6,2),  -- Spread for the chosen side or total line, NULL for moneyline
+    odds INT NOT NULL,  -- American odds
+    stake DECIMAL(12,2) NOT NULL,
+    potential_payout DECIMAL(12,2) NOT NULL,  -- Stake included
+    payout DECIMAL(12,2),
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, won, lost, cancelled
+    placed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    settled_at DATETIME,
+    FOREIGN KEY (fixture_id) REFERENCES fixtures(fixture_id)
+);
+
+-- Wallets Table
+CREATE TABLE wallets (
+    user_id VARCHAR(100) PRIMARY KEY,
+    balance DECIMAL(12,2) NOT NULL DEFAULT 0,
+    currency VARCHAR(3) NOT NULL DEFAULT 'USD',
+    pending_bets DECIMAL(12,2) NOT NULL DEFAULT 0,  -- Stakes of unsettled bets
+    total_won DECIMAL(12,2) NOT NULL DEFAULT 0,
+    total_lost DECIMAL(12,2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Entity Links Table (provider entities linked to API-Sports rows by entity_resolution.py)
+CREATE TABLE entity_links (
+    entity_type VARCHAR(20) NOT NULL,  -- country, team
+    provider VARCHAR(30) NOT NULL,  -- sportradar, odds
+    provider_id VARCHAR(100) NOT NULL,  -- Provider's ID, or the name where it has none
+    canonical_id INT,  -- countries.country_id, teams.team_id or players.player_id; NULL when unmatched
+    score DECIMAL(4,3),  -- Match score of automatic links
+    source VARCHAR(10) NOT NULL DEFAULT 'auto',  -- auto or manual
+    name VARCHAR(100),
+    resolved_at DATETIME,
+    PRIMARY KEY (entity_type, provider, provider_id),
+    INDEX idx_entity_links_canonical (entity_type, canonical_id)
+);
+
 -- Indexes for performance optimization
 CREATE INDEX idx_leagues_country ON leagues(country_id);
 CREATE INDEX idx_teams_country ON teams(country_id);
 CREATE INDEX idx_fixtures_league ON fixtures(league_id);
 CREATE INDEX idx_fixtures_teams ON fixtures(home_team_id, away_team_id);
+CREATE INDEX idx_fixtures_away_team ON fixtures(away_team_id);
 CREATE INDEX idx_fixtures_date ON fixtures(fixture_date);
 CREATE INDEX idx_events_fixture ON events(fixture_id);
 CREATE INDEX idx_events_player ON events(player_id);
 CREATE INDEX idx_statistics_fixture ON statistics(fixture_id, team_id);
 CREATE INDEX idx_player_statistics_fixture ON player_statistics(fixture_id);
 CREATE INDEX idx_player_statistics_player ON player_statistics(player_id);
-CREATE INDEX idx_standings_league_season ON standings(league_id, season);
\ No newline at end of file
+CREATE INDEX idx_standings_league_season ON standings(league_id, season);
+CREATE INDEX idx_work_units_claim ON ingest_work_units(status, lease_expires_at);
+CREATE INDEX idx_odds_events_sport ON odds_events(sport_key, commence_time);
+CREATE INDEX idx_bets_fixture_status ON bets(fixture_id, status);
+CREATE INDEX idx_bets_user ON bets(user_id, placed_at);
+CREATE INDEX idx_fixtures_updated ON fixtures(updated_at);
+CREATE INDEX idx_standings_updated ON standings(updated_at);
+CREATE INDEX idx_player_statistics_updated ON player_statistics(updated_at);
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Cross-Provider Entity Resolution
+
+Links the countries and teams of the other providers to the API-Sports
+rows describing the same entity, and stores the links in
+entity_links:
+
+    (entity_type, provider, provider_id) -> canonical_id
+
+canonical_id is the internal row ID (countries.country_id or
+teams.team_id), not the API-Sports ID of the entity. A unified view then
+joins providers on that key instead of fuzzy-matching names at query time,
+e.g. the odds of a team:
+
+    SELECT e.* FROM odds_events e
+    JOIN entity_links l ON l.entity_type = 'team' AND l.provider = 'odds'
+                       AND l.provider_id = e.home_team
+    WHERE l.canonical_id = %s
+
+API-Sports only covers football, so teams are only resolved from provider
+sources of the same sport (The Odds API's soccer events). Countries are
+shared by every sport and are resolved from all of them. No provider has
+football players, so players are not linked.
+
+The links are built offline. The API-Sports side is loaded into an index
+of normalized names and name trigrams. Each provider entity is looked up
+by exact normalized name first, and otherwise by the API-Sports entities
+sharing the most trigrams. The candidates are scored on trigram
+similarity and country. A link is kept only
+when the best score reaches MATCH_THRESHOLD and beats the runner-up by
+AMBIGUITY_MARGIN. Otherwise the entity is recorded as unmatched.
+
+A refresh only resolves provider entities without a link row. Unmatched
+entities are retried when API-Sports rows were added after they were
+resolved. Manual overrides (source 'manual') are never replaced by a
+refresh. odds_data_fetcher.py refreshes the team links after storing new
+soccer events:
+
+    python entity_resolution.py                      # refresh all links
+    python entity_resolution.py --type team
+    python entity_resolution.py --link team odds "Man Utd" 42   # teams.team_id, not api_team_id
+    python entity_resolution.py --link country sportradar "Chinese Taipei" none
+    python entity_resolution.py --unlink team odds "Man Utd"
+"""
+
+import re
+import sys
+import logging
+import argparse
+import unicodedata
+import mysql.connector
+from datetime import datetime
+from collections import Counter, defaultdict
+
+logger = logging.getLogger("entity_resolution")
+
+SOURCE_AUTO = "auto"
+SOURCE_MANUAL = "manual"
+
+MATCH_THRESHOLD = 0.8
+AMBIGUITY_MARGIN = 0.05
+CANDIDATE_LIMIT = 20
+# Trigrams shared by more entities than this carry little signal and are skipped
+MAX_POSTINGS = 5000
+LINK_BATCH_SIZE = 500
+
+# API-Sports rows each entity type is resolved against
+CANONICAL_QUERIES = {
+    "country": "SELECT country_id AS id, name, created_at FROM countries",
+    "team": """
+        SELECT t.team_id AS id, t.name, c.name AS country, t.created_at
+        FROM teams t LEFT JOIN countries c ON c.country_id = t.country_id
+    """,
+}
+
+# (entity_type, provider, query, params) returning provider_id, name and the
+# optional country column. The Odds API has
+# no team IDs, so its team names are the provider IDs. Only countries come
+# from other sports than football: a tennis player or cricket team can only
+# be linked to a footballer or football club of the same name by mistake.
+PROVIDER_SOURCES = (
+    ("country", "sportradar", """
+        SELECT DISTINCT nationality AS provider_id, nationality AS name FROM tennis_players
+        WHERE nationality IS NOT NULL
+        UNION
+        SELECT DISTINCT nationality, nationality FROM cricket_players WHERE nationality IS NOT NULL
+    """, ()),
+    ("team", "odds", """
+        SELECT DISTINCT home_team AS provider_id, home_team AS name FROM odds_events
+        WHERE home_team IS NOT NULL AND sport_key LIKE %s
+        UNION
+        SELECT DISTINCT away_team, away_team FROM odds_events
+        WHERE away_team IS NOT NULL AND sport_key LIKE %s
+    """, ("soccer%", "soccer%")),
+)
+
+# Words that don't tell teams apart ("Arsenal FC" is "Arsenal")
+TEAM_NOISE = frozenset(("fc", "afc", "cf", "sc", "ac", "club", "the", "calcio"))
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize(name, noise=frozenset()):
+    """Lowercase ASCII name without accents, punctuation or noise words."""
+    if not name:
+        return ""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    tokens = _NON_WORD.sub(" ", name.replace("-", " ")).split()
+    return " ".join(token for token in tokens if token not in noise)
+
+
+def trigrams(normalized):
+    """Set of the character trigrams of a normalized name, word edges included."""
+    padded = f"  {normalized} "
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+def similarity(grams, other):
+    """Dice coefficient of two trigram sets."""
+    if not grams or not other:
+        return 0.0
+    return 2 * len(grams & other) / (len(grams) + len(other))
+
+
+class Entity:
+    """Normalized name, trigrams and attributes of one entity."""
+
+    __slots__ = ("id", "name", "normalized", "grams", "country")
+
+    def __init__(self, entity_type, row, id_field):
+        self.id = row[id_field]
+        self.name = row["name"]
+        self.normalized = normalize(row["name"], TEAM_NOISE if entity_type == "team" else frozenset())
+        self.grams = trigrams(self.normalized)
+        self.country = normalize(row.get("country"))
+
+
+class CandidateIndex:
+    """Exact-name and trigram index of the API-Sports entities of one type."""
+
+    def __init__(self, entities):
+        self.entities = {}
+        self.exact = defaultdict(list)    # normalized name -> entity IDs
+        self.postings = defaultdict(list)  # trigram -> entity IDs
+        for entity in entities:
+            self.add(entity)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def add(self, entity):
+        if not entity.normalized:
+            return
+        self.entities[entity.id] = entity
+        self.exact[entity.normalized].append(entity.id)
+        for gram in entity.grams:
+            self.postings[gram].append(entity.id)
+
+    def candidates(self, entity, limit=CANDIDATE_LIMIT):
+        """Return the entities that could be the same as entity."""
+        ids = list(self.exact.get(entity.normalized, []))
+        if not ids:
+            shared = Counter()
+            for gram in entity.grams:
+                posting = self.postings.get(gram)
+                if posting and len(posting) <= MAX_POSTINGS:
+                    shared.update(posting)
+            ids = [entity_id for entity_id, _ in shared.most_common(limit)]
+        return [self.entities[entity_id] for entity_id in ids]
+
+
+def score(entity, candidate):
+    """Score in [0, 1] that two entities are the same."""
+    if entity.normalized == candidate.normalized:
+        value = 1.0
+    else:
+        value = similarity(entity.grams, candidate.grams)
+        # "Tottenham" against "Tottenham Hotspur"
+        tokens, other = set(entity.normalized.split()), set(candidate.normalized.split())
+        if tokens <= other or other <= tokens:
+            value = max(value, 0.85)
+
+    if entity.country and candidate.country:
+        value += 0.05 if entity.country == candidate.country else -0.1
+    return max(0.0, min(value, 1.0))
+
+
+def best_match(entity, index):
+    """Return (canonical_id, score) of the best unambiguous candidate, (None, best score) if none."""
+    ranked = sorted((score(entity, candidate), candidate.id) for candidate in index.candidates(entity))
+    if not ranked:
+        return None, 0.0
+    best_score, best_id = ranked[-1]
+    runner_up = ranked[-2][0] if len(ranked) > 1 else 0.0
+    if best_score >= MATCH_THRESHOLD and best_score - runner_up >= AMBIGUITY_MARGIN:
+        return best_id, best_score
+    return None, best_score
+
+
+class EntityResolver:
+    """Class to build, override and look up cross-provider entity links."""
+
+    def __init__(self, db_conn):
+        """Initialize the resolver.
+
+        Args:
+            db_conn: Open database connection
+        """
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor(dictionary=True)
+        self.links = {}  # (entity_type, provider) -> {provider_id: canonical_id}
+
+    def _load_index(self, entity_type):
+        self.db_cursor.execute(CANONICAL_QUERIES[entity_type])
+        rows = self.db_cursor.fetchall()
+        newest = max((row["created_at"] for row in rows if row.get("created_at")), default=None)
+        return CandidateIndex(Entity(entity_type, row, "id") for row in rows), newest
+
+    def _existing_links(self, entity_type, provider):
+        self.db_cursor.execute(
+            """
+            SELECT provider_id, canonical_id, source, resolved_at FROM entity_links
+            WHERE entity_type = %s AND provider = %s
+            """,
+            (entity_type, provider)
+        )
+        return {row["provider_id"]: row for row in self.db_cursor.fetchall()}
+
+    def _write_links(self, rows):
+        for start in range(0, len(rows), LINK_BATCH_SIZE):
+            batch = rows[start:start + LINK_BATCH_SIZE]
+            placeholder = "(%s, %s, %s, %s, %s, %s, %s, %s)"
+            self.db_cursor.execute(
+                f"""
+                INSERT INTO entity_links
+                    (entity_type, provider, provider_id, canonical_id, score, source, name, resolved_at)
+                VALUES {", ".join([placeholder] * len(batch))}
+                ON DUPLICATE KEY UPDATE
+                    canonical_id = VALUES(canonical_id), score = VALUES(score), source = VALUES(source),
+                    name = VALUES(name), resolved_at = VALUES(resolved_at)
+                """,
+                [value for row in batch for value in row]
+            )
+        self.db_conn.commit()
+
+    def refresh(self, entity_types=None):
+        """Resolve the provider entities that have no link yet.
+
+        Unmatched entities are retried if API-Sports rows were added since
+        they were resolved. Manual links are left alone.
+
+        Args:
+            entity_types (iterable, optional): Entity types to refresh (default: all)
+
+        Returns:
+            dict: (entity_type, provider) -> (resolved, linked) counts
+        """
+        results = {}
+        indexes = {}
+        for entity_type, provider, query, params in PROVIDER_SOURCES:
+            if entity_types is not None and entity_type not in entity_types:
+                continue
+            try:
+                self.db_cursor.execute(query, params)
+                rows = self.db_cursor.fetchall()
+            except mysql.connector.Error as err:
+                logger.warning(f"Skipping {provider} {entity_type} entities: {err}")
+                continue
+
+            if entity_type not in indexes:
+                indexes[entity_type] = self._load_index(entity_type)
+            index, newest = indexes[entity_type]
+
+            existing = self._existing_links(entity_type, provider)
+            pending = []
+            for row in rows:
+                link = existing.get(row["provider_id"])
+                if link is None or (
+                    link["source"] == SOURCE_AUTO and link["canonical_id"] is None
+                    and newest is not None and link["resolved_at"] is not None
+                    and str(link["resolved_at"]) < str(newest)
+                ):
+                    pending.append(row)
+
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            link_rows = []
+            linked = 0
+            for row in pending:
+                entity = Entity(entity_type, row, "provider_id")
+                canonical_id, match_score = best_match(entity, index) if entity.normalized else (None, 0.0)
+                linked += canonical_id is not None
+                link_rows.append((
+                    entity_type, provider, row["provider_id"], canonical_id, round(match_score, 3),
+                    SOURCE_AUTO, (row["name"] or "")[:100], now
+                ))
+            self._write_links(link_rows)
+            self.links.pop((entity_type, provider), None)
+
+            results[(entity_type, provider)] = (len(pending), linked)
+            logger.info(f"Resolved {len(pending)} new {provider} {entity_type} entities against "
+                        f"{len(index)} API-Sports rows, {linked} linked")
+        return results
+
+    def set_link(self, entity_type, provider, provider_id, canonical_id, name=None):
+        """Store a manual link that refreshes never replace.
+
+        Args:
+            canonical_id (int): Internal country_id or team_id, or
+                None to keep the entity unlinked
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._write_links([(entity_type, provider, provider_id, canonical_id, None, SOURCE_MANUAL,
+                            (name or provider_id)[:100], now)])
+        self.links.pop((entity_type, provider), None)
+
+    def clear_link(self, entity_type, provider, provider_id):
+        """Remove a link, manual or not, so the next refresh resolves the entity again."""
+        self.db_cursor.execute(
+            "DELETE FROM entity_links WHERE entity_type = %s AND provider = %s AND provider_id = %s",
+            (entity_type, provider, provider_id)
+        )
+        self.db_conn.commit()
+        self.links.pop((entity_type, provider), None)
+
+    def linked_id(self, entity_type, provider, provider_id):
+        """Return the internal row ID linked to a provider entity, None if there is none.
+
+        The links of an (entity_type, provider) pair are loaded once and then
+        looked up in memory.
+        """
+        links = self.links.get((entity_type, provider))
+        if links is None:
+            self.db_cursor.execute(
+                """
+                SELECT provider_id, canonical_id FROM entity_links
+                WHERE entity_type = %s AND provider = %s AND canonical_id IS NOT NULL
+                """,
+                (entity_type, provider)
+            )
+            links = {row["provider_id"]: row["canonical_id"] for row in self.db_cursor.fetchall()}
+            self.links[(entity_type, provider)] = links
+        return links.get(provider_id)
+
+
+def main():
+    """Main function to refresh or override entity links."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Link provider entities to API-Sports rows")
+    parser.add_argument("--type", type=str, nargs="+", choices=sorted(CANONICAL_QUERIES),
+                        help="Entity types to refresh (default: all)")
+    parser.add_argument("--link", type=str, nargs=4, metavar=("TYPE", "PROVIDER", "PROVIDER_ID", "CANONICAL_ID"),
+                        help="Store a manual link to a country_id or team_id; "
+                             "a CANONICAL_ID of 'none' keeps the entity unlinked")
+    parser.add_argument("--unlink", type=str, nargs=3, metavar=("TYPE", "PROVIDER", "PROVIDER_ID"),
+                        help="Remove a link so the next refresh resolves the entity again")
+
+    args = parser.parse_args()
+
+    from sports_data_fetcher import DB_CONFIG
+    from storage import get_backend
+
+    try:
+        db_conn = get_backend(DB_CONFIG).connect()
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        sys.exit(1)
+
+    resolver = EntityResolver(db_conn)
+    try:
+        if args.link:
+            entity_type, provider, provider_id, canonical_id = args.link
+            canonical_id = None if canonical_id.lower() == "none" else int(canonical_id)
+            resolver.set_link(entity_type, provider, provider_id, canonical_id)
+            logger.info(f"Linked {provider} {entity_type} {provider_id} to {canonical_id}")
+        elif args.unlink:
+            resolver.clear_link(*args.unlink)
+            logger.info(f"Unlinked {args.unlink[1]} {args.unlink[0]} {args.unlink[2]}")
+        else:
+            resolver.refresh(args.type)
+    except mysql.connector.Error as err:
+        logger.error(f"Entity resolution failed: {err}")
+        sys.exit(1)
+    finally:
+        db_conn.close()
+
+if __name__ == "__main__":
+    main()
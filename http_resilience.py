@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - HTTP Resilience Helpers
+
+This module wraps the HTTP calls of the provider clients with timeouts,
+bounded retries and a circuit breaker:
+
+- Every request gets a (connect, read) timeout, configurable per endpoint.
+- Connection errors, timeouts, 5xx responses and 429 rate limits are retried
+  a bounded number of times with jittered exponential backoff (or the
+  provider's Retry-After).
+- Each provider has a circuit breaker shared by all clients in the process.
+  After repeated failures it opens and requests fail immediately with
+  CircuitOpenError, so ingest runs skip a provider that is down instead of
+  waiting on it; after a cool-down one probe request is let through to test
+  whether the provider has recovered.
+"""
+
+import time
+import random
+import logging
+import threading
+import requests
+
+logger = logging.getLogger("http_resilience")
+
+DEFAULT_TIMEOUT = (3.05, 15)  # (connect, read) seconds
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1
+MAX_BACKOFF_SECONDS = 60
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT_SECONDS = 60
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while a provider's circuit is open."""
+    pass
+
+
+class CircuitBreaker:
+    """Circuit breaker counting consecutive failures of one provider."""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT_SECONDS):
+        """Initialize the breaker.
+
+        Args:
+            name (str): Provider name used in log messages
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_timeout (float): Seconds the circuit stays open before a probe
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        """'closed', 'open' or 'half_open'."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def available(self):
+        """Whether a request would currently be let through."""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.probing)
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self.probing:
+                # Let a single request through to test the provider
+                self.probing = True
+                return
+            remaining = max(0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(f"{self.name} circuit is open, next attempt in {remaining:.0f}s")
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info(f"{self.name} circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            # A failed probe reopens the circuit straight away
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning(f"{self.name} circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def release_probe(self):
+        """Let another request probe after one that failed without reaching the provider."""
+        with self.lock:
+            self.probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, **kwargs):
+    """Return the process-wide circuit breaker of a provider."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **kwargs)
+        return _breakers[name]
+
+
+class RateLimiter:
+    """Space calls at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate):
+        """Initialize the limiter.
+
+        Args:
+            rate (float): Calls per second; 0 or None means no limit
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Wait for the next free slot."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def backoff_delay(attempt, base=BACKOFF_SECONDS, cap=MAX_BACKOFF_SECONDS):
+    """Full-jitter exponential backoff for a zero-based retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ResilientSession:
+    """GET requests with per-endpoint timeouts, bounded retries and a circuit breaker."""
+
+    def __init__(self, name, session=None, timeouts=None, default_timeout=DEFAULT_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, max_backoff=MAX_BACKOFF_SECONDS,
+                 rate_limit_wait=None):
+        """Initialize the session.
+
+        Args:
+            name (str): Provider name; clients with the same name share a breaker
+            session (optional): Object with a requests-style get(), e.g. a
+                requests.Session (default: the requests module)
+            timeouts (dict, optional): Endpoint prefix -> timeout, longest prefix wins
+            default_timeout: Timeout for endpoints without an entry
+            max_retries (int): Retries after the first attempt
+            backoff (float): Base delay of the exponential backoff
+            max_backoff (float): Longest delay between attempts
+            rate_limit_wait (float, optional): Delay after a 429 without Retry-After
+                (default: the exponential backoff)
+        """
+        self.name = name
+        self.session = session or requests
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limit_wait = rate_limit_wait
+        self.breaker = get_breaker(name)
+
+    def timeout_for(self, endpoint):
+        """Return the timeout configured for an endpoint."""
+        matches = [prefix for prefix in self.timeouts if endpoint.startswith(prefix)]
+        return self.timeouts[max(matches, key=len)] if matches else self.default_timeout
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(int(retry_after), self.max_backoff)
+            if self.rate_limit_wait is not None:
+                return self.rate_limit_wait
+        return backoff_delay(attempt, self.backoff, self.max_backoff)
+
+    def get(self, url, endpoint="", **kwargs):
+        """Send a GET request, retrying transient failures.
+
+        Args:
+            url (str): Request URL
+            endpoint (str): Endpoint path used to pick the timeout and in log messages
+            **kwargs: Passed on to session.get (params, headers, hooks, ...)
+
+        Returns:
+            requests.Response: The last response; callers check its status
+
+        Raises:
+            CircuitOpenError: If the provider's circuit is open
+            requests.exceptions.RequestException: If every attempt failed
+        """
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+
+        for attempt in range(self.max_retries + 1):
+            self.breaker.before_request()
+            try:
+                response = self.session.get(url, **kwargs)
+            except RETRY_EXCEPTIONS as err:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"{self.name} request to {endpoint} failed ({err}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # Errors such as InvalidURL or TooManyRedirects say nothing about
+                # the provider, but must not leave a half-open circuit probing forever
+                self.breaker.release_probe()
+                raise
+
+            # Anything below 500 means the provider is up, even if it rejected the request
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+
+            delay = self._retry_delay(attempt, response)
+            logger.warning(
+                f"{self.name} request to {endpoint} returned {response.status_code}, "
+                f"retrying in {delay:.1f}s (attempt {attempt + 1} of {self.max_retries})"
+            )
+            time.sleep(delay)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - JSON Decode and Extraction Layer
+
+This module decodes provider responses with orjson (falling back to the
+standard library when it isn't installed) and turns nested payload items
+into flat row tuples with extractors compiled once from dotted field paths.
+A compiled extractor looks up each shared parent object once and never
+builds the throwaway {} defaults of chained .get() calls.
+
+Run it directly to benchmark the CPU cost per fixture against the previous
+json + .get() chain approach:
+
+    python json_extract.py --fixtures 5000
+"""
+
+import json
+import time
+import argparse
+import requests
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_EMPTY = MappingProxyType({})
+
+# API-Sports fixture item -> row; the score columns are kept contiguous so
+# they can be passed to SQL as one slice
+FIXTURE_PATHS = (
+    "fixture.id",
+    "fixture.date",
+    "fixture.status.short",
+    "league.round",
+    "league.id",
+    "league.season",
+    "fixture.venue.name",
+    "fixture.referee",
+    "teams.home.id",
+    "teams.away.id",
+    "goals.home",
+    "goals.away",
+    "score.halftime.home",
+    "score.halftime.away",
+    "score.fulltime.home",
+    "score.fulltime.away",
+    "score.extratime.home",
+    "score.extratime.away",
+    "score.penalty.home",
+    "score.penalty.away",
+)
+(FIXTURE_ID, FIXTURE_DATE, FIXTURE_STATUS, FIXTURE_ROUND, FIXTURE_LEAGUE, FIXTURE_SEASON,
+ FIXTURE_VENUE, FIXTURE_REFEREE, FIXTURE_HOME_TEAM, FIXTURE_AWAY_TEAM, FIXTURE_HOME_GOALS,
+ FIXTURE_AWAY_GOALS) = range(12)
+FIXTURE_SCORES = slice(10, 20)
+
+# Items of the "events" list of a fixture detail
+EVENT_PATHS = (
+    "team.id",
+    "player.id",
+    "assist.id",
+    "type",
+    "detail",
+    "time.elapsed",
+    "time.extra",
+    "comments",
+    "player.name",
+    "assist.name",
+)
+EVENT_TEAM, EVENT_PLAYER, EVENT_ASSIST = range(3)
+EVENT_PLAYER_NAME, EVENT_ASSIST_NAME = 8, 9
+EVENT_FIELDS = slice(1, 8)
+
+# First entry of a player's "statistics" list in a fixture detail
+PLAYER_STAT_PATHS = (
+    "games.minutes",
+    "games.rating",
+    "shots.total",
+    "shots.on",
+    "goals.total",
+    "goals.assists",
+    "passes.total",
+    "passes.accuracy",
+    "passes.key",
+    "cards.yellow",
+    "cards.red",
+)
+
+
+def loads(data):
+    """Decode JSON bytes or text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_response(response):
+    """Decode the JSON body of a requests response.
+
+    Raises:
+        requests.exceptions.InvalidJSONError: If the body isn't valid JSON
+    """
+    try:
+        return loads(response.content)
+    except ValueError as err:
+        raise requests.exceptions.InvalidJSONError(f"Invalid JSON in response from {response.url}: {err}")
+
+
+def compile_extractor(paths):
+    """Compile dotted field paths into a function returning a tuple of values.
+
+    Missing or null objects along a path yield None for that field. Items
+    that have every field are read with plain subscripts; only items with a
+    missing field take the slower .get() path.
+
+    Args:
+        paths (iterable): Dotted paths such as "fixture.status.short"
+
+    Returns:
+        function: item -> tuple with one value per path
+    """
+    names = {"": "item"}
+    fast_lines, safe_lines = [], []
+    fast_values, safe_values = [], []
+    for path in paths:
+        keys = path.split(".")
+        for depth in range(1, len(keys)):
+            prefix = ".".join(keys[:depth])
+            if prefix not in names:
+                names[prefix] = f"_{len(names)}"
+                parent = names[".".join(keys[:depth - 1])]
+                fast_lines.append(f"        {names[prefix]} = {parent}[{keys[depth - 1]!r}]")
+                safe_lines.append(f"    {names[prefix]} = {parent}.get({keys[depth - 1]!r}) or _EMPTY")
+        parent = names[".".join(keys[:-1])]
+        fast_values.append(f"{parent}[{keys[-1]!r}]")
+        safe_values.append(f"{parent}.get({keys[-1]!r})")
+
+    source = "\n".join([
+        "def extract_safe(item):",
+        *safe_lines,
+        f"    return ({', '.join(safe_values)},)",
+        "def extract(item):",
+        "    try:",
+        *fast_lines,
+        f"        return ({', '.join(fast_values)},)",
+        "    except (KeyError, TypeError):",
+        "        return extract_safe(item)",
+    ])
+    namespace = {"_EMPTY": _EMPTY}
+    exec(source, namespace)
+    return namespace["extract"]
+
+
+extract_fixture = compile_extractor(FIXTURE_PATHS)
+extract_event = compile_extractor(EVENT_PATHS)
+extract_player_stats = compile_extractor(PLAYER_STAT_PATHS)
+
+
+def _sample_fixture(index):
+    """A fixture item shaped like an API-Sports /fixtures response item."""
+    return {
+        "fixture": {
+            "id": 1000000 + index, "referee": "M. Oliver", "timezone": "UTC",
+            "date": "2023-08-11T19:00:00+00:00", "timestamp": 1691780400,
+            "periods": {"first": 1691780400, "second": 1691784000},
+            "venue": {"id": 512, "name": "Turf Moor", "city": "Burnley"},
+            "status": {"long": "Match Finished", "short": "FT", "elapsed": 90},
+        },
+        "league": {
+            "id": 39, "name": "Premier League", "country": "England",
+            "logo": "https://media.api-sports.io/football/leagues/39.png",
+            "flag": "https://media.api-sports.io/flags/gb.svg",
+            "season": 2023, "round": "Regular Season - 1",
+        },
+        "teams": {
+            "home": {"id": 44, "name": "Burnley", "logo": "https://media.api-sports.io/football/teams/44.png", "winner": False},
+            "away": {"id": 50, "name": "Manchester City", "logo": "https://media.api-sports.io/football/teams/50.png", "winner": True},
+        },
+        "goals": {"home": 0, "away": 3},
+        "score": {
+            "halftime": {"home": 0, "away": 2},
+            "fulltime": {"home": 0, "away": 3},
+            "extratime": {"home": None, "away": None},
+            "penalty": {"home": None, "away": None},
+        },
+    }
+
+
+def _chained_get_row(fixture_data):
+    """The previous extraction: per-field .get() chains with {} defaults."""
+    fixture = fixture_data["fixture"]
+    league = fixture_data["league"]
+    teams = fixture_data["teams"]
+    goals = fixture_data["goals"]
+    score = fixture_data["score"]
+    return (
+        fixture["id"], fixture.get("date"), fixture.get("status", {}).get("short"),
+        league.get("round"), league["id"], league.get("season"),
+        fixture.get("venue", {}).get("name"), fixture.get("referee"),
+        teams["home"]["id"], teams["away"]["id"], goals.get("home"), goals.get("away"),
+        score.get("halftime", {}).get("home"), score.get("halftime", {}).get("away"),
+        score.get("fulltime", {}).get("home"), score.get("fulltime", {}).get("away"),
+        score.get("extratime", {}).get("home"), score.get("extratime", {}).get("away"),
+        score.get("penalty", {}).get("home"), score.get("penalty", {}).get("away"),
+    )
+
+
+def _best_time(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(fixtures=5000, repeat=5):
+    """Compare decode and extraction cost per fixture.
+
+    Returns:
+        dict: Microseconds per fixture for each stage
+    """
+    payload = json.dumps({"response": [_sample_fixture(i) for i in range(fixtures)]}).encode()
+    items = json.loads(payload)["response"]
+    assert [_chained_get_row(item) for item in items] == [extract_fixture(item) for item in items]
+
+    results = {
+        "decode_json": _best_time(lambda: json.loads(payload), repeat),
+        "decode_fast": _best_time(lambda: loads(payload), repeat),
+        "extract_chained_get": _best_time(lambda: [_chained_get_row(item) for item in items], repeat),
+        "extract_compiled": _best_time(lambda: [extract_fixture(item) for item in items], repeat),
+    }
+    return {name: seconds / fixtures * 1e6 for name, seconds in results.items()}
+
+
+def main():
+    """Main function to run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark JSON decoding and fixture extraction")
+    parser.add_argument("--fixtures", type=int, default=5000, help="Fixtures in the synthetic payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+
+    args = parser.parse_args()
+
+    results = benchmark(args.fixtures, args.repeat)
+    decoder = "orjson" if orjson is not None else "json (orjson not installed)"
+    print(f"CPU time per fixture over {args.fixtures} fixtures (best of {args.repeat}):")
+    print(f"  decode   json.loads:        {results['decode_json']:7.2f} us")
+    print(f"  decode   {decoder + ':':<19}{results['decode_fast']:7.2f} us")
+    print(f"  extract  chained .get():    {results['extract_chained_get']:7.2f} us")
+    print(f"  extract  compiled paths:    {results['extract_compiled']:7.2f} us")
+    before = results["decode_json"] + results["extract_chained_get"]
+    after = results["decode_fast"] + results["extract_compiled"]
+    print(f"  total                       {before:7.2f} us -> {after:.2f} us ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,17 @@ export interface BettingOdds {
     line: number;
   };
   last_updated: string;
+  // Present for odds read from the database once odds_analytics.py has run
+  analytics?: {
+    value_selections: {
+      market_key: string;
+      outcome_name: string;
+      best_bookmaker_key: string;
+      best_price: number;
+      value_edge: number | null;
+    }[];
+    arbitrage_markets: string[];
+  };
 }
 
 export interface Bet {
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Request Log Retention Script
+
+This script keeps api_request_log bounded. Rows older than the retention
+window are rolled up into hourly aggregates in api_request_hourly and then
+removed: whole monthly partitions are dropped when the table is partitioned
+(see setup_database.py --partition), otherwise rows are deleted one day at a
+time. It also adds upcoming monthly log partitions and season partitions for
+fixtures, so new rows never land in the catch-all partition.
+"""
+
+import sys
+import logging
+import argparse
+import mysql.connector
+from datetime import date, datetime, timedelta
+from sports_data_fetcher import DB_CONFIG, DatabaseError
+from partitions import (
+    FUTURE_PARTITION, list_partitions, add_month_partitions, add_season_partitions, month_start
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("log_retention.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("log_retention")
+
+RETENTION_MONTHS = 3
+MONTHS_AHEAD = 3
+
+# Aggregates replace rather than add, so re-running a rollup is harmless
+ROLLUP_SQL = """
+    INSERT INTO api_request_hourly
+    (hour_start, endpoint, response_status, request_count, total_response_time, max_response_time)
+    SELECT DATE_FORMAT(created_at, '%%Y-%%m-%%d %%H:00:00'), endpoint, COALESCE(response_status, 0),
+           COUNT(*), COALESCE(SUM(response_time), 0), MAX(response_time)
+    FROM api_request_log {source}
+    WHERE {condition}
+    GROUP BY 1, 2, 3
+    ON DUPLICATE KEY UPDATE
+        request_count = VALUES(request_count),
+        total_response_time = VALUES(total_response_time),
+        max_response_time = VALUES(max_response_time)
+"""
+
+
+class RequestLogRetention:
+    """Class to roll up and expire old API request log rows."""
+
+    def __init__(self, db_conn, retention_months=RETENTION_MONTHS):
+        """Initialize the job.
+
+        Args:
+            db_conn: Open MySQL connection
+            retention_months (int): Number of full months of raw rows to keep,
+                in addition to the current month
+        """
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor()
+        self.retention_months = retention_months
+
+    def cutoff(self):
+        """Rows created before this date are rolled up and removed."""
+        return month_start(date.today(), -self.retention_months)
+
+    def _cutoff_timestamp(self, cutoff):
+        self.db_cursor.execute("SELECT UNIX_TIMESTAMP(%s)", (datetime(cutoff.year, cutoff.month, 1),))
+        return int(self.db_cursor.fetchone()[0])
+
+    def expire_partitions(self, partitions):
+        """Roll up and drop every monthly partition entirely before the cutoff."""
+        cutoff = self._cutoff_timestamp(self.cutoff())
+        expired = [(name, upper) for name, upper in partitions
+                   if upper is not None and upper <= cutoff and name != FUTURE_PARTITION]
+
+        for name, upper in expired:
+            logger.info(f"Rolling up and dropping partition {name}")
+            self.db_cursor.execute(
+                ROLLUP_SQL.format(source=f"PARTITION ({name})", condition="UNIX_TIMESTAMP(created_at) < %s"),
+                (upper,)
+            )
+            self.db_conn.commit()
+            self.db_cursor.execute(f"ALTER TABLE api_request_log DROP PARTITION {name}")
+        return len(expired)
+
+    def expire_rows(self):
+        """Roll up and delete rows before the cutoff one day at a time (unpartitioned table)."""
+        cutoff = datetime.combine(self.cutoff(), datetime.min.time())
+        self.db_cursor.execute("SELECT MIN(created_at) FROM api_request_log")
+        oldest = self.db_cursor.fetchone()[0]
+        if not oldest:
+            return 0
+
+        days = 0
+        day = datetime.combine(oldest.date(), datetime.min.time())
+        while day < cutoff:
+            next_day = day + timedelta(days=1)
+            # Rollup and delete commit together, so a day is never half removed
+            self.db_cursor.execute(
+                ROLLUP_SQL.format(source="", condition="created_at >= %s AND created_at < %s"),
+                (day, next_day)
+            )
+            self.db_cursor.execute(
+                "DELETE FROM api_request_log WHERE created_at >= %s AND created_at < %s",
+                (day, next_day)
+            )
+            self.db_conn.commit()
+            day = next_day
+            days += 1
+        return days
+
+    def run(self, months_ahead=MONTHS_AHEAD, seasons_ahead=1):
+        """Add upcoming partitions, then expire old request log rows."""
+        try:
+            add_month_partitions(self.db_conn, months_ahead)
+            add_season_partitions(self.db_conn, date.today().year + seasons_ahead)
+
+            partitions = list_partitions(self.db_conn, "api_request_log")
+            if partitions:
+                count = self.expire_partitions(partitions)
+                logger.info(f"Dropped {count} request log partitions before {self.cutoff()}")
+            else:
+                count = self.expire_rows()
+                logger.info(f"Rolled up and deleted {count} days of request log rows before {self.cutoff()}")
+        except mysql.connector.Error as err:
+            logger.error(f"Error expiring request log: {err}")
+            self.db_conn.rollback()
+            raise DatabaseError(f"Failed to expire request log: {err}")
+
+
+def main():
+    """Main function to run the retention job."""
+    parser = argparse.ArgumentParser(description="Roll up and expire old API request log rows")
+    parser.add_argument("--retention-months", type=int, default=RETENTION_MONTHS,
+                        help=f"Full months of raw request log rows to keep (default: {RETENTION_MONTHS})")
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD,
+                        help=f"Monthly log partitions to create in advance (default: {MONTHS_AHEAD})")
+
+    args = parser.parse_args()
+
+    try:
+        db_conn = mysql.connector.connect(**DB_CONFIG)
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        sys.exit(1)
+
+    try:
+        RequestLogRetention(db_conn, args.retention_months).run(args.months_ahead)
+    except DatabaseError as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+    finally:
+        db_conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Schema Migrations
+
+This module applies versioned schema migrations in order and records each
+applied version in schema_migrations, so setup_database.py and upgrades of
+existing databases run the same steps exactly once:
+
+    1  initial schema        database_schema.sql
+    2  natural-key indexes   unique indexes on the api_*_id columns and
+                             countries.name, used by the fetchers' lookups
+                             and as upsert keys
+    3  fixture detail keys   fixtures.details_updated_at, the upsert keys
+                             of statistics and player_statistics, and the
+                             updated_at columns and indexes read by the
+                             incremental exports and search refreshes
+    4  entity links          entity_links, the cross-provider ID mapping of
+                             entity_resolution.py
+    5  post-baseline tables  the tables and indexes of the request rollups,
+                             form, sharded ingest, odds and bets, created if
+                             missing
+
+A database created before the runner existed has its tables but no
+schema_migrations table; it is recorded at version 1 without re-running the
+schema file. Version 1 therefore only stands for the original tables: every
+table added to database_schema.sql since is also created by a later
+migration, which skips the tables a fresh database already has.
+
+Indexes and columns are added online (ALGORITHM=INPLACE, LOCK=NONE), so reads
+and writes continue while a large table is changed. The statement waits only briefly for
+its metadata lock and retries, rather than queuing every other query on the
+table behind it. Existing duplicates are reported instead of being merged,
+and on a partitioned table the partitioning columns are added to the unique
+key as MySQL requires.
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import mysql.connector
+
+logger = logging.getLogger("migrations")
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database_schema.sql")
+
+LOCK_WAIT_TIMEOUT_SECONDS = 5
+DDL_RETRIES = 5
+
+# Table -> (index name, columns); database_schema.sql declares the same keys
+NATURAL_KEYS = {
+    "countries": ("uq_countries_name", ("name",)),
+    "leagues": ("uq_leagues_api_league_id", ("api_league_id",)),
+    "teams": ("uq_teams_api_team_id", ("api_team_id",)),
+    "players": ("uq_players_api_player_id", ("api_player_id",)),
+    "fixtures": ("uq_fixtures_api_fixture_id", ("api_fixture_id",)),
+}
+
+# Table -> (index name, columns) written by the fixture detail stage
+DETAIL_KEYS = {
+    "statistics": ("uq_statistics_fixture_team_type", ("fixture_id", "team_id", "stat_type")),
+    "player_statistics": ("uq_player_statistics_fixture_player", ("fixture_id", "player_id")),
+}
+
+# Tables added to database_schema.sql after the original schema; migration 5
+# creates the ones missing, from their definitions in the schema file
+POST_BASELINE_TABLES = (
+    "api_request_hourly", "team_form", "head_to_head", "ingest_work_units",
+    "odds_events", "odds_prices", "odds_history_blocks", "odds_history_series", "odds_history_ohlc",
+    "odds_selection_analytics", "odds_market_analytics", "bets", "wallets",
+)
+
+# (table, index name, columns) added with them
+POST_BASELINE_INDEXES = (
+    ("fixtures", "idx_fixtures_away_team", ("away_team_id",)),
+    ("ingest_work_units", "idx_work_units_claim", ("status", "lease_expires_at")),
+    ("odds_events", "idx_odds_events_sport", ("sport_key", "commence_time")),
+    ("bets", "idx_bets_fixture_status", ("fixture_id", "status")),
+    ("bets", "idx_bets_user", ("user_id", "placed_at")),
+)
+
+UPDATED_AT = "TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+
+# Tables given an updated_at column; the SportRadar tables are only changed
+# when sportradar_schema.sql was applied
+UPDATED_AT_TABLES = ("player_statistics",)
+SPORTRADAR_UPDATED_AT_TABLES = (
+    "tennis_rankings", "tennis_matches", "tennis_match_sets", "tennis_match_statistics",
+    "cricket_matches", "cricket_innings", "cricket_batting_stats", "cricket_bowling_stats",
+    "cricket_standings",
+)
+
+# Table -> index name of the updated_at indexes used by incremental scans
+UPDATED_AT_INDEXES = {
+    "fixtures": "idx_fixtures_updated",
+    "standings": "idx_standings_updated",
+    "player_statistics": "idx_player_statistics_updated",
+}
+
+# mysql.connector errno values
+ER_LOCK_WAIT_TIMEOUT = 1205
+ER_ALTER_OPERATION_NOT_SUPPORTED = 1845
+ER_ALTER_OPERATION_NOT_SUPPORTED_REASON = 1846
+
+
+class MigrationError(Exception):
+    """Raised when a migration cannot be applied safely."""
+    pass
+
+
+def split_sql(script):
+    """Split an SQL script into statements.
+
+    Semicolons and "--" inside quoted strings and identifiers are left alone,
+    unlike a plain split(';').
+
+    Returns:
+        list: Statements without the trailing semicolon
+    """
+    statements, current = [], []
+    quote = None
+    index = 0
+    while index < len(script):
+        char = script[index]
+        if quote:
+            current.append(char)
+            if char == "\\" and quote != "`" and index + 1 < len(script):
+                current.append(script[index + 1])
+                index += 1
+            elif char == quote:
+                quote = None
+        elif char in "'\"`":
+            quote = char
+            current.append(char)
+        elif script.startswith("--", index) or char == "#":
+            end = script.find("\n", index)
+            index = len(script) if end == -1 else end
+            continue
+        elif char == ";":
+            statements.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+        index += 1
+    statements.append("".join(current).strip())
+    return [statement for statement in statements if statement]
+
+
+class MigrationRunner:
+    """Class to apply the versioned schema migrations of one database."""
+
+    def __init__(self, db_conn, online=True, lock_wait_timeout=LOCK_WAIT_TIMEOUT_SECONDS,
+                 retries=DDL_RETRIES, dry_run=False):
+        """Initialize the runner.
+
+        Args:
+            db_conn: Open MySQL connection to the sports database
+            online (bool): Fail rather than lock a table the server can't index online
+            lock_wait_timeout (int): Seconds a DDL statement waits for its metadata lock
+            retries (int): Attempts for a DDL statement that timed out on its lock
+            dry_run (bool): Log the statements instead of executing them
+        """
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor()
+        self.online = online
+        self.lock_wait_timeout = lock_wait_timeout
+        self.retries = retries
+        self.dry_run = dry_run
+
+        self.migrations = [
+            (1, "initial schema", self.create_schema),
+            (2, "natural-key indexes", self.add_natural_keys),
+            (3, "fixture detail keys", self.add_detail_keys),
+            (4, "entity links", self.create_entity_links),
+            (5, "post-baseline tables", self.create_post_baseline_tables),
+        ]
+
+    def _table_exists(self, table):
+        self.db_cursor.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """,
+            (table,)
+        )
+        return self.db_cursor.fetchone()[0] > 0
+
+    def ensure_version_table(self):
+        """Create schema_migrations, recording existing databases at version 1."""
+        if self._table_exists("schema_migrations"):
+            return
+        baseline = self._table_exists("countries")
+        if self.dry_run:
+            return
+
+        self.db_cursor.execute(
+            """
+            CREATE TABLE schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        if baseline:
+            logger.info("Existing schema found, recording it as version 1")
+            self._record(1, "initial schema")
+
+    def applied_versions(self):
+        """Return {version: applied_at} of the applied migrations."""
+        if not self._table_exists("schema_migrations"):
+            # Only reached in a dry run; an existing schema counts as version 1
+            return {1: None} if self._table_exists("countries") else {}
+        self.db_cursor.execute("SELECT version, applied_at FROM schema_migrations")
+        return dict(self.db_cursor.fetchall())
+
+    def _record(self, version, name):
+        self.db_cursor.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (version, name)
+        )
+        self.db_conn.commit()
+
+    def pending(self, target=None):
+        """Return the migrations that are not applied yet, up to target."""
+        applied = self.applied_versions()
+        return [
+            (version, name, function) for version, name, function in self.migrations
+            if version not in applied and (target is None or version <= target)
+        ]
+
+    def migrate(self, target=None):
+        """Apply the pending migrations in order.
+
+        Args:
+            target (int, optional): Last version to apply (default: all)
+
+        Returns:
+            list: Versions applied
+        """
+        self.ensure_version_table()
+        applied = []
+        for version, name, function in self.pending(target):
+            logger.info(f"Applying migration {version}: {name}")
+            start_time = time.time()
+            function()
+            if not self.dry_run:
+                self._record(version, name)
+            logger.info(f"Migration {version} done in {time.time() - start_time:.1f}s")
+            applied.append(version)
+        if not applied:
+            logger.info("Schema is up to date")
+        return applied
+
+    def status(self):
+        """Return [(version, name, applied_at or None)] for every migration."""
+        applied = self.applied_versions()
+        return [(version, name, applied.get(version)) for version, name, _ in self.migrations]
+
+    def _execute(self, statement):
+        if self.dry_run:
+            logger.info(f"Would run: {' '.join(statement.split())}")
+            return
+        self.db_cursor.execute(statement)
+
+    # Migrations
+
+    def create_schema(self):
+        """Migration 1: create the tables of database_schema.sql."""
+        with open(SCHEMA_FILE, "r") as f:
+            statements = split_sql(f.read())
+        for statement in statements:
+            self._execute(statement)
+        if not self.dry_run:
+            self.db_conn.commit()
+
+    def add_natural_keys(self):
+        """Migration 2: unique indexes on the natural keys of the API-Sports tables."""
+        for table, (index_name, columns) in NATURAL_KEYS.items():
+            self.add_unique_index(table, index_name, columns)
+
+    def add_detail_keys(self):
+        """Migration 3: detail fetch marker on fixtures, the detail upsert keys and updated_at columns."""
+        self.add_column("fixtures", "details_updated_at", "DATETIME")
+        for table in UPDATED_AT_TABLES:
+            self.add_column(table, "updated_at", UPDATED_AT)
+        for table in SPORTRADAR_UPDATED_AT_TABLES:
+            if self._table_exists(table):
+                self.add_column(table, "updated_at", UPDATED_AT)
+        for table, index_name in UPDATED_AT_INDEXES.items():
+            self.add_index(table, index_name, ("updated_at",))
+        for table, (index_name, columns) in DETAIL_KEYS.items():
+            self.add_unique_index(table, index_name, columns)
+
+    def create_entity_links(self):
+        """Migration 4: entity_links table of the cross-provider ID mapping."""
+        self._execute(
+            """
+            CREATE TABLE IF NOT EXISTS entity_links (
+                entity_type VARCHAR(20) NOT NULL,
+                provider VARCHAR(30) NOT NULL,
+                provider_id VARCHAR(100) NOT NULL,
+                canonical_id INT,
+                score DECIMAL(4,3),
+                source VARCHAR(10) NOT NULL DEFAULT 'auto',
+                name VARCHAR(100),
+                resolved_at DATETIME,
+                PRIMARY KEY (entity_type, provider, provider_id),
+                INDEX idx_entity_links_canonical (entity_type, canonical_id)
+            )
+            """
+        )
+
+    def create_post_baseline_tables(self):
+        """Migration 5: tables and indexes added to database_schema.sql after version 1."""
+        with open(SCHEMA_FILE, "r") as f:
+            statements = split_sql(f.read())
+        definitions = {}
+        for statement in statements:
+            words = statement.split()
+            if len(words) > 2 and [word.upper() for word in words[:2]] == ["CREATE", "TABLE"]:
+                definitions[words[2].rstrip("(")] = statement
+
+        for table in POST_BASELINE_TABLES:
+            if self._table_exists(table):
+                logger.info(f"{table} already exists")
+                continue
+            self._execute(definitions[table])
+        if not self.dry_run:
+            self.db_conn.commit()
+
+        for table, index_name, columns in POST_BASELINE_INDEXES:
+            if self._table_exists(table):
+                self.add_index(table, index_name, columns)
+
+    # Online schema changes
+
+    def column_exists(self, table, column):
+        self.db_cursor.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+            """,
+            (table, column)
+        )
+        return self.db_cursor.fetchone()[0] > 0
+
+    def add_column(self, table, column, definition):
+        """Add a nullable or defaulted column without blocking writes; nothing is done if it exists."""
+        if self.column_exists(table, column):
+            logger.info(f"{table}.{column} already exists")
+            return
+        self.alter_online(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def index_columns(self, table, index_name):
+        """Return the columns of an index, [] if it doesn't exist."""
+        self.db_cursor.execute(
+            """
+            SELECT COLUMN_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+            ORDER BY SEQ_IN_INDEX
+            """,
+            (table, index_name)
+        )
+        return [row[0] for row in self.db_cursor.fetchall()]
+
+    def partition_columns(self, table):
+        """Return the columns a table is partitioned by, [] if it isn't partitioned."""
+        self.db_cursor.execute(
+            """
+            SELECT DISTINCT PARTITION_EXPRESSION FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            """,
+            (table,)
+        )
+        row = self.db_cursor.fetchone()
+        self.db_cursor.fetchall()
+        if not row or not row[0]:
+            return []
+
+        self.db_cursor.execute(
+            """
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+            """,
+            (table,)
+        )
+        # The expression may wrap the columns, e.g. UNIX_TIMESTAMP(`created_at`)
+        expression = row[0].replace("`", "")
+        return [column for (column,) in self.db_cursor.fetchall()
+                if column in expression.replace("(", " ").replace(")", " ").replace(",", " ").split()]
+
+    def find_duplicates(self, table, columns, limit=5):
+        """Return up to limit [(values..., count)] groups that would violate a unique key."""
+        column_list = ", ".join(columns)
+        self.db_cursor.execute(
+            f"""
+            SELECT {column_list}, COUNT(*) FROM {table}
+            GROUP BY {column_list}
+            HAVING COUNT(*) > 1
+            LIMIT {int(limit)}
+            """
+        )
+        return self.db_cursor.fetchall()
+
+    def add_index(self, table, index_name, columns):
+        """Add a non-unique index without blocking writes; nothing is done if it exists."""
+        if self.index_columns(table, index_name):
+            logger.info(f"{table}.{index_name} already exists")
+            return
+        self.alter_online(f"ALTER TABLE {table} ADD INDEX {index_name} ({', '.join(columns)})")
+
+    def add_unique_index(self, table, index_name, columns):
+        """Add a unique index without blocking writes to the table.
+
+        Args:
+            table (str): Table name
+            index_name (str): Index name; nothing is done if it already exists
+            columns (tuple): Indexed columns; the partitioning columns of a
+                partitioned table are appended
+        """
+        if self.index_columns(table, index_name):
+            logger.info(f"{table}.{index_name} already exists")
+            return
+
+        columns = list(columns)
+        extra = [column for column in self.partition_columns(table) if column not in columns]
+        if extra:
+            logger.info(f"{table} is partitioned, adding {', '.join(extra)} to {index_name}")
+            columns += extra
+
+        duplicates = self.find_duplicates(table, columns)
+        if duplicates:
+            examples = "; ".join(
+                ", ".join(f"{column}={value!r}" for column, value in zip(columns, group)) + f" ({group[-1]} rows)"
+                for group in duplicates
+            )
+            raise MigrationError(
+                f"Cannot add unique index {index_name}: {table} has duplicate rows, e.g. {examples}. "
+                f"Merge them and run the migration again."
+            )
+
+        statement = f"ALTER TABLE {table} ADD UNIQUE INDEX {index_name} ({', '.join(columns)})"
+        self.alter_online(statement)
+
+    def alter_online(self, statement):
+        """Run an ALTER TABLE as online DDL.
+
+        The statement waits at most lock_wait_timeout seconds for the table's
+        metadata lock, so a long-running query on the table delays the
+        migration instead of every later query queuing behind the ALTER; it is
+        retried with a growing pause. If the server can't run it online, it
+        fails unless the runner was created with online=False.
+        """
+        if self.dry_run:
+            self._execute(f"{statement}, ALGORITHM=INPLACE, LOCK=NONE")
+            return
+
+        self.db_cursor.execute("SET SESSION lock_wait_timeout = %s", (self.lock_wait_timeout,))
+        try:
+            for attempt in range(1, self.retries + 1):
+                try:
+                    logger.info(f"Running: {statement}")
+                    self.db_cursor.execute(f"{statement}, ALGORITHM=INPLACE, LOCK=NONE")
+                    return
+                except mysql.connector.Error as err:
+                    if err.errno in (ER_ALTER_OPERATION_NOT_SUPPORTED, ER_ALTER_OPERATION_NOT_SUPPORTED_REASON):
+                        if self.online:
+                            raise MigrationError(f"Cannot run online: {err.msg}. "
+                                                 f"Re-run with --allow-locking during a quiet period.")
+                        logger.warning(f"Cannot run online ({err.msg}), running with table locks")
+                        self.db_cursor.execute(statement)
+                        return
+                    if err.errno != ER_LOCK_WAIT_TIMEOUT or attempt == self.retries:
+                        raise
+                    logger.warning(f"Table is busy, retrying in {attempt * 2}s (attempt {attempt} of {self.retries})")
+                    time.sleep(attempt * 2)
+        finally:
+            self.db_cursor.execute("SET SESSION lock_wait_timeout = DEFAULT")
+
+
+def main():
+    """Main function to apply or list the schema migrations."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Apply versioned schema migrations")
+    parser.add_argument("--status", action="store_true", help="List migrations and whether they are applied")
+    parser.add_argument("--target", type=int, help="Last version to apply (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="Log the statements without running them")
+    parser.add_argument("--allow-locking", action="store_true",
+                        help="Fall back to locking DDL when an index can't be added online")
+    parser.add_argument("--lock-wait-timeout", type=int, default=LOCK_WAIT_TIMEOUT_SECONDS,
+                        help=f"Seconds DDL waits for a table's metadata lock (default: {LOCK_WAIT_TIMEOUT_SECONDS})")
+
+    args = parser.parse_args()
+
+    from sports_data_fetcher import DB_CONFIG
+
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        sys.exit(1)
+
+    try:
+        runner = MigrationRunner(conn, online=not args.allow_locking,
+                                 lock_wait_timeout=args.lock_wait_timeout, dry_run=args.dry_run)
+        if args.status:
+            for version, name, applied_at in runner.status():
+                print(f"{version:>4}  {name:<24} {applied_at or 'pending'}")
+        else:
+            runner.migrate(args.target)
+    except (mysql.connector.Error, MigrationError) as err:
+        logger.error(f"Migration failed: {err}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Odds Analytics Script
+
+This script loads every stored bookmaker price for upcoming events into NumPy
+arrays and computes, in one batched pass, implied probabilities, bookmaker
+margins (overround), the best available price per selection, no-vig
+consensus probabilities and arbitrage/value flags. Results are written to
+odds_selection_analytics and odds_market_analytics for the betting UI.
+"""
+
+import sys
+import time
+import logging
+import argparse
+import numpy as np
+import mysql.connector
+from datetime import datetime
+from sports_data_fetcher import DB_CONFIG, DatabaseError
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("odds_analytics.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("odds_analytics")
+
+VALUE_THRESHOLD = 0.02  # Minimum edge over the consensus price to flag value
+WRITE_BATCH_SIZE = 1000
+
+
+def american_to_decimal(prices):
+    """Convert an array of American odds to decimal odds."""
+    prices = np.asarray(prices, dtype=np.float64)
+    return np.where(prices > 0, prices / 100 + 1, 100 / np.abs(prices) + 1)
+
+
+def _factorize(values):
+    """Map values to dense integer codes in order of first appearance."""
+    uniques = list(dict.fromkeys(values))
+    index = {value: code for code, value in enumerate(uniques)}
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int64, count=len(values))
+    return codes, uniques
+
+
+def _group(*codes):
+    """Combine integer code columns into one dense group id per distinct combination."""
+    combined = np.zeros(len(codes[0]), dtype=np.int64)
+    for column in codes:
+        combined = combined * (int(column.max()) + 1 if len(column) else 1) + column
+    unique, inverse = np.unique(combined, return_inverse=True)
+    return inverse, len(unique)
+
+
+def compute_analytics(rows, value_threshold=VALUE_THRESHOLD):
+    """Compute odds analytics for a batch of prices.
+
+    Args:
+        rows (list): (event_id, home_team, bookmaker_key, market_key,
+            outcome_name, price, point) tuples
+        value_threshold (float): Minimum edge to flag a best price as value
+
+    Returns:
+        tuple: (selections, markets) lists of result rows
+    """
+    if not rows:
+        return [], []
+
+    event_ids, home_teams, bookmakers, market_keys, outcomes, prices, points = zip(*rows)
+    price = np.array(prices, dtype=np.float64)
+    # None becomes NaN; DECIMAL points become floats
+    point = np.array(points, dtype=np.float64)
+    is_home = np.array([o == h for o, h in zip(outcomes, home_teams)])
+
+    event_code, event_values = _factorize(event_ids)
+    bookmaker_code, bookmaker_values = _factorize(bookmakers)
+    market_code, market_values = _factorize(market_keys)
+    outcome_code, outcome_values = _factorize(outcomes)
+    point_code, point_values = _factorize(np.nan_to_num(point, nan=0.0).tolist())
+
+    # Spreads quote the same line as -x for one side and +x for the other;
+    # express every spread from the home side so both sides share a line
+    is_spread = np.array([m == "spreads" for m in market_values])[market_code]
+    line = np.where(is_spread & ~is_home, -point, point)
+    line = np.nan_to_num(line, nan=0.0)
+    line_code, line_values = _factorize(line.tolist())
+
+    decimal = american_to_decimal(price)
+    implied = 1 / decimal
+
+    # Margin of each bookmaker's market line: sum of implied probabilities
+    book_group, book_count = _group(event_code, bookmaker_code, market_code, line_code)
+    overround = np.bincount(book_group, weights=implied, minlength=book_count)
+    book_outcomes = np.bincount(book_group, minlength=book_count)
+    fair = implied / overround[book_group]
+
+    # Best price per selection (event, market, outcome, point)
+    selection_group, selection_count = _group(event_code, market_code, outcome_code, point_code)
+    order = np.lexsort((-decimal, selection_group))
+    sorted_groups = selection_group[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    best = order[first]  # Row index of the best price, indexed by selection group
+
+    books = np.bincount(selection_group, minlength=selection_count)
+    consensus = np.bincount(selection_group, weights=fair, minlength=selection_count) / books
+    best_decimal = decimal[best]
+    edge = best_decimal * consensus - 1
+
+    # Arbitrage per market line: the best prices of all outcomes imply less than 100%
+    market_group, market_count = _group(event_code, market_code, line_code)
+    book_market = np.zeros(book_count, dtype=np.int64)
+    book_market[book_group] = market_group
+
+    selection_market = market_group[best]
+    best_total = np.bincount(selection_market, weights=1 / best_decimal, minlength=market_count)
+    market_outcomes = np.bincount(selection_market, minlength=market_count)
+    expected_outcomes = np.zeros(market_count, dtype=np.int64)
+    np.maximum.at(expected_outcomes, book_market, book_outcomes)
+    is_arbitrage = (best_total < 1) & (market_outcomes >= 2) & (market_outcomes >= expected_outcomes)
+
+    average_overround = (np.bincount(book_market, weights=overround, minlength=market_count)
+                         / np.bincount(book_market, minlength=market_count))
+    min_overround = np.full(market_count, np.inf)
+    np.minimum.at(min_overround, book_market, overround)
+
+    # Build result rows from whole columns rather than element by element
+    selections = list(zip(
+        [event_values[code] for code in event_code[best].tolist()],
+        [market_values[code] for code in market_code[best].tolist()],
+        [outcome_values[code] for code in outcome_code[best].tolist()],
+        [point_values[code] for code in point_code[best].tolist()],
+        [bookmaker_values[code] for code in bookmaker_code[best].tolist()],
+        price[best].astype(np.int64).tolist(),
+        np.round(implied[best], 6).tolist(),
+        np.round(consensus, 6).tolist(),
+        np.round(edge, 6).tolist(),
+        (edge > value_threshold).tolist(),
+        books.tolist(),
+    ))
+
+    # One representative row per market line
+    market_order = np.argsort(market_group, kind="stable")
+    market_first = market_order[np.r_[True, market_group[market_order][1:] != market_group[market_order][:-1]]]
+    markets = list(zip(
+        [event_values[code] for code in event_code[market_first].tolist()],
+        [market_values[code] for code in market_code[market_first].tolist()],
+        [line_values[code] for code in line_code[market_first].tolist()],
+        np.round(min_overround, 6).tolist(),
+        np.round(average_overround, 6).tolist(),
+        np.round(best_total, 6).tolist(),
+        is_arbitrage.tolist(),
+        market_outcomes.tolist(),
+    ))
+
+    return selections, markets
+
+
+class OddsAnalytics:
+    """Class to compute and store cross-bookmaker odds analytics."""
+
+    def __init__(self, db_conn, value_threshold=VALUE_THRESHOLD):
+        """Initialize the analytics job.
+
+        Args:
+            db_conn: Open MySQL connection
+            value_threshold (float): Minimum edge to flag a best price as value
+        """
+        self.db_conn = db_conn
+        # Plain tuples are much cheaper to build than dicts for large result sets
+        self.db_cursor = db_conn.cursor()
+        self.value_threshold = value_threshold
+
+    def load_prices(self, sport=None):
+        """Load the prices of every upcoming event."""
+        query = """
+            SELECT p.event_id, e.home_team, p.bookmaker_key, p.market_key,
+                   p.outcome_name, p.price, p.point
+            FROM odds_prices p
+            JOIN odds_events e ON p.event_id = e.event_id
+            WHERE e.commence_time >= UTC_TIMESTAMP()
+        """
+        params = []
+        if sport:
+            query += " AND e.sport_key = %s"
+            params.append(sport)
+
+        self.db_cursor.execute(query, params)
+        return self.db_cursor.fetchall()
+
+    def write(self, selections, markets, computed_at):
+        """Replace stored analytics with a freshly computed set."""
+        for start in range(0, len(selections), WRITE_BATCH_SIZE):
+            self.db_cursor.executemany(
+                """
+                INSERT INTO odds_selection_analytics
+                (event_id, market_key, outcome_name, point, best_bookmaker_key, best_price,
+                 implied_probability, consensus_probability, value_edge, is_value, bookmakers,
+                 computed_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    best_bookmaker_key = VALUES(best_bookmaker_key), best_price = VALUES(best_price),
+                    implied_probability = VALUES(implied_probability),
+                    consensus_probability = VALUES(consensus_probability),
+                    value_edge = VALUES(value_edge), is_value = VALUES(is_value),
+                    bookmakers = VALUES(bookmakers), computed_at = VALUES(computed_at)
+                """,
+                [row + (computed_at,) for row in selections[start:start + WRITE_BATCH_SIZE]]
+            )
+
+        for start in range(0, len(markets), WRITE_BATCH_SIZE):
+            self.db_cursor.executemany(
+                """
+                INSERT INTO odds_market_analytics
+                (event_id, market_key, line, min_overround, avg_overround, best_price_total,
+                 is_arbitrage, outcomes, computed_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    min_overround = VALUES(min_overround), avg_overround = VALUES(avg_overround),
+                    best_price_total = VALUES(best_price_total), is_arbitrage = VALUES(is_arbitrage),
+                    outcomes = VALUES(outcomes), computed_at = VALUES(computed_at)
+                """,
+                [row + (computed_at,) for row in markets[start:start + WRITE_BATCH_SIZE]]
+            )
+
+    def update(self, sport=None):
+        """Recompute analytics for upcoming events and write them back.
+
+        Returns:
+            tuple: (selections, markets) counts written
+        """
+        computed_at = datetime.utcnow().replace(microsecond=0)
+        try:
+            rows = self.load_prices(sport)
+
+            start_time = time.time()
+            selections, markets = compute_analytics(rows, self.value_threshold)
+            elapsed = time.time() - start_time
+
+            self.write(selections, markets, computed_at)
+
+            # Anything not refreshed in this pass belongs to a started or withdrawn event
+            stale_filter = "computed_at < %s"
+            params = [computed_at]
+            if sport:
+                stale_filter += " AND event_id IN (SELECT event_id FROM odds_events WHERE sport_key = %s)"
+                params.append(sport)
+            for table in ("odds_selection_analytics", "odds_market_analytics"):
+                self.db_cursor.execute(f"DELETE FROM {table} WHERE {stale_filter}", params)
+
+            self.db_conn.commit()
+        except mysql.connector.Error as err:
+            logger.error(f"Error updating odds analytics: {err}")
+            self.db_conn.rollback()
+            raise DatabaseError(f"Failed to update odds analytics: {err}")
+
+        arbitrages = sum(1 for market in markets if market[6])
+        values = sum(1 for selection in selections if selection[9])
+        logger.info(
+            f"Computed analytics for {len(rows)} prices in {elapsed:.3f}s: "
+            f"{len(selections)} selections ({values} value), {len(markets)} markets ({arbitrages} arbitrage)"
+        )
+        return len(selections), len(markets)
+
+
+def main():
+    """Main function to compute odds analytics."""
+    parser = argparse.ArgumentParser(description="Compute cross-bookmaker odds analytics")
+    parser.add_argument("--sport", type=str, help="Only recompute one sport key")
+    parser.add_argument("--value-threshold", type=float, default=VALUE_THRESHOLD,
+                        help=f"Minimum edge to flag value (default: {VALUE_THRESHOLD})")
+
+    args = parser.parse_args()
+
+    try:
+        db_conn = mysql.connector.connect(**DB_CONFIG)
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        sys.exit(1)
+
+    try:
+        OddsAnalytics(db_conn, args.value_threshold).update(args.sport)
+    except DatabaseError as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+    finally:
+        db_conn.close()
+
+if __name__ == "__main__":
+    main()
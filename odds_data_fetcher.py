@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Odds Data Fetcher
+
+This script polls The Odds API (v4) per sport and stores the prices in the
+odds_events and odds_prices tables using the bookmaker/market/outcome model
+from lib/odds-api.ts. Each snapshot is diffed against the previous one so
+only changed prices are written, which keeps provider calls proportional to
+the poll rate rather than to page views.
+"""
+
+import os
+import sys
+import time
+import json
+import logging
+import argparse
+import requests
+import mysql.connector
+from datetime import datetime
+from dotenv import load_dotenv
+from sports_data_fetcher import DB_CONFIG, APIRequestError, DatabaseError
+from json_extract import decode_response
+from odds_history import OddsHistoryStore
+from odds_analytics import OddsAnalytics
+from entity_resolution import EntityResolver
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("odds_data_fetcher.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("odds_data_fetcher")
+
+# Load environment variables
+load_dotenv()
+
+# API Configuration
+ODDS_API_KEY = os.getenv("ODDS_API_KEY")
+ODDS_API_BASE_URL = "https://api.the-odds-api.com/v4"
+
+DEFAULT_REGIONS = ["us"]
+DEFAULT_MARKETS = ["h2h", "spreads", "totals"]
+WRITE_BATCH_SIZE = 500
+
+
+def _parse_time(value):
+    """Convert an ISO-8601 timestamp from the API to a naive UTC datetime."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except (ValueError, TypeError):
+        logger.warning(f"Invalid timestamp from odds API: {value}")
+        return None
+
+
+def normalize_odds(events):
+    """Flatten an odds API response into event and price records.
+
+    Returns:
+        tuple: (events, prices) where events maps event_id to an event row
+            and prices maps (event_id, bookmaker_key, market_key, outcome_name)
+            to (bookmaker_title, price, point, last_update)
+    """
+    event_rows = {}
+    prices = {}
+    for event in events:
+        event_id = event["id"]
+        event_rows[event_id] = (
+            event_id,
+            event.get("sport_key"),
+            event.get("sport_title"),
+            _parse_time(event.get("commence_time")),
+            event.get("home_team"),
+            event.get("away_team"),
+        )
+        for bookmaker in event.get("bookmakers", []):
+            for market in bookmaker.get("markets", []):
+                last_update = _parse_time(market.get("last_update") or bookmaker.get("last_update"))
+                for outcome in market.get("outcomes", []):
+                    key = (event_id, bookmaker["key"], market["key"], outcome["name"])
+                    prices[key] = (
+                        bookmaker.get("title"),
+                        outcome.get("price"),
+                        outcome.get("point"),
+                        last_update,
+                    )
+    return event_rows, prices
+
+
+class OddsDataFetcher:
+    """Class to poll The Odds API and store changed prices."""
+
+    def __init__(self, regions=None, markets=None, api_key=ODDS_API_KEY, record_history=True,
+                 compute_analytics=True, resolve_entities=True):
+        """Initialize the fetcher.
+
+        Args:
+            regions (list, optional): Bookmaker regions (default: us)
+            markets (list, optional): Markets to request (default: h2h, spreads, totals)
+            api_key (str, optional): The Odds API key (default: ODDS_API_KEY)
+            record_history (bool): Append changed prices to the odds history store
+            compute_analytics (bool): Recompute odds analytics after prices change
+            resolve_entities (bool): Link the teams of new soccer events to API-Sports teams
+        """
+        if not api_key:
+            raise ValueError("ODDS_API_KEY environment variable is not set")
+
+        self.api_key = api_key
+        self.regions = regions or DEFAULT_REGIONS
+        self.markets = markets or DEFAULT_MARKETS
+        self.record_history = record_history
+        self.history = None
+        self.compute_analytics = compute_analytics
+        self.analytics = None
+        self.resolve_entities = resolve_entities
+        self.resolver = None
+        self.session = requests.Session()
+        self.db_conn = None
+        self.db_cursor = None
+        # Last stored snapshot per sport: price key -> (price, point)
+        self.snapshots = {}
+        self.events = {}
+
+    def connect_to_database(self):
+        """Establish connection to the database."""
+        try:
+            self.db_conn = mysql.connector.connect(**DB_CONFIG)
+            self.db_cursor = self.db_conn.cursor(dictionary=True)
+            if self.record_history:
+                self.history = OddsHistoryStore(self.db_conn)
+            if self.compute_analytics:
+                self.analytics = OddsAnalytics(self.db_conn)
+            if self.resolve_entities:
+                self.resolver = EntityResolver(self.db_conn)
+            logger.info("Successfully connected to the database")
+        except mysql.connector.Error as err:
+            logger.error(f"Database connection error: {err}")
+            raise DatabaseError(f"Failed to connect to database: {err}")
+
+    def close_database_connection(self):
+        """Close the database connection."""
+        if self.db_cursor:
+            self.db_cursor.close()
+        if self.db_conn:
+            self.db_conn.close()
+        logger.info("Database connection closed")
+
+    def log_api_request(self, endpoint, parameters, status, response_time):
+        """Log API request to the database for tracking."""
+        try:
+            self.db_cursor.execute(
+                """
+                INSERT INTO api_request_log
+                (endpoint, parameters, response_status, response_time)
+                VALUES (%s, %s, %s, %s)
+                """,
+                (endpoint, json.dumps(parameters) if parameters else None, status, response_time)
+            )
+            self.db_conn.commit()
+        except mysql.connector.Error as err:
+            logger.warning(f"Failed to log API request: {err}")
+
+    def fetch_odds(self, sport):
+        """Fetch the current odds snapshot for a sport."""
+        endpoint = f"sports/{sport}/odds"
+        params = {
+            "regions": ",".join(self.regions),
+            "markets": ",".join(self.markets),
+            "oddsFormat": "american",
+        }
+        start_time = time.time()
+
+        try:
+            response = self.session.get(
+                f"{ODDS_API_BASE_URL}/{endpoint}/",
+                params={**params, "apiKey": self.api_key},
+                timeout=30,
+            )
+            self.log_api_request(endpoint, params, response.status_code, time.time() - start_time)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as err:
+            logger.error(f"Odds API request error: {err}")
+            raise APIRequestError(f"Failed to fetch odds for {sport}: {err}")
+
+        remaining = response.headers.get("x-requests-remaining")
+        if remaining is not None:
+            logger.info(f"Odds API requests remaining: {remaining}")
+
+        try:
+            return decode_response(response)
+        except requests.exceptions.RequestException as err:
+            logger.error(f"Odds API response error: {err}")
+            raise APIRequestError(f"Failed to decode odds for {sport}: {err}")
+
+    def _load_snapshot(self, sport):
+        """Load the stored prices for a sport as the baseline snapshot."""
+        self.db_cursor.execute(
+            """
+            SELECT p.event_id, p.bookmaker_key, p.market_key, p.outcome_name, p.price, p.point
+            FROM odds_prices p
+            JOIN odds_events e ON p.event_id = e.event_id
+            WHERE e.sport_key = %s
+            """,
+            (sport,)
+        )
+        snapshot = {}
+        for row in self.db_cursor.fetchall():
+            key = (row["event_id"], row["bookmaker_key"], row["market_key"], row["outcome_name"])
+            point = float(row["point"]) if row["point"] is not None else None
+            snapshot[key] = (row["price"], point)
+        return snapshot
+
+    def diff_snapshot(self, previous, prices):
+        """Compare a new snapshot with the previous one.
+
+        Returns:
+            tuple: (changed, removed) where changed maps price keys to their
+                new record and removed lists keys no longer offered, including
+                every price of events that left the feed (started or finished)
+        """
+        changed = {}
+        for key, (title, price, point, last_update) in prices.items():
+            point = float(point) if point is not None else None
+            if previous.get(key) != (price, point):
+                changed[key] = (title, price, point, last_update)
+
+        removed = [key for key in previous if key not in prices]
+        return changed, removed
+
+    def _write_changes(self, events, changed, removed):
+        """Write changed events and prices in batches, in one transaction."""
+        if events:
+            self.db_cursor.executemany(
+                """
+                INSERT INTO odds_events
+                (event_id, sport_key, sport_title, commence_time, home_team, away_team)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    sport_title = VALUES(sport_title), commence_time = VALUES(commence_time),
+                    home_team = VALUES(home_team), away_team = VALUES(away_team), updated_at = NOW()
+                """,
+                events
+            )
+
+        rows = [
+            (event_id, bookmaker_key, title, market_key, outcome_name, price, point, last_update)
+            for (event_id, bookmaker_key, market_key, outcome_name), (title, price, point, last_update)
+            in changed.items()
+        ]
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            self.db_cursor.executemany(
+                """
+                INSERT INTO odds_prices
+                (event_id, bookmaker_key, bookmaker_title, market_key, outcome_name,
+                 price, point, last_update)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    bookmaker_title = VALUES(bookmaker_title), price = VALUES(price),
+                    point = VALUES(point), last_update = VALUES(last_update), updated_at = NOW()
+                """,
+                rows[start:start + WRITE_BATCH_SIZE]
+            )
+
+        for start in range(0, len(removed), WRITE_BATCH_SIZE):
+            self.db_cursor.executemany(
+                """
+                DELETE FROM odds_prices
+                WHERE event_id = %s AND bookmaker_key = %s AND market_key = %s AND outcome_name = %s
+                """,
+                removed[start:start + WRITE_BATCH_SIZE]
+            )
+
+        if self.history:
+            self.history.record(changed)
+
+        self.db_conn.commit()
+
+    def update_sport(self, sport):
+        """Poll one sport and store the prices that changed since the last poll.
+
+        Returns:
+            dict: Changed keys and their new records, for downstream consumers
+        """
+        logger.info(f"Fetching odds for {sport}...")
+
+        if sport not in self.snapshots:
+            self.snapshots[sport] = self._load_snapshot(sport)
+            self.events[sport] = {}
+
+        event_rows, prices = normalize_odds(self.fetch_odds(sport))
+        changed, removed = self.diff_snapshot(self.snapshots[sport], prices)
+        changed_events = [
+            row for event_id, row in event_rows.items()
+            if self.events[sport].get(event_id) != row
+        ]
+
+        try:
+            self._write_changes(changed_events, changed, removed)
+        except mysql.connector.Error as err:
+            logger.error(f"Error storing odds for {sport}: {err}")
+            self.db_conn.rollback()
+            if self.history:
+                self.history.reset()
+            raise DatabaseError(f"Failed to store odds for {sport}: {err}")
+
+        snapshot = self.snapshots[sport]
+        for key, (title, price, point, last_update) in changed.items():
+            snapshot[key] = (price, point)
+        for key in removed:
+            del snapshot[key]
+        # Events that left the feed are forgotten, so the cache only holds the current feed
+        self.events[sport] = event_rows
+
+        logger.info(
+            f"Processed {len(prices)} prices for {len(event_rows)} {sport} events: "
+            f"{len(changed)} changed, {len(removed)} removed"
+        )
+
+        if self.analytics and (changed or removed):
+            self.analytics.update(sport)
+
+        # Only soccer teams are linked; the refresh skips teams that already have a link
+        if self.resolver and changed_events and sport.startswith("soccer"):
+            try:
+                self.resolver.refresh(["team"])
+            except mysql.connector.Error as err:
+                logger.warning(f"Error linking {sport} teams: {err}")
+                self.db_conn.rollback()
+
+        return changed
+
+    def run(self, sports, interval=None, iterations=None):
+        """Poll the given sports once, or every interval seconds."""
+        count = 0
+        try:
+            self.connect_to_database()
+            while True:
+                for sport in sports:
+                    try:
+                        self.update_sport(sport)
+                    except (APIRequestError, DatabaseError) as err:
+                        logger.error(f"Error updating odds for {sport}: {err}")
+
+                count += 1
+                if not interval or (iterations and count >= iterations):
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            logger.info("Odds polling interrupted by user.")
+        finally:
+            self.close_database_connection()
+
+
+def main():
+    """Main function to run the odds fetcher."""
+    parser = argparse.ArgumentParser(description="Poll The Odds API and store changed prices")
+    parser.add_argument("--sport", type=str, nargs="+", default=["soccer_epl"],
+                        help="Sport keys to poll (default: soccer_epl)")
+    parser.add_argument("--regions", type=str, default=",".join(DEFAULT_REGIONS),
+                        help="Comma-separated bookmaker regions (default: us)")
+    parser.add_argument("--markets", type=str, default=",".join(DEFAULT_MARKETS),
+                        help="Comma-separated markets (default: h2h,spreads,totals)")
+    parser.add_argument("--interval", type=int,
+                        help="Interval in seconds between polls (if not specified, polls once)")
+    parser.add_argument("--iterations", type=int,
+                        help="Maximum number of polls (if not specified, polls indefinitely)")
+    parser.add_argument("--no-history", action="store_true",
+                        help="Don't record price changes in the odds history store")
+    parser.add_argument("--no-analytics", action="store_true",
+                        help="Don't recompute odds analytics after each poll")
+    parser.add_argument("--no-entity-links", action="store_true",
+                        help="Don't link the teams of new soccer events to API-Sports teams")
+
+    args = parser.parse_args()
+
+    try:
+        fetcher = OddsDataFetcher(regions=args.regions.split(","), markets=args.markets.split(","),
+                                  record_history=not args.no_history,
+                                  compute_analytics=not args.no_analytics,
+                                  resolve_entities=not args.no_entity_links)
+        fetcher.run(args.sport, args.interval, args.iterations)
+    except Exception as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
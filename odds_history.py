@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Odds History Store
+
+This script keeps the line-movement history of every (event, bookmaker,
+market, outcome) price series captured by odds_data_fetcher.py. Instead of
+one row per price, each series is stored as time-bounded blocks whose
+timestamps, prices and points are kept in separate delta-encoded columns, so
+a day of movement for one outcome is a single small row. Range queries only
+decode the blocks that overlap the requested window.
+
+Opening and latest prices per series and open/high/low/close per interval
+are maintained alongside the blocks for queries that don't need the raw
+history.
+"""
+
+import sys
+import logging
+import argparse
+import mysql.connector
+from datetime import datetime, timedelta
+from itertools import accumulate
+from sports_data_fetcher import DB_CONFIG, DatabaseError
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("odds_history.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("odds_history")
+
+EPOCH = datetime(1970, 1, 1)
+BLOCK_SECONDS = 86400  # A new block is started at least once a day per series
+MAX_BLOCK_POINTS = 1000
+OHLC_INTERVAL_SECONDS = 3600
+
+SERIES_COLUMNS = ("event_id", "bookmaker_key", "market_key", "outcome_name")
+
+
+def _to_epoch(value):
+    return int((value - EPOCH).total_seconds())
+
+
+def _from_epoch(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+
+def _to_hundredths(point):
+    return None if point is None else int(round(float(point) * 100))
+
+
+def _from_hundredths(value):
+    return None if value is None else value / 100
+
+
+def encode_varints(values):
+    """Encode signed integers as zigzag LEB128 varints."""
+    out = bytearray()
+    for value in values:
+        value = (value << 1) ^ (value >> 63)
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data):
+    """Decode zigzag LEB128 varints produced by encode_varints."""
+    values = []
+    value = shift = 0
+    for byte in data or b"":
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append((value >> 1) ^ -(value & 1))
+        value = shift = 0
+    return values
+
+
+def encode_deltas(values, base):
+    """Delta-encode a column against a base value."""
+    deltas = []
+    previous = base
+    for value in values:
+        deltas.append(value - previous)
+        previous = value
+    return encode_varints(deltas)
+
+
+def decode_deltas(data, base):
+    return list(accumulate(decode_varints(data), initial=base))[1:]
+
+
+def encode_points(points, base):
+    """Delta-encode nullable points; 0 marks a missing point, other values are shifted by one."""
+    codes = []
+    previous = base or 0
+    for point in points:
+        if point is None:
+            codes.append(0)
+        else:
+            delta = point - previous
+            codes.append(((delta << 1) ^ (delta >> 63)) + 1)
+            previous = point
+    # Codes are already non-negative, so store them unsigned
+    out = bytearray()
+    for code in codes:
+        while code > 0x7F:
+            out.append((code & 0x7F) | 0x80)
+            code >>= 7
+        out.append(code)
+    return bytes(out)
+
+
+def decode_points(data, base):
+    points = []
+    previous = base or 0
+    code = shift = 0
+    for byte in data or b"":
+        code |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if code == 0:
+            points.append(None)
+        else:
+            code -= 1
+            previous += (code >> 1) ^ -(code & 1)
+            points.append(previous)
+        code = shift = 0
+    return points
+
+
+class HistoryBlock:
+    """Decoded block of one price series."""
+
+    __slots__ = ("start", "prev_price", "prev_point", "times", "prices", "points")
+
+    def __init__(self, start, prev_price=None, prev_point=None):
+        self.start = start  # Epoch seconds
+        self.prev_price = prev_price
+        self.prev_point = prev_point  # Hundredths
+        self.times = []
+        self.prices = []
+        self.points = []
+
+    @classmethod
+    def from_row(cls, row):
+        """Decode a row of odds_history_blocks."""
+        block = cls(_to_epoch(row["block_start"]), row["prev_price"], _to_hundredths(row["prev_point"]))
+        block.times = decode_deltas(row["time_deltas"], block.start)
+        block.prices = decode_deltas(row["price_deltas"], block.prev_price or 0)
+        block.points = decode_points(row["point_deltas"], block.prev_point)
+        return block
+
+    def append(self, timestamp, price, point):
+        self.times.append(timestamp)
+        self.prices.append(price)
+        self.points.append(point)
+
+    def entries(self):
+        """Yield (datetime, price, point) for every change in the block."""
+        for timestamp, price, point in zip(self.times, self.prices, self.points):
+            yield _from_epoch(timestamp), price, _from_hundredths(point)
+
+    def to_row(self, key):
+        return key + (
+            _from_epoch(self.start),
+            _from_epoch(self.times[-1]),
+            len(self.times),
+            self.prev_price,
+            _from_hundredths(self.prev_point),
+            self.prices[-1],
+            _from_hundredths(self.points[-1]),
+            encode_deltas(self.times, self.start),
+            encode_deltas(self.prices, self.prev_price or 0),
+            encode_points(self.points, self.prev_point),
+        )
+
+
+class OddsHistoryStore:
+    """Class to append to and query the compact odds history."""
+
+    def __init__(self, db_conn, block_seconds=BLOCK_SECONDS, ohlc_interval=OHLC_INTERVAL_SECONDS):
+        """Initialize the store.
+
+        Args:
+            db_conn: Open MySQL connection; the caller owns the transaction
+            block_seconds (int): Maximum time span covered by one block
+            ohlc_interval (int): Length of the open/high/low/close interval in seconds
+        """
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor(dictionary=True)
+        self.block_seconds = block_seconds
+        self.ohlc_interval = ohlc_interval
+        # Open block per series key, so appends don't re-read the database
+        self.open_blocks = {}
+
+    def reset(self):
+        """Forget cached blocks, e.g. after the caller rolled back."""
+        self.open_blocks.clear()
+
+    def _load_open_blocks(self, keys):
+        """Load the latest stored block of every uncached series, one query per batch of events."""
+        missing = [key for key in keys if key not in self.open_blocks]
+        event_ids = sorted({key[0] for key in missing})
+        for start in range(0, len(event_ids), 100):
+            batch = event_ids[start:start + 100]
+            placeholders = ", ".join(["%s"] * len(batch))
+            self.db_cursor.execute(
+                f"""
+                SELECT b.event_id, b.bookmaker_key, b.market_key, b.outcome_name,
+                       b.block_start, b.prev_price, b.prev_point,
+                       b.time_deltas, b.price_deltas, b.point_deltas
+                FROM odds_history_blocks b
+                JOIN (
+                    SELECT event_id, bookmaker_key, market_key, outcome_name,
+                           MAX(block_start) AS block_start
+                    FROM odds_history_blocks
+                    WHERE event_id IN ({placeholders})
+                    GROUP BY event_id, bookmaker_key, market_key, outcome_name
+                ) latest USING (event_id, bookmaker_key, market_key, outcome_name, block_start)
+                """,
+                batch
+            )
+            for row in self.db_cursor.fetchall():
+                key = tuple(row[column] for column in SERIES_COLUMNS)
+                self.open_blocks.setdefault(key, HistoryBlock.from_row(row))
+
+    def _open_block(self, key, timestamp):
+        """Return the block the next change of a series is appended to."""
+        block = self.open_blocks.get(key)
+        if block is None:
+            block = HistoryBlock(timestamp)
+        elif timestamp - block.start >= self.block_seconds or len(block.times) >= MAX_BLOCK_POINTS:
+            block = HistoryBlock(timestamp, block.prices[-1], block.points[-1])
+
+        self.open_blocks[key] = block
+        return block
+
+    def record(self, changes, observed_at=None):
+        """Append changed prices to their series.
+
+        Args:
+            changes (dict): (event_id, bookmaker_key, market_key, outcome_name) ->
+                (bookmaker_title, price, point, last_update), as returned by
+                OddsDataFetcher.diff_snapshot
+            observed_at (datetime, optional): Time of the poll (default: now, UTC)
+        """
+        if not changes:
+            return
+
+        observed_at = observed_at or datetime.utcnow().replace(microsecond=0)
+        timestamp = _to_epoch(observed_at)
+        interval_start = _from_epoch(timestamp - timestamp % self.ohlc_interval)
+
+        self._load_open_blocks(changes)
+
+        block_rows, series_rows, ohlc_rows = [], [], []
+        for key, (title, price, point, last_update) in changes.items():
+            block = self._open_block(key, timestamp)
+            block.append(timestamp, price, _to_hundredths(point))
+            block_rows.append(block.to_row(key))
+            series_rows.append(key + (observed_at, price, point, observed_at, price, point))
+            ohlc_rows.append(key + (interval_start, price, price, price, price, point, point))
+
+        self.db_cursor.executemany(
+            """
+            INSERT INTO odds_history_blocks
+            (event_id, bookmaker_key, market_key, outcome_name, block_start, block_end,
+             point_count, prev_price, prev_point, last_price, last_point,
+             time_deltas, price_deltas, point_deltas)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                block_end = VALUES(block_end), point_count = VALUES(point_count),
+                last_price = VALUES(last_price), last_point = VALUES(last_point),
+                time_deltas = VALUES(time_deltas), price_deltas = VALUES(price_deltas),
+                point_deltas = VALUES(point_deltas)
+            """,
+            block_rows
+        )
+        self.db_cursor.executemany(
+            """
+            INSERT INTO odds_history_series
+            (event_id, bookmaker_key, market_key, outcome_name,
+             opened_at, open_price, open_point, latest_at, latest_price, latest_point)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                latest_at = VALUES(latest_at), latest_price = VALUES(latest_price),
+                latest_point = VALUES(latest_point), change_count = change_count + 1
+            """,
+            series_rows
+        )
+        self.db_cursor.executemany(
+            """
+            INSERT INTO odds_history_ohlc
+            (event_id, bookmaker_key, market_key, outcome_name, interval_start,
+             open_price, high_price, low_price, close_price, open_point, close_point)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                high_price = GREATEST(high_price, VALUES(high_price)),
+                low_price = LEAST(low_price, VALUES(low_price)),
+                close_price = VALUES(close_price), close_point = VALUES(close_point),
+                changes = changes + 1
+            """,
+            ohlc_rows
+        )
+
+        # Blocks that can no longer receive appends don't need to stay cached
+        for key in [k for k, b in self.open_blocks.items() if timestamp - b.start >= self.block_seconds]:
+            del self.open_blocks[key]
+
+    def series(self, event_id, bookmaker_key, market_key, outcome_name, start=None, end=None):
+        """Return the (time, price, point) changes of one series within a time range."""
+        query = """
+            SELECT block_start, prev_price, prev_point, time_deltas, price_deltas, point_deltas
+            FROM odds_history_blocks
+            WHERE event_id = %s AND bookmaker_key = %s AND market_key = %s AND outcome_name = %s
+        """
+        params = [event_id, bookmaker_key, market_key, outcome_name]
+        if start:
+            query += " AND block_end >= %s"
+            params.append(start)
+        if end:
+            query += " AND block_start <= %s"
+            params.append(end)
+        query += " ORDER BY block_start"
+
+        self.db_cursor.execute(query, params)
+        return [
+            entry
+            for row in self.db_cursor.fetchall()
+            for entry in HistoryBlock.from_row(row).entries()
+            if (not start or entry[0] >= start) and (not end or entry[0] <= end)
+        ]
+
+    def opening_vs_current(self, event_id, market_key=None):
+        """Return the opening and latest price of every series of an event."""
+        query = """
+            SELECT bookmaker_key, market_key, outcome_name, opened_at, open_price, open_point,
+                   latest_at, latest_price, latest_point, change_count
+            FROM odds_history_series
+            WHERE event_id = %s
+        """
+        params = [event_id]
+        if market_key:
+            query += " AND market_key = %s"
+            params.append(market_key)
+        query += " ORDER BY market_key, bookmaker_key, outcome_name"
+
+        self.db_cursor.execute(query, params)
+        return self.db_cursor.fetchall()
+
+    def movement(self, event_id, since):
+        """Return every series of an event whose price changed after a given time.
+
+        Returns:
+            list: Dicts with the price in effect at `since` and the latest price
+        """
+        self.db_cursor.execute(
+            """
+            SELECT event_id, bookmaker_key, market_key, outcome_name,
+                   block_start, prev_price, prev_point, time_deltas, price_deltas, point_deltas
+            FROM odds_history_blocks
+            WHERE event_id = %s AND block_end >= %s
+            ORDER BY bookmaker_key, market_key, outcome_name, block_start
+            """,
+            (event_id, since)
+        )
+
+        movements = {}
+        for row in self.db_cursor.fetchall():
+            key = tuple(row[column] for column in SERIES_COLUMNS)
+            entries = list(HistoryBlock.from_row(row).entries())
+            if key not in movements:
+                # The earliest matching block holds the price in effect at `since`
+                before = [entry for entry in entries if entry[0] <= since]
+                if before:
+                    from_price, from_point = before[-1][1], before[-1][2]
+                elif row["prev_price"] is not None:
+                    from_price = row["prev_price"]
+                    from_point = float(row["prev_point"]) if row["prev_point"] is not None else None
+                else:
+                    from_price, from_point = entries[0][1], entries[0][2]
+                movements[key] = dict(zip(SERIES_COLUMNS, key), from_price=from_price,
+                                      from_point=from_point, changes=0)
+
+            movement = movements[key]
+            after = [entry for entry in entries if entry[0] > since]
+            movement["changes"] += len(after)
+            if entries:
+                movement["to_price"], movement["to_point"] = entries[-1][1], entries[-1][2]
+
+        return [movement for movement in movements.values() if movement["changes"]]
+
+    def ohlc(self, event_id, market_key, start=None, end=None):
+        """Return the open/high/low/close rows of an event's market within a time range."""
+        query = """
+            SELECT bookmaker_key, outcome_name, interval_start, open_price, high_price,
+                   low_price, close_price, open_point, close_point, changes
+            FROM odds_history_ohlc
+            WHERE event_id = %s AND market_key = %s
+        """
+        params = [event_id, market_key]
+        if start:
+            query += " AND interval_start >= %s"
+            params.append(start)
+        if end:
+            query += " AND interval_start <= %s"
+            params.append(end)
+        query += " ORDER BY bookmaker_key, outcome_name, interval_start"
+
+        self.db_cursor.execute(query, params)
+        return self.db_cursor.fetchall()
+
+
+def main():
+    """Main function to query the odds history."""
+    parser = argparse.ArgumentParser(description="Query odds movement history (default: opening vs current prices)")
+    parser.add_argument("--event", type=str, required=True, help="The Odds API event id")
+    parser.add_argument("--market", type=str, help="Market key (h2h, spreads, totals)")
+    parser.add_argument("--movement", type=int, metavar="MINUTES",
+                        help="Show prices that moved in the last MINUTES minutes")
+
+    args = parser.parse_args()
+
+    try:
+        db_conn = mysql.connector.connect(**DB_CONFIG)
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        sys.exit(1)
+
+    try:
+        store = OddsHistoryStore(db_conn)
+        if args.movement:
+            since = datetime.utcnow() - timedelta(minutes=args.movement)
+            for row in store.movement(args.event, since):
+                if args.market and row["market_key"] != args.market:
+                    continue
+                print(f"{row['bookmaker_key']:<20} {row['market_key']:<10} {row['outcome_name']:<30} "
+                      f"{row['from_price']:>6} -> {row['to_price']:>6} ({row['changes']} changes)")
+        else:
+            for row in store.opening_vs_current(args.event, args.market):
+                print(f"{row['bookmaker_key']:<20} {row['market_key']:<10} {row['outcome_name']:<30} "
+                      f"{row['open_price']:>6} -> {row['latest_price']:>6} ({row['change_count']} changes)")
+    except (mysql.connector.Error, DatabaseError) as err:
+        logger.error(f"Error querying odds history: {err}")
+        sys.exit(1)
+    finally:
+        db_conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Columnar Export Script
+
+This script exports the analytical tables (fixtures, standings, player
+statistics and the tennis/cricket tables) to partitioned Parquet files, so
+analysts and model training jobs can read them without querying the
+production database.
+
+The first run of a table writes every row. Later runs only export rows whose
+updated_at moved past the table's watermark, as a new part file in each
+partition they touch; the watermark is kept in _manifest.json in the export
+directory. Each run re-reads a short window before the watermark; the
+manifest also keeps a digest of the rows in that window, so rows already
+exported unchanged are skipped and a run without changes writes no part
+files. A row updated again shows up in more than one part file, and
+read_table() keeps the copy from the newest file. Deleted rows are only
+dropped by a --full export. Tables without an updated_at column are always
+exported in full.
+
+With --format arrow the parts are written as uncompressed Arrow IPC files,
+which read_table() memory-maps without copying. Parquet parts are
+memory-mapped too but still have to be decoded.
+"""
+
+import os
+import sys
+import json
+import glob
+import heapq
+import hashlib
+import logging
+import argparse
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import mysql.connector
+from decimal import Decimal
+from datetime import datetime, timedelta
+from sports_data_fetcher import DB_CONFIG, DatabaseError
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("parquet_export.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("parquet_export")
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+MANIFEST_FILE = "_manifest.json"
+BATCH_SIZE = 50000
+# Rows updated by transactions still open when the previous run read the
+# table can carry an older updated_at; re-reading this window picks them up
+WATERMARK_OVERLAP_SECONDS = 300
+# Most row digests of the overlap window kept in the manifest; rows beyond it
+# (the oldest) are exported again by the next run
+RECENT_ROWS_LIMIT = 100000
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Table -> (primary key, partition label, partition column); a "year" label
+# partitions by the year of a date column, no label means a single partition
+EXPORT_TABLES = {
+    "fixtures": ("fixture_id", "season", "season"),
+    "standings": ("standing_id", "season", "season"),
+    "player_statistics": ("player_stat_id", None, None),
+    "tennis_rankings": ("ranking_id", "year", "ranking_date"),
+    "tennis_matches": ("match_id", "year", "scheduled_time"),
+    "tennis_match_sets": ("set_id", None, None),
+    "tennis_match_statistics": ("stat_id", None, None),
+    "cricket_matches": ("match_id", "year", "scheduled_time"),
+    "cricket_innings": ("innings_id", None, None),
+    "cricket_batting_stats": ("batting_stat_id", None, None),
+    "cricket_bowling_stats": ("bowling_stat_id", None, None),
+    "cricket_standings": ("standing_id", None, None),
+}
+
+FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def arrow_type(data_type, column_type, precision, scale):
+    """Map a MySQL column type from information_schema to an Arrow type."""
+    if data_type == "tinyint" and column_type.startswith("tinyint(1)"):
+        return pa.bool_()
+    if data_type in ("tinyint", "smallint", "mediumint", "int"):
+        return pa.int64() if "unsigned" in column_type else pa.int32()
+    if data_type == "bigint":
+        return pa.int64()
+    if data_type == "decimal":
+        return pa.decimal128(precision, scale)
+    if data_type == "float":
+        return pa.float32()
+    if data_type == "double":
+        return pa.float64()
+    if data_type == "date":
+        return pa.date32()
+    if data_type in ("datetime", "timestamp"):
+        return pa.timestamp("s")
+    if data_type in ("binary", "varbinary", "blob", "tinyblob", "mediumblob", "longblob"):
+        return pa.binary()
+    return pa.string()
+
+
+def _to_decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _row_digest(row):
+    """Short digest of a row's values, to recognize rows exported unchanged."""
+    return hashlib.blake2b(repr(row).encode(), digest_size=8).hexdigest()
+
+
+def _partition_dir(label, value):
+    if label is None:
+        return ""
+    return f"{label}={NULL_PARTITION if value is None else value}"
+
+
+class _PartWriter:
+    """Streams record batches into one part file, renamed into place on close."""
+
+    def __init__(self, path, schema, file_format):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.temp_path = path + ".tmp"
+        if file_format == "arrow":
+            self.sink = pa.OSFile(self.temp_path, "wb")
+            self.writer = pa.ipc.new_file(self.sink, schema)
+        else:
+            self.sink = None
+            self.writer = pq.ParquetWriter(self.temp_path, schema, compression="zstd")
+
+    def write(self, table):
+        self.writer.write_table(table)
+
+    def close(self, keep=True):
+        self.writer.close()
+        if self.sink is not None:
+            self.sink.close()
+        if keep:
+            os.replace(self.temp_path, self.path)
+        else:
+            os.remove(self.temp_path)
+
+
+def _read_part(path):
+    if path.endswith(".arrow"):
+        # Buffers point straight into the mapped file
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return pq.read_table(path, memory_map=True)
+
+
+def _latest_rows(table, key):
+    """Keep the last occurrence of each primary key value."""
+    keys = table.column(key).to_numpy(zero_copy_only=False)
+    _, last = np.unique(keys[::-1], return_index=True)
+    if len(last) == len(keys):
+        return table
+    return table.take(np.sort(len(keys) - 1 - last))
+
+
+def _part_paths(directory, recursive=True):
+    """Complete part files under a directory, oldest export first."""
+    pattern = os.path.join(directory, "**", "part-*") if recursive else os.path.join(directory, "part-*")
+    paths = [path for path in glob.glob(pattern, recursive=recursive) if not path.endswith(".tmp")]
+    # Part files are named by export time, so later files hold newer rows
+    return sorted(paths, key=os.path.basename)
+
+
+def read_table(export_dir, table, partitions=None):
+    """Read an exported table, one row per primary key.
+
+    Args:
+        export_dir (str): Export directory
+        table (str): Table name
+        partitions (list, optional): Partition values to read (e.g. seasons);
+            a row that moved partition can show up in its old partition
+            until the table is compacted
+
+    Returns:
+        pyarrow.Table: Latest exported version of each row
+    """
+    key, label, _ = EXPORT_TABLES[table]
+    if partitions is None:
+        paths = _part_paths(os.path.join(export_dir, table))
+    else:
+        paths = sorted((path for value in partitions
+                        for path in _part_paths(os.path.join(export_dir, table, _partition_dir(label, value)),
+                                                recursive=False)), key=os.path.basename)
+    if not paths:
+        return None
+
+    parts = [_read_part(path) for path in paths]
+    return _latest_rows(pa.concat_tables(parts, promote_options="default"), key)
+
+
+class ParquetExporter:
+    """Class to export database tables to partitioned columnar files."""
+
+    def __init__(self, db_conn, export_dir=EXPORT_DIR, file_format="parquet", batch_size=BATCH_SIZE):
+        """Initialize the exporter.
+
+        Args:
+            db_conn: Open MySQL connection
+            export_dir (str): Directory the table directories are written to
+            file_format (str): 'parquet' or 'arrow'
+            batch_size (int): Rows fetched from the database at a time
+        """
+        self.db_conn = db_conn
+        self.export_dir = export_dir
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.manifest_path = os.path.join(export_dir, MANIFEST_FILE)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, "r") as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        os.makedirs(self.export_dir, exist_ok=True)
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def table_schema(self, table):
+        """Return the Arrow schema of a table, or None if it doesn't exist."""
+        cursor = self.db_conn.cursor()
+        cursor.execute(
+            """
+            SELECT COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, NUMERIC_PRECISION, NUMERIC_SCALE
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            ORDER BY ORDINAL_POSITION
+            """,
+            (table,)
+        )
+        columns = cursor.fetchall()
+        cursor.close()
+        if not columns:
+            return None
+        return pa.schema([
+            pa.field(name, arrow_type(data_type.lower(), column_type.lower(), precision, scale))
+            for name, data_type, column_type, precision, scale in columns
+        ])
+
+    def export_table(self, table, full=False):
+        """Export the rows of a table changed since the last run.
+
+        Args:
+            table (str): Table name from EXPORT_TABLES
+            full (bool): Rewrite the whole table instead of exporting changes
+
+        Returns:
+            int: Number of rows written
+        """
+        schema = self.table_schema(table)
+        if schema is None:
+            logger.warning(f"Table {table} does not exist, skipping")
+            return 0
+
+        key, label, partition_column = EXPORT_TABLES[table]
+        state = self.manifest.get(table)
+        incremental = "updated_at" in schema.names
+        if (full or not incremental or not state or state.get("format") != self.file_format
+                or state.get("columns") != schema.names):
+            full, watermark, exported = True, None, {}
+        else:
+            watermark = datetime.fromisoformat(state["watermark"]) if state.get("watermark") else None
+            # Rows of the overlap window as last exported: primary key -> digest
+            exported = state.get("recent") or {}
+
+        query = f"SELECT {', '.join(f'`{name}`' for name in schema.names)} FROM {table}"
+        params = []
+        if watermark:
+            query += " WHERE updated_at >= %s"
+            params.append(watermark - timedelta(seconds=WATERMARK_OVERLAP_SECONDS))
+
+        run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        part_name = f"part-{run_id}{FILE_EXTENSIONS[self.file_format]}"
+        partition_index = schema.names.index(partition_column) if partition_column else None
+        updated_index = schema.names.index("updated_at") if incremental else None
+        key_index = schema.names.index(key)
+        converters = [bool if field.type == pa.bool_() else
+                      _to_decimal if pa.types.is_decimal(field.type) else None
+                      for field in schema]
+
+        def to_table(rows):
+            columns = [
+                pa.array([None if v is None else convert(v) for v in column] if convert else column, field.type)
+                for column, field, convert in zip(zip(*rows), schema, converters)
+            ]
+            return pa.Table.from_arrays(columns, schema=schema)
+
+        # One part file per partition touched, written as batches arrive
+        writers = {}
+        count = 0
+        new_watermark = watermark
+        recent = {}  # primary key -> (updated_at, digest) of rows the next run re-reads
+        cursor = self.db_conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+
+                partitions = {}
+                for row in rows:
+                    updated_at = row[updated_index] if updated_index is not None else None
+                    if updated_at is not None:
+                        if new_watermark is None or updated_at > new_watermark:
+                            new_watermark = updated_at
+                        pk = str(row[key_index])
+                        digest = _row_digest(row)
+                        recent[pk] = (updated_at, digest)
+                        if exported.get(pk) == digest:
+                            continue
+                    value = row[partition_index] if partition_index is not None else None
+                    if label == "year" and value is not None:
+                        value = value.year
+                    partitions.setdefault(value, []).append(row)
+                    count += 1
+
+                if new_watermark is not None:
+                    window_start = new_watermark - timedelta(seconds=WATERMARK_OVERLAP_SECONDS)
+                    recent = {pk: entry for pk, entry in recent.items() if entry[0] >= window_start}
+                    if len(recent) > RECENT_ROWS_LIMIT:
+                        recent = dict(heapq.nlargest(RECENT_ROWS_LIMIT, recent.items(), key=lambda item: item[1][0]))
+
+                for value, partition_rows in partitions.items():
+                    if value not in writers:
+                        path = os.path.join(self.export_dir, table, _partition_dir(label, value), part_name)
+                        writers[value] = _PartWriter(path, schema, self.file_format)
+                    writers[value].write(to_table(partition_rows))
+        except mysql.connector.Error as err:
+            for writer in writers.values():
+                writer.close(keep=False)
+            logger.error(f"Error reading {table}: {err}")
+            raise DatabaseError(f"Failed to export {table}: {err}")
+        finally:
+            cursor.close()
+
+        for writer in writers.values():
+            writer.close()
+        if full:
+            # Older parts are only removed once the new ones are in place
+            new_paths = {writer.path for writer in writers.values()}
+            for path in _part_paths(os.path.join(self.export_dir, table)):
+                if path not in new_paths:
+                    os.remove(path)
+
+        self.manifest[table] = {
+            "format": self.file_format,
+            "columns": schema.names,
+            "watermark": new_watermark.isoformat() if new_watermark else None,
+            "recent": {pk: digest for pk, (_, digest) in recent.items()},
+            "exported_at": datetime.utcnow().replace(microsecond=0).isoformat(),
+        }
+        self._save_manifest()
+
+        logger.info(
+            f"Exported {count} {'rows' if full else 'changed rows'} of {table} "
+            f"into {len(writers)} partitions"
+        )
+        return count
+
+    def compact_table(self, table):
+        """Rewrite an exported table as a single part file per partition.
+
+        Also drops stale copies of rows that moved to another partition.
+        """
+        _, label, partition_column = EXPORT_TABLES[table]
+        paths = _part_paths(os.path.join(self.export_dir, table))
+        if len(paths) < 2:
+            return
+
+        merged = read_table(self.export_dir, table)
+        if label is None:
+            groups = {None: merged}
+        else:
+            column = merged.column(partition_column)
+            if label == "year":
+                column = pc.year(column)
+            groups = {
+                value: merged.filter(pc.is_null(column) if value is None else pc.equal(column, value))
+                for value in pc.unique(column).to_pylist()
+            }
+
+        run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        part_name = f"part-{run_id}{FILE_EXTENSIONS[self.file_format]}"
+        for value, rows in groups.items():
+            writer = _PartWriter(os.path.join(self.export_dir, table, _partition_dir(label, value), part_name),
+                                 merged.schema, self.file_format)
+            writer.write(rows)
+            writer.close()
+        for path in paths:
+            os.remove(path)
+        logger.info(f"Compacted {len(paths)} part files of {table} into {len(groups)} ({merged.num_rows} rows)")
+
+    def run(self, tables=None, full=False, compact=False):
+        """Export (and optionally compact) a list of tables.
+
+        Returns:
+            dict: table -> rows written
+        """
+        counts = {}
+        for table in tables or EXPORT_TABLES:
+            counts[table] = self.export_table(table, full)
+            if compact:
+                self.compact_table(table)
+        return counts
+
+
+def main():
+    """Main function to export tables."""
+    parser = argparse.ArgumentParser(description="Export analytical tables to partitioned Parquet files")
+    parser.add_argument("--output", type=str, default=EXPORT_DIR,
+                        help=f"Export directory (default: {EXPORT_DIR})")
+    parser.add_argument("--tables", type=str, nargs="+", choices=sorted(EXPORT_TABLES),
+                        help="Tables to export (default: all)")
+    parser.add_argument("--full", action="store_true", help="Rewrite the tables instead of exporting changes")
+    parser.add_argument("--format", type=str, choices=sorted(FILE_EXTENSIONS), default="parquet",
+                        help="File format: parquet (compressed) or arrow (memory-mappable, uncompressed)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Merge the part files of each partition after exporting")
+
+    args = parser.parse_args()
+
+    try:
+        db_conn = mysql.connector.connect(**DB_CONFIG)
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        sys.exit(1)
+
+    try:
+        ParquetExporter(db_conn, args.output, args.format).run(args.tables, args.full, args.compact)
+    except DatabaseError as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+    finally:
+        db_conn.close()
+
+if __name__ == "__main__":
+    main()
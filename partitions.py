@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Table Partitioning Helpers
+
+This module converts fixtures to RANGE partitioning by season and
+api_request_log to RANGE partitioning by month, and adds partitions ahead of
+time. It is used by setup_database.py (--partition) and log_retention.py.
+
+MySQL does not allow foreign keys on partitioned tables or referencing them,
+so partitioning fixtures drops the foreign keys of fixtures and of every
+table that references it; the fetchers already look up parent rows before
+inserting. Every unique key of a partitioned table must include the
+partitioning column, so the api_fixture_id key becomes (api_fixture_id,
+season).
+"""
+
+import logging
+from datetime import date, datetime
+
+logger = logging.getLogger("partitions")
+
+FUTURE_PARTITION = "p_future"
+FIXTURES_NATURAL_KEY = "uq_fixtures_api_fixture_id"
+
+
+def list_partitions(conn, table):
+    """Return [(partition_name, upper_bound)] for a table, [] if it isn't partitioned.
+
+    The upper bound is an int, or None for MAXVALUE.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+        """,
+        (table,)
+    )
+    partitions = [
+        (name, None if description == "MAXVALUE" else int(description))
+        for name, description in cursor.fetchall()
+    ]
+    cursor.close()
+    return partitions
+
+
+def month_start(day, offset=0):
+    """First day of the month `offset` months after the month of `day`."""
+    month = day.month - 1 + offset
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _unix_timestamp(conn, day):
+    cursor = conn.cursor()
+    cursor.execute("SELECT UNIX_TIMESTAMP(%s)", (datetime(day.year, day.month, day.day),))
+    value = int(cursor.fetchone()[0])
+    cursor.close()
+    return value
+
+
+def _month_partition(conn, month):
+    """Partition definition holding the rows of one month."""
+    upper = _unix_timestamp(conn, month_start(month, 1))
+    return f"PARTITION p{month:%Y%m} VALUES LESS THAN ({upper})"
+
+
+def _season_partition(season):
+    return f"PARTITION p{season} VALUES LESS THAN ({season + 1})"
+
+
+def _drop_foreign_keys(conn, table):
+    """Drop the foreign keys of a table and those referencing it."""
+    cursor = conn.cursor()
+    cursor.execute(
+        """
+        SELECT DISTINCT TABLE_NAME, CONSTRAINT_NAME
+        FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND REFERENCED_TABLE_NAME IS NOT NULL
+          AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)
+        """,
+        (table, table)
+    )
+    for table_name, constraint in cursor.fetchall():
+        logger.info(f"Dropping foreign key {table_name}.{constraint}")
+        cursor.execute(f"ALTER TABLE `{table_name}` DROP FOREIGN KEY `{constraint}`")
+    cursor.close()
+
+
+def partition_fixtures(conn, first_season, last_season):
+    """Partition fixtures by season, one partition per season from first_season to last_season."""
+    if list_partitions(conn, "fixtures"):
+        logger.info("fixtures is already partitioned")
+        return
+
+    _drop_foreign_keys(conn, "fixtures")
+
+    cursor = conn.cursor()
+    # The partitioning column must be part of every unique key and can't be NULL
+    cursor.execute("UPDATE fixtures SET season = COALESCE(YEAR(fixture_date), 0) WHERE season IS NULL")
+    conn.commit()
+
+    partitions = [f"PARTITION p_old VALUES LESS THAN ({first_season})"]
+    partitions += [_season_partition(season) for season in range(first_season, last_season + 1)]
+    partitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+
+    # The natural key becomes (api_fixture_id, season); a fixture never changes season
+    cursor.execute(
+        """
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'fixtures' AND INDEX_NAME = %s
+        """,
+        (FIXTURES_NATURAL_KEY,)
+    )
+    natural_key = ""
+    if cursor.fetchone()[0]:
+        natural_key = (f"DROP INDEX {FIXTURES_NATURAL_KEY}, "
+                       f"ADD UNIQUE INDEX {FIXTURES_NATURAL_KEY} (api_fixture_id, season),")
+
+    logger.info(f"Partitioning fixtures by season ({first_season}-{last_season})")
+    cursor.execute(
+        f"""
+        ALTER TABLE fixtures
+            MODIFY season INT NOT NULL,
+            {natural_key}
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (fixture_id, season)
+        PARTITION BY RANGE (season) (
+            {", ".join(partitions)}
+        )
+        """
+    )
+    cursor.close()
+
+
+def partition_request_log(conn, months_back, months_ahead):
+    """Partition api_request_log by month of created_at."""
+    if list_partitions(conn, "api_request_log"):
+        logger.info("api_request_log is already partitioned")
+        return
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(created_at) FROM api_request_log")
+    oldest = cursor.fetchone()[0]
+
+    today = date.today()
+    first_month = month_start(today, -months_back)
+    if oldest and oldest.date() < first_month:
+        first_month = month_start(oldest.date())
+    months = []
+    month = first_month
+    while month <= month_start(today, months_ahead):
+        months.append(month)
+        month = month_start(month, 1)
+
+    partitions = [_month_partition(conn, month) for month in months]
+    partitions.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+
+    logger.info(f"Partitioning api_request_log by month ({months[0]:%Y-%m} to {months[-1]:%Y-%m})")
+    cursor.execute(
+        f"""
+        ALTER TABLE api_request_log
+            MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (log_id, created_at)
+        PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+            {", ".join(partitions)}
+        )
+        """
+    )
+    cursor.close()
+
+
+def _split_future_partition(conn, table, partitions):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"""
+        ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO (
+            {", ".join(partitions)},
+            PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE
+        )
+        """
+    )
+    cursor.close()
+
+
+def add_month_partitions(conn, months_ahead):
+    """Make sure api_request_log has a partition for each of the next months_ahead months."""
+    existing = list_partitions(conn, "api_request_log")
+    if not existing:
+        return []
+
+    names = {name for name, _ in existing}
+    today = date.today()
+    months = [month_start(today, offset) for offset in range(months_ahead + 1)]
+    missing = [month for month in months if f"p{month:%Y%m}" not in names]
+    if missing:
+        logger.info(f"Adding api_request_log partitions: {', '.join(f'p{m:%Y%m}' for m in missing)}")
+        _split_future_partition(conn, "api_request_log", [_month_partition(conn, m) for m in missing])
+    return missing
+
+
+def add_season_partitions(conn, last_season):
+    """Make sure fixtures has a partition for every season up to last_season."""
+    existing = list_partitions(conn, "fixtures")
+    bounded = [upper for _, upper in existing if upper is not None]
+    if not bounded:
+        return []
+
+    missing = list(range(max(bounded), last_season + 1))
+    if missing:
+        logger.info(f"Adding fixtures partitions: {', '.join(f'p{s}' for s in missing)}")
+        _split_future_partition(conn, "fixtures", [_season_partition(s) for s in missing])
+    return missing
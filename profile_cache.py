@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Tennis Competitor Profile Cache
+
+Competitor profiles barely change during a tournament, but rendering one
+draw needs a profile for every player in it. TennisAPI.get_competitor_profile
+serves them from this cache:
+
+- Entries are fresh for PROFILE_CACHE_TTL seconds. An expired profile is
+  still returned if refreshing it fails.
+- Beyond PROFILE_CACHE_SIZE entries the least recently used are evicted.
+- The cache is saved to PROFILE_CACHE_PATH at most every
+  SAVE_INTERVAL_SECONDS and when the process exits, so a restarted process
+  starts warm.
+
+Run it before the day's play to pre-warm the profiles of every competitor in
+the day's daily summaries with concurrent, rate-limited requests:
+
+    python profile_cache.py --date 2024-06-01 --workers 4 --rate 1
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import argparse
+import threading
+import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dotenv import load_dotenv
+from http_resilience import CircuitOpenError, RateLimiter
+
+logger = logging.getLogger("profile_cache")
+
+# Load environment variables
+load_dotenv()
+
+PROFILE_CACHE_TTL = int(os.getenv("PROFILE_CACHE_TTL", str(24 * 3600)))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "5000"))
+PROFILE_CACHE_PATH = os.getenv("PROFILE_CACHE_PATH", "tennis_profiles.json")
+# SportRadar's trial access level allows one request per second
+PREWARM_RATE = float(os.getenv("PROFILE_PREWARM_RATE", "1"))
+PREWARM_WORKERS = 4
+SAVE_INTERVAL_SECONDS = 60
+
+
+class ProfileCache:
+    """Thread-safe LRU cache of profiles with a TTL, persisted to a JSON file."""
+
+    def __init__(self, ttl=PROFILE_CACHE_TTL, max_size=PROFILE_CACHE_SIZE, path=PROFILE_CACHE_PATH):
+        """Initialize the cache and load the saved entries.
+
+        Args:
+            ttl (float): Seconds a profile is fresh
+            max_size (int): Most profiles kept
+            path (str, optional): File the cache is saved to; None keeps it in memory
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()  # key -> (fetched_at, profile), least recently used first
+        self.lock = threading.Lock()
+        # Held while writing the file, so concurrent saves don't interleave
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.saved_at = time.time()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, allow_stale=False):
+        """Return a cached profile, None if it is missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            fetched_at, profile = entry
+            if not allow_stale and time.time() - fetched_at >= self.ttl:
+                return None
+            self.entries.move_to_end(key)
+            return profile
+
+    def put(self, key, profile, fetched_at=None):
+        """Store a profile, evicting the least recently used beyond max_size."""
+        with self.lock:
+            self.entries[key] = (fetched_at or time.time(), profile)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+            self.dirty = True
+            # Claimed under the lock, so only one of several concurrent puts saves
+            save = self.path and time.time() - self.saved_at >= SAVE_INTERVAL_SECONDS
+            if save:
+                self.saved_at = time.time()
+        if save:
+            try:
+                self.save()
+            except OSError as err:
+                # The profile is cached either way; the next save retries
+                logger.warning(f"Failed to save profile cache {self.path}: {err}")
+
+    def get_or_fetch(self, key, fetch):
+        """Return a fresh cached profile, or fetch and cache it.
+
+        Args:
+            key (str): Competitor ID
+            fetch (callable): Called without arguments to request the profile
+
+        Raises:
+            requests.exceptions.RequestException: If fetching failed and no
+                expired profile is cached either
+        """
+        profile = self.get(key)
+        if profile is not None:
+            self.hits += 1
+            return profile
+
+        self.misses += 1
+        try:
+            profile = fetch()
+        except requests.exceptions.RequestException as err:
+            stale = self.get(key, allow_stale=True)
+            if stale is None:
+                raise
+            logger.warning(f"Serving expired profile of {key}: {err}")
+            return stale
+        self.put(key, profile)
+        return profile
+
+    def missing(self, keys):
+        """Return the keys without a fresh profile, in order and without duplicates."""
+        return [key for key in dict.fromkeys(keys) if self.get(key) is None]
+
+    def prewarm(self, keys, fetch, workers=PREWARM_WORKERS, rate=PREWARM_RATE):
+        """Fetch the profiles missing for keys concurrently, at most rate requests per second.
+
+        Args:
+            keys (iterable): Competitor IDs
+            fetch (callable): fetch(key) requests one profile
+            workers (int): Concurrent requests
+            rate (float): Requests per second across all workers
+
+        Returns:
+            tuple: (fetched, failed) counts
+        """
+        missing = self.missing(keys)
+        if not missing:
+            return 0, 0
+
+        limiter = RateLimiter(rate)
+
+        def load(key):
+            limiter.acquire()
+            self.put(key, fetch(key))
+
+        fetched = failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(load, key): key for key in missing}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    fetched += 1
+                except CircuitOpenError as err:
+                    # The provider is down; don't queue the rest behind the breaker
+                    logger.warning(f"Stopping pre-warm: {err}")
+                    for pending in futures:
+                        pending.cancel()
+                    failed += 1
+                except requests.exceptions.RequestException as err:
+                    logger.warning(f"Failed to pre-warm profile {futures[future]}: {err}")
+                    failed += 1
+
+        self.flush()
+        return fetched, failed
+
+    def load(self):
+        """Load the entries saved by save(); a missing or unreadable file starts empty."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as err:
+            logger.warning(f"Ignoring unreadable profile cache {self.path}: {err}")
+            return
+
+        with self.lock:
+            for key, fetched_at, profile in saved.get("entries", []):
+                self.entries[key] = (fetched_at, profile)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        logger.info(f"Loaded {len(self.entries)} cached profiles from {self.path}")
+
+    def save(self):
+        """Write the entries, least recently used first, replacing the file atomically."""
+        with self.save_lock:
+            with self.lock:
+                entries = [[key, fetched_at, profile] for key, (fetched_at, profile) in self.entries.items()]
+                self.dirty = False
+                self.saved_at = time.time()
+
+            # Per-process temporary file, as other processes may save the same cache
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(temporary, "w") as f:
+                    json.dump({"entries": entries}, f)
+                os.replace(temporary, self.path)
+            except OSError:
+                self.dirty = True
+                raise
+
+    def flush(self):
+        """Save the entries if they changed since the last save."""
+        if self.path and self.dirty:
+            try:
+                self.save()
+            except OSError as err:
+                logger.warning(f"Failed to save profile cache {self.path}: {err}")
+
+
+_profile_cache = None
+_profile_cache_lock = threading.Lock()
+
+
+def get_profile_cache():
+    """Return the process-wide competitor profile cache."""
+    global _profile_cache
+    with _profile_cache_lock:
+        if _profile_cache is None:
+            _profile_cache = ProfileCache()
+            # Profiles fetched since the last periodic save survive a restart
+            atexit.register(_profile_cache.flush)
+        return _profile_cache
+
+
+def daily_competitor_ids(daily_summaries):
+    """Return the competitor IDs of a TennisAPI.get_daily_summaries() result."""
+    return [
+        competitor["id"]
+        for summary in daily_summaries.get("summaries", [])
+        for competitor in summary.get("sport_event", {}).get("competitors", [])
+        if competitor.get("id")
+    ]
+
+
+def main():
+    """Main function to pre-warm the profiles of a day's competitors."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Pre-warm the tennis competitor profile cache")
+    parser.add_argument("--date", type=str, help="Day in YYYY-MM-DD format (default: today)")
+    parser.add_argument("--workers", type=int, default=PREWARM_WORKERS,
+                        help=f"Concurrent requests (default: {PREWARM_WORKERS})")
+    parser.add_argument("--rate", type=float, default=PREWARM_RATE,
+                        help=f"Requests per second (default: {PREWARM_RATE:g})")
+
+    args = parser.parse_args()
+
+    # Imported here because sportradar_data_fetcher imports this module
+    from sportradar_data_fetcher import TennisAPI, close_shared_session
+
+    try:
+        fetched, failed = TennisAPI().prewarm_competitor_profiles(args.date, args.workers, args.rate)
+        logger.info(f"Pre-warmed {fetched} profiles ({failed} failed), {len(get_profile_cache())} cached")
+    except (requests.exceptions.RequestException, ValueError) as err:
+        logger.error(f"Error pre-warming profiles: {err}")
+        sys.exit(1)
+    finally:
+        close_shared_session()
+
+if __name__ == "__main__":
+    main()
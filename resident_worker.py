@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Resident Worker Script
+
+This script keeps one SportsDataFetcher loaded, with its HTTP session and
+database connection open, and runs update commands sent over a local Unix
+socket. Scheduled ticks use worker_client.py, which only needs the standard
+library, so a live update no longer pays for interpreter start-up, imports,
+.env loading and a database connect each time.
+
+Commands, one per line:
+
+    live                 Update live fixtures
+    league ID SEASON     Fetch teams and fixtures of one league (internal ID)
+    full [SEASON]        Run a full update
+    search QUERY         Type-ahead search; replies "ok" and a JSON list
+    ping                 Check that the worker is up
+    shutdown             Stop the worker
+
+Commands run one at a time. A command that arrives while another one is
+running is answered with "busy" instead of queuing behind it. Searches are
+answered from the in-memory search index at any time; the index is refreshed
+after each update command and saved to SEARCH_INDEX_PATH.
+"""
+
+import os
+import sys
+import time
+import socket
+import signal
+import logging
+import json
+import argparse
+import threading
+import socketserver
+from sports_data_fetcher import SportsDataFetcher
+from search_index import SearchIndex, SEARCH_INDEX_PATH
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("resident_worker.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("resident_worker")
+
+WORKER_SOCKET = os.getenv("WORKER_SOCKET", "/tmp/sports_data_worker.sock")
+
+
+class _CommandHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline().decode("utf-8", "replace").strip()
+        reply = self.server.worker.execute(line)
+        self.wfile.write((reply + "\n").encode())
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ResidentWorker:
+    """Class to run fetcher commands received over a Unix socket."""
+
+    def __init__(self, socket_path=WORKER_SOCKET, fetcher=None, search_index_path=SEARCH_INDEX_PATH):
+        """Initialize the worker.
+
+        Args:
+            socket_path (str): Path of the Unix socket to listen on
+            fetcher (SportsDataFetcher, optional): Fetcher to run commands with
+            search_index_path (str, optional): Search index artifact; None keeps it in memory
+        """
+        self.socket_path = socket_path
+        self.fetcher = fetcher or SportsDataFetcher(keep_connection=True)
+        self.search_index_path = search_index_path
+        self.search_index = SearchIndex.load(search_index_path) if search_index_path else SearchIndex()
+        self.lock = threading.Lock()
+        self.current = None
+        self.server = None
+
+    def run_command(self, command, args):
+        """Run one command and return a short result message."""
+        if command == "live":
+            self.fetcher.update_live_fixtures()
+            return "live fixtures updated"
+        if command == "league":
+            if len(args) != 2:
+                raise ValueError("usage: league ID SEASON")
+            league_id, season = int(args[0]), int(args[1])
+            self.fetcher.connect_to_database()
+            self.fetcher.fetch_teams(league_id, season)
+            self.fetcher.fetch_fixtures(league_id, season)
+            return f"league {league_id} season {season} updated"
+        if command == "full":
+            season = int(args[0]) if args else None
+            self.fetcher.run_full_update(season)
+            return "full update completed"
+        raise ValueError(f"unknown command: {command}")
+
+    def refresh_search_index(self):
+        """Index the entities changed by the last command; failures only log."""
+        try:
+            self.fetcher.connect_to_database()
+            if self.search_index.refresh(self.fetcher.db_conn) and self.search_index_path:
+                self.search_index.save(self.search_index_path)
+        except Exception as err:
+            logger.error(f"Error refreshing search index: {err}")
+
+    def execute(self, line):
+        """Execute a command line and return the reply line.
+
+        Replies start with "ok", "busy" or "error".
+        """
+        parts = line.split()
+        if not parts:
+            return "error empty command"
+        command, args = parts[0].lower(), parts[1:]
+
+        if command == "ping":
+            return f"ok pong ({self.current or 'idle'})"
+        if command == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return "ok shutting down"
+        if command == "search":
+            # Answered from memory, even while an update runs
+            return "ok " + json.dumps(self.search_index.search(" ".join(args)), default=str)
+
+        if not self.lock.acquire(blocking=False):
+            return f"busy running {self.current}"
+        try:
+            self.current = line
+            start_time = time.time()
+            logger.info(f"Running '{line}'")
+            message = self.run_command(command, args)
+            self.refresh_search_index()
+            elapsed = time.time() - start_time
+            logger.info(f"Finished '{line}' in {elapsed:.3f}s")
+            return f"ok {message} in {elapsed:.3f}s"
+        except Exception as err:
+            logger.error(f"Command '{line}' failed: {err}")
+            # Don't leave a half-finished transaction on the kept connection
+            if self.fetcher.db_conn is not None:
+                try:
+                    self.fetcher.db_conn.rollback()
+                except Exception:
+                    pass
+            return f"error {err}"
+        finally:
+            self.current = None
+            self.lock.release()
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except OSError:
+            os.remove(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"Another worker is already listening on {self.socket_path}")
+
+    def serve(self):
+        """Listen for commands until shutdown or SIGTERM."""
+        self._remove_stale_socket()
+        self.server = _Server(self.socket_path, _CommandHandler)
+        self.server.worker = self
+        os.chmod(self.socket_path, 0o660)
+
+        def stop(signum, frame):
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+        signal.signal(signal.SIGTERM, stop)
+
+        # Connect up front so the first command doesn't pay for it
+        self.fetcher.connect_to_database()
+        self.refresh_search_index()
+        logger.info(f"Resident worker listening on {self.socket_path}")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self.fetcher.close_database_connection(force=True)
+            logger.info("Resident worker stopped")
+
+
+def main():
+    """Main function to run the resident worker."""
+    parser = argparse.ArgumentParser(description="Run fetcher commands received over a Unix socket")
+    parser.add_argument("--socket", type=str, default=WORKER_SOCKET,
+                        help=f"Unix socket path (default: {WORKER_SOCKET})")
+
+    args = parser.parse_args()
+
+    try:
+        ResidentWorker(args.socket).serve()
+    except KeyboardInterrupt:
+        logger.info("Resident worker interrupted by user.")
+    except Exception as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Provider Response Archive
+
+Records the responses of API-Sports and SportRadar into an append-only,
+compressed and indexed archive, and replays them so the ingest pipeline can
+be re-run offline, e.g. after fixing a parser bug, without spending quota
+or losing history.
+
+    RESPONSE_ARCHIVE_DIR/2024-06-01/api-sports.data   zlib-compressed frames
+    RESPONSE_ARCHIVE_DIR/2024-06-01/api-sports.idx    one JSON line per frame:
+                                                      [key, offset, length, recorded_at, status]
+
+A day's files are only ever appended to, under an exclusive file lock, so
+several recording processes can share a directory. The index line is written
+after its frame, so a crash never leaves an index entry pointing at a partial
+frame.
+
+With RESPONSE_ARCHIVE=record every response returned to the clients is
+archived after retries. With RESPONSE_ARCHIVE=replay (or
+sports_data_fetcher.py --replay DAY), requests are answered from one day of
+the archive instead of the network. Repeated requests for the same URL and
+parameters, such as live polls, get their recorded responses in order. A
+request that wasn't recorded, or was replayed as often as it was recorded,
+raises ArchiveMissError.
+
+    python response_archive.py                 # list the archived days
+    python response_archive.py --day 2024-06-01  # requests per endpoint of one day
+"""
+
+import os
+import sys
+import json
+import zlib
+import fcntl
+import logging
+import argparse
+import threading
+import requests
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode, urlsplit
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+
+logger = logging.getLogger("response_archive")
+
+# Load environment variables
+load_dotenv()
+
+RESPONSE_ARCHIVE = os.getenv("RESPONSE_ARCHIVE", "off")  # off, record or replay
+RESPONSE_ARCHIVE_DIR = os.getenv("RESPONSE_ARCHIVE_DIR", "response_archive")
+RESPONSE_ARCHIVE_DAY = os.getenv("RESPONSE_ARCHIVE_DAY")  # Day replayed (default: today)
+COMPRESSION_LEVEL = 6
+ARCHIVE_MODES = ("off", "record", "replay")
+
+
+class ArchiveMissError(requests.exceptions.RequestException):
+    """Raised in replay mode for a request with no recorded response left."""
+    pass
+
+
+def request_key(url, params=None):
+    """Archive key of a request: the URL with its parameters in sorted order."""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted((str(key), str(value)) for key, value in params.items()))}"
+
+
+def _today():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class ResponseArchive:
+    """Append-only archive of provider responses, one directory per day."""
+
+    def __init__(self, root=RESPONSE_ARCHIVE_DIR, day=None):
+        """Initialize the archive.
+
+        Args:
+            root (str): Archive directory
+            day (str, optional): Day replayed, YYYY-MM-DD (default: today, UTC)
+        """
+        self.root = root
+        self.day = day or _today()
+        self.lock = threading.Lock()
+        self.replay_queues = {}  # provider -> {key: deque of (offset, length)}
+        self.replay_files = {}   # provider -> open data file descriptor
+        self.replayed = 0
+        self.recorded = 0
+
+    def _paths(self, day, provider):
+        directory = os.path.join(self.root, day)
+        return os.path.join(directory, f"{provider}.data"), os.path.join(directory, f"{provider}.idx")
+
+    # Recording
+
+    def record(self, provider, url, params, response):
+        """Append a response to today's files of a provider."""
+        recorded_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+        key = request_key(url, params)
+        header = {
+            "key": key,
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "recorded_at": recorded_at,
+        }
+        frame = zlib.compress(json.dumps(header).encode() + b"\n" + response.content, COMPRESSION_LEVEL)
+
+        data_path, index_path = self._paths(recorded_at[:10], provider)
+        with self.lock:
+            os.makedirs(os.path.dirname(data_path), exist_ok=True)
+            with open(data_path, "ab") as data_file, open(index_path, "a") as index_file:
+                fcntl.flock(data_file, fcntl.LOCK_EX)
+                try:
+                    offset = data_file.seek(0, os.SEEK_END)
+                    data_file.write(frame)
+                    data_file.flush()
+                    index_file.write(json.dumps([key, offset, len(frame), recorded_at, response.status_code]) + "\n")
+                    index_file.flush()
+                finally:
+                    fcntl.flock(data_file, fcntl.LOCK_UN)
+            self.recorded += 1
+
+    # Replay
+
+    def read_index(self, provider, day=None):
+        """Return the [key, offset, length, recorded_at, status] entries of a day, in recording order."""
+        _, index_path = self._paths(day or self.day, provider)
+        if not os.path.exists(index_path):
+            return []
+        entries = []
+        with open(index_path, "r") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash; its frame is ignored
+                    logger.warning(f"Skipping truncated index line in {index_path}")
+        return entries
+
+    def _queues(self, provider):
+        queues = self.replay_queues.get(provider)
+        if queues is None:
+            queues = defaultdict(deque)
+            for key, offset, length, _, _ in self.read_index(provider):
+                queues[key].append((offset, length))
+            data_path, _ = self._paths(self.day, provider)
+            if queues:
+                self.replay_files[provider] = os.open(data_path, os.O_RDONLY)
+            self.replay_queues[provider] = queues
+            logger.info(f"Replaying {sum(map(len, queues.values()))} {provider} responses of {self.day}")
+        return queues
+
+    def replay(self, provider, url, params=None):
+        """Return the next recorded response of a request.
+
+        Raises:
+            ArchiveMissError: If no recorded response is left for the request
+        """
+        key = request_key(url, params)
+        with self.lock:
+            queue = self._queues(provider).get(key)
+            if not queue:
+                raise ArchiveMissError(f"No archived {provider} response left for {key} on {self.day}")
+            offset, length = queue.popleft()
+            frame = os.pread(self.replay_files[provider], length, offset)
+            self.replayed += 1
+
+        header, _, body = zlib.decompress(frame).partition(b"\n")
+        header = json.loads(header)
+
+        response = requests.Response()
+        response.status_code = header["status"]
+        response._content = body
+        response.url = key
+        response.reason = ""
+        response.encoding = "utf-8"
+        response.elapsed = timedelta(0)
+        response.headers = CaseInsensitiveDict({"Content-Type": header.get("content_type") or "application/json"})
+        return response
+
+    def remaining(self, provider):
+        """Number of recorded responses of a provider not replayed yet."""
+        with self.lock:
+            return sum(len(queue) for queue in self._queues(provider).values())
+
+    def close(self):
+        with self.lock:
+            for descriptor in self.replay_files.values():
+                os.close(descriptor)
+            self.replay_files = {}
+            self.replay_queues = {}
+
+
+class RecordingSession:
+    """Wraps a ResilientSession and archives every response it returns."""
+
+    def __init__(self, http, archive, provider):
+        self.http = http
+        self.archive = archive
+        self.provider = provider
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+    def get(self, url, endpoint="", **kwargs):
+        response = self.http.get(url, endpoint=endpoint, **kwargs)
+        try:
+            self.archive.record(self.provider, url, kwargs.get("params"), response)
+        except OSError as err:
+            # Archiving must never break ingest
+            logger.error(f"Failed to archive {self.provider} response from {endpoint}: {err}")
+        return response
+
+
+class ReplaySession:
+    """Answers ResilientSession-style get() calls from the archive, without network calls."""
+
+    def __init__(self, archive, provider, name=None):
+        self.archive = archive
+        self.provider = provider
+        self.name = name or provider
+
+    def get(self, url, endpoint="", **kwargs):
+        # Response hooks are not run: nothing was sent, so no quota is logged
+        return self.archive.replay(self.provider, url, kwargs.get("params"))
+
+
+_archive = None
+_archive_mode = None
+_archive_lock = threading.Lock()
+
+
+def configure_archive(mode, root=RESPONSE_ARCHIVE_DIR, day=None):
+    """Set the archive mode of the process, overriding RESPONSE_ARCHIVE.
+
+    Clients created afterwards record to or replay from the archive.
+
+    Returns:
+        ResponseArchive: The archive, None when mode is "off"
+    """
+    global _archive, _archive_mode
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Unknown response archive mode {mode!r}, expected one of {', '.join(ARCHIVE_MODES)}")
+    with _archive_lock:
+        if _archive is not None:
+            _archive.close()
+        _archive_mode = mode
+        _archive = ResponseArchive(root, day) if mode != "off" else None
+        return _archive
+
+
+def get_response_archive():
+    """Return (mode, archive) of the process, configured from the environment on first use."""
+    if _archive_mode is None:
+        configure_archive(RESPONSE_ARCHIVE, RESPONSE_ARCHIVE_DIR, RESPONSE_ARCHIVE_DAY)
+    return _archive_mode, _archive
+
+
+def archive_session(provider, http):
+    """Return http wrapped for the process's archive mode.
+
+    Args:
+        provider (str): Archive file name of the provider, e.g. "api-sports"
+        http (ResilientSession): Client used when not replaying
+    """
+    mode, archive = get_response_archive()
+    if mode == "record":
+        return RecordingSession(http, archive, provider)
+    if mode == "replay":
+        return ReplaySession(archive, provider, getattr(http, "name", provider))
+    return http
+
+
+def main():
+    """Main function to summarize the archive."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Summarize the provider response archive")
+    parser.add_argument("--dir", type=str, default=RESPONSE_ARCHIVE_DIR,
+                        help=f"Archive directory (default: {RESPONSE_ARCHIVE_DIR})")
+    parser.add_argument("--day", type=str, help="Show the requests per endpoint of one day (YYYY-MM-DD)")
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dir):
+        logger.error(f"No response archive in {args.dir}")
+        sys.exit(1)
+
+    archive = ResponseArchive(args.dir, args.day)
+    days = [args.day] if args.day else sorted(os.listdir(args.dir))
+    for day in days:
+        directory = os.path.join(args.dir, day)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".idx"):
+                continue
+            provider = name[:-len(".idx")]
+            entries = archive.read_index(provider, day)
+            size = os.path.getsize(os.path.join(directory, f"{provider}.data"))
+            print(f"{day}  {provider:<12} {len(entries):>7} responses  {size / 1024 / 1024:>8.1f} MB")
+            if args.day:
+                paths = Counter(urlsplit(entry[0]).path for entry in entries)
+                for path, count in paths.most_common():
+                    print(f"    {count:>7}  {path}")
+
+if __name__ == "__main__":
+    main()
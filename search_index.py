@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Type-Ahead Search Index
+
+Builds an in-memory search index over leagues, teams, players and tennis and
+cricket competitors for the type-ahead of components/Search.tsx, instead of
+LIKE '%x%' scans on MySQL:
+
+- Names are accent-folded and split into words; a query matches when each of
+  its words is a prefix of a different word of the name ("man u" finds
+  Manchester United). The words are kept in one sorted list searched with
+  bisect.
+- When prefixes find too few results, entities sharing the query's
+  trigrams are added, so infixes and small typos still match.
+- Results are ranked by match quality, then popularity (fixtures, appearances
+  or matches played), then name length.
+
+refresh() updates the index incrementally after an ingest: API-Sports rows
+updated since the last refresh, or whose fixtures or statistics were, are
+re-read; the SportRadar tables have no timestamps and are diffed. The index
+can be saved as a compact gzipped JSON artifact and loaded without a
+database. resident_worker.py serves it from memory ("search QUERY") and
+refreshes it after each ingest command.
+
+    python search_index.py --build                 # rebuild and save SEARCH_INDEX_PATH
+    python search_index.py --refresh               # load, refresh and save
+    python search_index.py --query "man u"         # search the saved artifact
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import heapq
+import bisect
+import logging
+import argparse
+import threading
+import mysql.connector
+from collections import Counter, defaultdict
+from dotenv import load_dotenv
+from entity_resolution import normalize, trigrams, similarity
+
+logger = logging.getLogger("search_index")
+
+# Load environment variables
+load_dotenv()
+
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", "search_index.json.gz")
+ARTIFACT_VERSION = 1
+DEFAULT_LIMIT = 10
+# Prefixes shorter than this match too many words to rank on every keystroke;
+# their top results are cached until an entity under them changes
+SHORT_PREFIX = 4
+SHORT_PREFIX_RESULTS = 50
+MIN_TRIGRAM_SIMILARITY = 0.4
+# Trigrams shared by more entities than this are too common to find typos with
+MAX_TRIGRAM_POSTINGS = 2000
+
+# kind -> (query, incremental condition, condition parameter count). The query
+# returns id, name, detail and popularity; the incremental condition selects
+# the rows to re-read since a timestamp, inclusive so rows written in the same
+# second as the last refresh aren't missed. None re-reads and diffs the table.
+SEARCH_SOURCES = {
+    "league": ("""
+        SELECT l.league_id AS id, l.name, c.name AS detail,
+               (SELECT COUNT(*) FROM fixtures f WHERE f.league_id = l.league_id) AS popularity
+        FROM leagues l LEFT JOIN countries c ON c.country_id = l.country_id
+    """, """
+        l.updated_at >= %s OR l.league_id IN (SELECT league_id FROM fixtures WHERE updated_at >= %s)
+    """, 2),
+    "team": ("""
+        SELECT t.team_id AS id, t.name, t.venue_city AS detail,
+               (SELECT COUNT(*) FROM fixtures f WHERE f.home_team_id = t.team_id)
+               + (SELECT COUNT(*) FROM fixtures f WHERE f.away_team_id = t.team_id) AS popularity
+        FROM teams t
+    """, """
+        t.updated_at >= %s
+        OR t.team_id IN (SELECT home_team_id FROM fixtures WHERE updated_at >= %s)
+        OR t.team_id IN (SELECT away_team_id FROM fixtures WHERE updated_at >= %s)
+    """, 3),
+    "player": ("""
+        SELECT p.player_id AS id, p.name, p.nationality AS detail,
+               (SELECT COUNT(*) FROM player_statistics s WHERE s.player_id = p.player_id) AS popularity
+        FROM players p
+    """, """
+        p.updated_at >= %s OR p.player_id IN (SELECT player_id FROM player_statistics WHERE updated_at >= %s)
+    """, 2),
+    "tennis_player": ("""
+        SELECT tp.player_id AS id, tp.full_name AS name, tp.nationality AS detail,
+               (SELECT COUNT(*) FROM tennis_matches m WHERE m.player1_id = tp.player_id)
+               + (SELECT COUNT(*) FROM tennis_matches m WHERE m.player2_id = tp.player_id) AS popularity
+        FROM tennis_players tp
+    """, None, 0),
+    "cricket_team": ("""
+        SELECT ct.team_id AS id, ct.name, ct.short_name AS detail,
+               (SELECT COUNT(*) FROM cricket_matches m WHERE m.home_team_id = ct.team_id)
+               + (SELECT COUNT(*) FROM cricket_matches m WHERE m.away_team_id = ct.team_id) AS popularity
+        FROM cricket_teams ct
+    """, None, 0),
+    "cricket_player": ("""
+        SELECT cp.player_id AS id, cp.full_name AS name, cp.nationality AS detail,
+               (SELECT COUNT(*) FROM cricket_batting_stats b WHERE b.player_id = cp.player_id) AS popularity
+        FROM cricket_players cp
+    """, None, 0),
+}
+
+
+class SearchEntry:
+    """One searchable entity."""
+
+    __slots__ = ("kind", "id", "name", "detail", "popularity", "folded", "words", "grams")
+
+    def __init__(self, kind, entity_id, name, detail=None, popularity=0):
+        self.kind = kind
+        self.id = entity_id
+        self.name = name
+        self.detail = detail
+        self.popularity = popularity or 0
+        self.folded = normalize(name)
+        self.words = tuple(dict.fromkeys(self.folded.split()))
+        self.grams = trigrams(self.folded)
+
+    def same_as(self, name, detail, popularity):
+        return self.name == name and self.detail == detail and self.popularity == (popularity or 0)
+
+    def as_dict(self):
+        return {"kind": self.kind, "id": self.id, "name": self.name, "detail": self.detail,
+                "popularity": self.popularity}
+
+
+def _matches(words, query_words):
+    """Each query word is a prefix of a different word of the name."""
+    used = set()
+    for query_word in query_words:
+        for position, word in enumerate(words):
+            if position not in used and word.startswith(query_word):
+                used.add(position)
+                break
+        else:
+            return False
+    return True
+
+
+class SearchIndex:
+    """Thread-safe prefix and trigram index of searchable entities."""
+
+    def __init__(self):
+        self.entries = {}               # (kind, id) -> SearchEntry
+        self.serials = {}               # (kind, id) -> serial number
+        self.keys = {}                  # serial number -> (kind, id)
+        self.next_serial = 0
+        self.words = []                 # sorted (word, serial) of every entry
+        self.postings = defaultdict(set)  # trigram -> {(kind, id)}
+        self.short_prefixes = {}        # prefix -> ranked keys, for prefixes shorter than SHORT_PREFIX
+        self.stale_prefixes = set()     # short prefixes dropped since warm_short_prefixes()
+        self.watermark = None           # database time of the last refresh
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Maintenance
+
+    def _add_key(self, key):
+        serial = self.next_serial
+        self.next_serial += 1
+        self.serials[key] = serial
+        self.keys[serial] = key
+        return serial
+
+    def _word_keys(self, entry, serial):
+        return [(word, serial) for word in entry.words]
+
+    def _forget_short_prefixes(self, entry):
+        for word in entry.words:
+            for length in range(1, SHORT_PREFIX):
+                self.short_prefixes.pop(word[:length], None)
+                self.stale_prefixes.add(word[:length])
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        serial = self.serials.pop(key)
+        del self.keys[serial]
+        for word_key in self._word_keys(entry, serial):
+            position = bisect.bisect_left(self.words, word_key)
+            if position < len(self.words) and self.words[position] == word_key:
+                del self.words[position]
+        for gram in entry.grams:
+            self.postings[gram].discard(key)
+        self._forget_short_prefixes(entry)
+
+    def put(self, kind, entity_id, name, detail=None, popularity=0):
+        """Add or replace one entity; returns False if it was already indexed unchanged."""
+        key = (kind, entity_id)
+        with self.lock:
+            existing = self.entries.get(key)
+            if existing is not None:
+                if existing.same_as(name, detail, popularity):
+                    return False
+                self._remove(key)
+            entry = SearchEntry(kind, entity_id, name, detail, popularity)
+            if not entry.folded:
+                return False
+            self.entries[key] = entry
+            for word_key in self._word_keys(entry, self._add_key(key)):
+                bisect.insort(self.words, word_key)
+            for gram in entry.grams:
+                self.postings[gram].add(key)
+            self._forget_short_prefixes(entry)
+            return True
+
+    def remove(self, kind, entity_id):
+        """Remove one entity if it is indexed."""
+        with self.lock:
+            if (kind, entity_id) in self.entries:
+                self._remove((kind, entity_id))
+
+    def _bulk_load(self, entries):
+        """Replace the contents with entries, sorting the word list once."""
+        with self.lock:
+            self.entries = {}
+            self.serials = {}
+            self.keys = {}
+            self.postings = defaultdict(set)
+            self.short_prefixes = {}
+            self.stale_prefixes = set()
+            words = []
+            for entry in entries:
+                if not entry.folded:
+                    continue
+                key = (entry.kind, entry.id)
+                self.entries[key] = entry
+                words.extend(self._word_keys(entry, self._add_key(key)))
+                for gram in entry.grams:
+                    self.postings[gram].add(key)
+            words.sort()
+            self.words = words
+            self.warm_short_prefixes()
+
+    # Search
+
+    def _rank(self, entry, folded_query):
+        quality = 2 if entry.folded.startswith(folded_query) else 1
+        return (-quality, -entry.popularity, len(entry.name), entry.name)
+
+    def _prefix_range(self, prefix):
+        """Positions in the word list of the words starting with prefix."""
+        return (bisect.bisect_left(self.words, (prefix,)),
+                bisect.bisect_left(self.words, (prefix + "\uffff",)))
+
+    def _prefix_keys(self, start, end):
+        """Keys of the entries with a word in words[start:end], without duplicates."""
+        keys = self.keys
+        return dict.fromkeys(keys[serial] for _, serial in self.words[start:end])
+
+    def _rank_prefix(self, prefix, keys):
+        """Cache and return the best SHORT_PREFIX_RESULTS keys for a short prefix."""
+        best = heapq.nsmallest(SHORT_PREFIX_RESULTS, (self.entries[key] for key in keys),
+                               key=lambda entry: self._rank(entry, prefix))
+        ranked = [(entry.kind, entry.id) for entry in best]
+        self.short_prefixes[prefix] = ranked
+        return ranked
+
+    def warm_short_prefixes(self):
+        """Rank the short prefixes whose results were dropped by changes, or all of them.
+
+        Keeps the first keystrokes from paying for ranking thousands of entities.
+        """
+        with self.lock:
+            if not self.short_prefixes:
+                # One pass over the word list for every prefix length
+                for length in range(1, SHORT_PREFIX):
+                    groups = defaultdict(dict)
+                    for word, serial in self.words:
+                        groups[word[:length]][self.keys[serial]] = None
+                    for prefix, keys in groups.items():
+                        self._rank_prefix(prefix, keys)
+                return
+            for prefix in self.stale_prefixes:
+                if prefix not in self.short_prefixes:
+                    self._rank_prefix(prefix, self._prefix_keys(*self._prefix_range(prefix)))
+            self.stale_prefixes.clear()
+
+    def search(self, query, limit=DEFAULT_LIMIT, kinds=None):
+        """Return the best matching entities for a type-ahead query.
+
+        Args:
+            query (str): Text typed so far
+            limit (int): Most results returned
+            kinds (iterable, optional): Only return these kinds (default: all)
+
+        Returns:
+            list: Result dicts with kind, id, name, detail and popularity
+        """
+        folded = normalize(query)
+        query_words = folded.split()
+        if not query_words:
+            return []
+
+        with self.lock:
+            if len(query_words) == 1 and len(folded) < SHORT_PREFIX:
+                ranked = self.short_prefixes.get(folded)
+                if ranked is None:
+                    ranked = self._rank_prefix(folded, self._prefix_keys(*self._prefix_range(folded)))
+                matched = [self.entries[key] for key in ranked]
+            else:
+                # Candidates come from the query word matching the fewest words
+                start, end = min((self._prefix_range(word) for word in query_words),
+                                 key=lambda bounds: bounds[1] - bounds[0])
+                matched = [
+                    self.entries[key] for key in self._prefix_keys(start, end)
+                    if len(query_words) == 1 or _matches(self.entries[key].words, query_words)
+                ]
+                matched = heapq.nsmallest(limit if kinds is None else len(matched), matched,
+                                          key=lambda entry: self._rank(entry, folded))
+
+            if kinds is not None:
+                matched = [entry for entry in matched if entry.kind in kinds]
+            results = matched[:limit]
+
+            if len(results) < limit and len(folded) >= SHORT_PREFIX:
+                results.extend(self._similar(folded, limit - len(results), kinds, {(e.kind, e.id) for e in results}))
+            return [entry.as_dict() for entry in results]
+
+    def _similar(self, folded, limit, kinds, seen):
+        """Entries sharing enough trigrams with the query, best first."""
+        grams = trigrams(folded)
+        shared = Counter()
+        used = 0
+        for gram in grams:
+            posting = self.postings.get(gram, ())
+            if len(posting) <= MAX_TRIGRAM_POSTINGS:
+                shared.update(posting)
+                used += 1
+        needed = max(1, used // 3)
+        scored = []
+        for key, count in shared.items():
+            if count < needed or key in seen:
+                continue
+            entry = self.entries[key]
+            if kinds is not None and entry.kind not in kinds:
+                continue
+            value = similarity(grams, entry.grams)
+            if value >= MIN_TRIGRAM_SIMILARITY:
+                scored.append((-value, -entry.popularity, entry.name, key))
+        scored.sort()
+        return [self.entries[key] for _, _, _, key in scored[:limit]]
+
+    # Database
+
+    def refresh(self, db_conn, full=False):
+        """Index the rows added or changed since the last refresh.
+
+        Args:
+            db_conn: Open database connection
+            full (bool): Re-read every table and drop entities that no longer exist
+
+        Returns:
+            int: Entities added, changed or removed
+        """
+        cursor = db_conn.cursor(dictionary=True)
+        cursor.execute("SELECT NOW() AS now")
+        started = cursor.fetchone()["now"]
+        incremental = not full and self.watermark is not None
+
+        changed = 0
+        loaded = []
+        for kind, (query, condition, parameters) in SEARCH_SOURCES.items():
+            try:
+                if incremental and condition is not None:
+                    cursor.execute(f"{query} WHERE {condition}", (self.watermark,) * parameters)
+                else:
+                    cursor.execute(query)
+                rows = cursor.fetchall()
+            except mysql.connector.Error as err:
+                logger.warning(f"Skipping {kind} search entries: {err}")
+                continue
+
+            if not self.entries and not incremental:
+                loaded.extend(SearchEntry(kind, row["id"], row["name"], row["detail"], row["popularity"])
+                              for row in rows if row["name"])
+                continue
+
+            with self.lock:
+                for row in rows:
+                    if row["name"]:
+                        changed += self.put(kind, row["id"], row["name"], row["detail"], row["popularity"])
+                if not incremental or condition is None:
+                    # A full read shows which entities are gone
+                    present = {row["id"] for row in rows}
+                    for key in [key for key in self.entries if key[0] == kind and key[1] not in present]:
+                        self._remove(key)
+                        changed += 1
+
+        if loaded:
+            self._bulk_load(loaded)
+            changed = len(loaded)
+        else:
+            self.warm_short_prefixes()
+        self.watermark = str(started)
+        logger.info(f"Search index refreshed: {changed} entities changed, {len(self.entries)} indexed")
+        return changed
+
+    # Artifact
+
+    def save(self, path=SEARCH_INDEX_PATH):
+        """Write the entities as gzipped JSON, replacing the file atomically."""
+        with self.lock:
+            artifact = {
+                "version": ARTIFACT_VERSION,
+                "watermark": self.watermark,
+                "entries": [
+                    [entry.kind, entry.id, entry.name, entry.detail, entry.popularity]
+                    for entry in self.entries.values()
+                ],
+            }
+        temporary = f"{path}.tmp"
+        with gzip.open(temporary, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump(artifact, f, separators=(",", ":"), ensure_ascii=False)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path=SEARCH_INDEX_PATH):
+        """Load an index saved by save(); a missing or unreadable file gives an empty index."""
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                artifact = json.load(f)
+        except (OSError, ValueError) as err:
+            logger.warning(f"Ignoring unreadable search index {path}: {err}")
+            return index
+        if artifact.get("version") != ARTIFACT_VERSION:
+            logger.warning(f"Ignoring search index {path} of version {artifact.get('version')}")
+            return index
+
+        index._bulk_load(SearchEntry(*values) for values in artifact["entries"])
+        index.watermark = artifact.get("watermark")
+        logger.info(f"Loaded {len(index)} search entries from {path}")
+        return index
+
+
+def main():
+    """Main function to build, refresh or query the search index."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Build and query the type-ahead search index")
+    parser.add_argument("--build", action="store_true", help="Rebuild the index from the database and save it")
+    parser.add_argument("--refresh", action="store_true", help="Index the rows changed since the saved index")
+    parser.add_argument("--query", type=str, help="Search the saved index")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help=f"Results (default: {DEFAULT_LIMIT})")
+    parser.add_argument("--path", type=str, default=SEARCH_INDEX_PATH,
+                        help=f"Index artifact (default: {SEARCH_INDEX_PATH})")
+
+    args = parser.parse_args()
+
+    index = SearchIndex() if args.build else SearchIndex.load(args.path)
+
+    if args.build or args.refresh:
+        from sports_data_fetcher import DB_CONFIG
+        from storage import get_backend
+
+        try:
+            db_conn = get_backend(DB_CONFIG).connect()
+        except mysql.connector.Error as err:
+            logger.error(f"Database connection error: {err}")
+            sys.exit(1)
+        try:
+            index.refresh(db_conn, full=args.build)
+        except mysql.connector.Error as err:
+            logger.error(f"Error refreshing search index: {err}")
+            sys.exit(1)
+        finally:
+            db_conn.close()
+        index.save(args.path)
+
+    if args.query:
+        start_time = time.perf_counter()
+        results = index.search(args.query, args.limit)
+        elapsed = (time.perf_counter() - start_time) * 1000
+        for result in results:
+            print(f"{result['kind']:<15} {result['id']!s:<24} {result['name']} ({result['detail'] or '-'})")
+        logger.info(f"{len(results)} results in {elapsed:.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,19 @@
 Sports Data Fetcher - Database Setup Script
 
 This script creates the database and tables required for the sports data fetcher.
+Tables are created and upgraded by the versioned migrations in migrations.py,
+so running it again on an existing database applies only the new migrations.
 """
 
 import os
 import sys
+import logging
+import argparse
 import mysql.connector
+from datetime import date
 from dotenv import load_dotenv
+from partitions import partition_fixtures, partition_request_log
+from migrations import MigrationRunner, MigrationError
 
 # Load environment variables
 load_dotenv()
@@ -25,12 +32,15 @@ DB_NAME = os.getenv("DB_NAME", "sports_data")
 # SQL to create database and tables
 CREATE_DATABASE = f"CREATE DATABASE IF NOT EXISTS {DB_NAME} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;"
 
-# SQL to create tables (imported from database_schema.sql)
-with open("database_schema.sql", "r") as f:
-    CREATE_TABLES = f.read()
+def setup_database(partition=False, first_season=2010, log_months=3, allow_locking=False):
+    """Create the database and apply the schema migrations.
 
-def setup_database():
-    """Create the database and tables."""
+    Args:
+        partition (bool): Partition fixtures by season and api_request_log by month
+        first_season (int): First season with its own fixtures partition
+        log_months (int): Past months with their own api_request_log partition
+        allow_locking (bool): Allow locking DDL when an index can't be added online
+    """
     print("Sports Data Fetcher - Database Setup")
     print("===================================")
     print(f"Setting up database: {DB_NAME}")
@@ -47,16 +57,18 @@ def setup_database():
         # Switch to the database
         cursor.execute(f"USE {DB_NAME};")
         
-        # Create tables
-        print("Creating tables...")
-        for statement in CREATE_TABLES.split(';'):
-            if statement.strip():
-                cursor.execute(statement + ';')
-        
-        conn.commit()
+        # Create or upgrade tables
+        print("Applying schema migrations...")
+        MigrationRunner(conn, online=not allow_locking).migrate()
+
+        if partition:
+            print("Partitioning fixtures and api_request_log...")
+            partition_fixtures(conn, first_season, date.today().year + 1)
+            partition_request_log(conn, log_months, 3)
+
         print("Database setup completed successfully!")
         
-    except mysql.connector.Error as err:
+    except (mysql.connector.Error, MigrationError) as err:
         print(f"Error: {err}")
         sys.exit(1)
     finally:
@@ -66,4 +78,16 @@ def setup_database():
             conn.close()
 
 if __name__ == "__main__":
-    setup_database()
+    parser = argparse.ArgumentParser(description="Create the sports data database and tables")
+    parser.add_argument("--partition", action="store_true",
+                        help="Partition fixtures by season and api_request_log by month")
+    parser.add_argument("--first-season", type=int, default=2010,
+                        help="First season with its own fixtures partition (default: 2010)")
+    parser.add_argument("--log-months", type=int, default=3,
+                        help="Past months with their own api_request_log partition (default: 3)")
+    parser.add_argument("--allow-locking", action="store_true",
+                        help="Fall back to locking DDL when an index can't be added online")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    setup_database(args.partition, args.first_season, args.log_months, args.allow_locking)
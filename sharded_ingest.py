@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Sharded Ingestion Script
+
+This script splits a full update into league-season work units stored in the
+ingest_work_units table. Any number of worker processes, on one machine or
+several, claim units under a time-limited lease, keep the lease alive with
+heartbeats and run the regular fetch stages against their own connection.
+Units whose lease expires (e.g. because the worker crashed) are reclaimed by
+the next worker that asks for work.
+"""
+
+import os
+import sys
+import time
+import uuid
+import socket
+import logging
+import argparse
+import threading
+import multiprocessing
+import mysql.connector
+from datetime import datetime
+from sports_data_fetcher import (
+    SportsDataFetcher, DB_CONFIG, APIRequestError, DatabaseError
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(processName)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("sharded_ingest.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("sharded_ingest")
+
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class LeaseLostError(Exception):
+    """Exception raised when a worker no longer holds the lease on its unit."""
+    pass
+
+
+class WorkLeaseQueue:
+    """League-season work queue backed by the ingest_work_units table."""
+
+    def __init__(self, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Initialize the queue with its own database connection.
+
+        Args:
+            lease_seconds (int): How long a claim stays valid without a heartbeat
+            max_attempts (int): Claims allowed per unit before it is marked failed
+        """
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.db_conn = None
+        self.db_cursor = None
+
+    def connect_to_database(self):
+        """Establish connection to the database."""
+        try:
+            self.db_conn = mysql.connector.connect(**DB_CONFIG)
+            self.db_cursor = self.db_conn.cursor(dictionary=True)
+        except mysql.connector.Error as err:
+            logger.error(f"Database connection error: {err}")
+            raise DatabaseError(f"Failed to connect to database: {err}")
+
+    def close_database_connection(self):
+        """Close the database connection."""
+        if self.db_cursor:
+            self.db_cursor.close()
+        if self.db_conn:
+            self.db_conn.close()
+
+    def enqueue(self, season, league_ids=None):
+        """Create (or reset) one work unit per league for a season.
+
+        Units that are currently leased by a live worker are left alone so a
+        second enqueue during a running refresh doesn't duplicate work.
+        """
+        query = """
+        INSERT INTO ingest_work_units (league_id, season)
+        SELECT league_id, %s FROM leagues
+        """
+        params = [season]
+        if league_ids:
+            query += f" WHERE league_id IN ({', '.join(['%s'] * len(league_ids))})"
+            params.extend(league_ids)
+        # Column assignments are evaluated left to right, so status must be
+        # updated last for the other columns to see the old value
+        query += """
+        ON DUPLICATE KEY UPDATE
+            attempts = IF(status = 'running' AND lease_expires_at > NOW(), attempts, 0),
+            last_error = IF(status = 'running' AND lease_expires_at > NOW(), last_error, NULL),
+            status = IF(status = 'running' AND lease_expires_at > NOW(), status, 'pending')
+        """
+        self.db_cursor.execute(query, tuple(params))
+        self.db_conn.commit()
+        logger.info(f"Enqueued work units for season {season}")
+
+    def claim(self, worker_id):
+        """Atomically claim the next pending or expired unit.
+
+        Returns:
+            dict: The claimed unit including its lease_token, or None if no
+                work is available
+        """
+        # Units whose worker died on the final attempt will never be claimed
+        # again, so close them out instead of leaving them 'running'
+        self.db_cursor.execute(
+            """
+            UPDATE ingest_work_units
+            SET status = 'failed', last_error = 'Lease expired on final attempt'
+            WHERE status = 'running' AND lease_expires_at < NOW() AND attempts >= %s
+            """,
+            (self.max_attempts,)
+        )
+
+        token = str(uuid.uuid4())
+        self.db_cursor.execute(
+            """
+            UPDATE ingest_work_units
+            SET status = 'running', worker_id = %s, lease_token = %s,
+                lease_expires_at = NOW() + INTERVAL %s SECOND,
+                heartbeat_at = NOW(), attempts = attempts + 1
+            WHERE (status = 'pending'
+                   OR (status = 'running' AND lease_expires_at < NOW()))
+              AND attempts < %s
+            ORDER BY unit_id
+            LIMIT 1
+            """,
+            (worker_id, token, self.lease_seconds, self.max_attempts)
+        )
+        self.db_conn.commit()
+
+        if self.db_cursor.rowcount == 0:
+            return None
+
+        self.db_cursor.execute(
+            "SELECT unit_id, league_id, season, attempts, lease_token FROM ingest_work_units WHERE lease_token = %s",
+            (token,)
+        )
+        return self.db_cursor.fetchone()
+
+    def heartbeat(self, unit):
+        """Extend the lease on a unit.
+
+        Returns:
+            bool: False if the lease was lost (expired and reclaimed)
+        """
+        self.db_cursor.execute(
+            """
+            UPDATE ingest_work_units
+            SET lease_expires_at = NOW() + INTERVAL %s SECOND, heartbeat_at = NOW()
+            WHERE unit_id = %s AND lease_token = %s AND status = 'running'
+            """,
+            (self.lease_seconds, unit["unit_id"], unit["lease_token"])
+        )
+        self.db_conn.commit()
+        return self.db_cursor.rowcount == 1
+
+    def complete(self, unit):
+        """Mark a unit as done if this worker still holds its lease."""
+        self.db_cursor.execute(
+            """
+            UPDATE ingest_work_units
+            SET status = 'done', lease_expires_at = NULL, last_error = NULL
+            WHERE unit_id = %s AND lease_token = %s
+            """,
+            (unit["unit_id"], unit["lease_token"])
+        )
+        self.db_conn.commit()
+        return self.db_cursor.rowcount == 1
+
+    def fail(self, unit, error):
+        """Release a unit after an error; it is retried until max_attempts."""
+        self.db_cursor.execute(
+            """
+            UPDATE ingest_work_units
+            SET status = IF(attempts < %s, 'pending', 'failed'),
+                lease_expires_at = NULL, last_error = %s
+            WHERE unit_id = %s AND lease_token = %s
+            """,
+            (self.max_attempts, str(error)[:65535], unit["unit_id"], unit["lease_token"])
+        )
+        self.db_conn.commit()
+
+    def status_counts(self, season=None):
+        """Return unit counts per status, treating expired leases as 'expired'."""
+        query = """
+        SELECT IF(status = 'running' AND lease_expires_at < NOW(), 'expired', status) AS state,
+               COUNT(*) AS units
+        FROM ingest_work_units
+        """
+        params = ()
+        if season:
+            query += " WHERE season = %s"
+            params = (season,)
+        query += " GROUP BY state"
+        self.db_cursor.execute(query, params)
+        return {row["state"]: row["units"] for row in self.db_cursor.fetchall()}
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Background thread that renews a unit's lease while stages run.
+
+    It uses a separate queue connection because mysql.connector connections
+    must not be shared between threads.
+    """
+
+    def __init__(self, unit, lease_seconds):
+        super().__init__(daemon=True)
+        self.unit = unit
+        self.interval = max(1, lease_seconds // 3)
+        self.queue = WorkLeaseQueue(lease_seconds=lease_seconds)
+        self.stop_event = threading.Event()
+        self.lost = False
+
+    def run(self):
+        self.queue.connect_to_database()
+        try:
+            while not self.stop_event.wait(self.interval):
+                try:
+                    if not self.queue.heartbeat(self.unit):
+                        self.lost = True
+                        logger.warning(f"Lost lease on unit {self.unit['unit_id']}")
+                        return
+                except mysql.connector.Error as err:
+                    logger.warning(f"Heartbeat failed for unit {self.unit['unit_id']}: {err}")
+        finally:
+            self.queue.close_database_connection()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+
+class ShardedIngestWorker:
+    """Claims work units and runs the per-league fetch stages for each."""
+
+    def __init__(self, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, poll_interval=None):
+        """Initialize the worker.
+
+        Args:
+            worker_id (str, optional): Identifier stored on claimed units
+            lease_seconds (int): Lease length renewed by heartbeats
+            max_attempts (int): Claims allowed per unit before it is marked failed
+            poll_interval (int, optional): If set, keep polling for new units
+                every poll_interval seconds instead of exiting when idle
+        """
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.queue = WorkLeaseQueue(lease_seconds, max_attempts)
+        self.fetcher = SportsDataFetcher()
+
+    def process_unit(self, unit, heartbeat=None):
+        """Run the fetch stages for one league-season.
+
+        Standings are recomputed locally by fetch_fixtures when results change.
+
+        Raises:
+            LeaseLostError: If the heartbeat lost the lease before a stage
+        """
+        league_id = unit["league_id"]
+        season = unit["season"]
+        for stage in (self.fetcher.fetch_teams, self.fetcher.fetch_fixtures):
+            # Another worker may have reclaimed the unit; don't keep spending quota on it
+            if heartbeat is not None and heartbeat.lost:
+                raise LeaseLostError(f"Lease on unit {unit['unit_id']} was lost")
+            stage(league_id, season)
+
+    def run(self):
+        """Process units until the queue is drained."""
+        processed = 0
+        self.queue.connect_to_database()
+        self.fetcher.connect_to_database()
+        try:
+            while True:
+                # Don't burn unit attempts while API-Sports is known to be down
+                breaker = self.fetcher.http.breaker
+                if not breaker.available():
+                    logger.warning(f"Worker {self.worker_id} waiting for the {breaker.name} circuit to close")
+                    time.sleep(breaker.reset_timeout)
+                    continue
+
+                unit = self.queue.claim(self.worker_id)
+                if not unit:
+                    if self.poll_interval:
+                        time.sleep(self.poll_interval)
+                        continue
+                    break
+
+                logger.info(
+                    f"Worker {self.worker_id} claimed unit {unit['unit_id']} "
+                    f"(league {unit['league_id']}, season {unit['season']}, attempt {unit['attempts']})"
+                )
+                heartbeat = LeaseHeartbeat(unit, self.lease_seconds)
+                heartbeat.start()
+                try:
+                    self.process_unit(unit, heartbeat)
+                    if heartbeat.lost:
+                        raise LeaseLostError(f"Lease on unit {unit['unit_id']} was lost")
+                except LeaseLostError as err:
+                    # The unit now belongs to whoever reclaimed it, so it is
+                    # neither completed nor failed here
+                    heartbeat.stop()
+                    logger.warning(f"{err}, abandoning it")
+                    continue
+                except (APIRequestError, DatabaseError, mysql.connector.Error) as err:
+                    heartbeat.stop()
+                    self.fetcher.db_conn.rollback()
+                    logger.error(f"Unit {unit['unit_id']} failed: {err}")
+                    self.queue.fail(unit, err)
+                    continue
+
+                heartbeat.stop()
+                if self.queue.complete(unit):
+                    processed += 1
+                else:
+                    # The stages are idempotent upserts, so a unit that was
+                    # reclaimed meanwhile is simply processed twice
+                    logger.warning(f"Unit {unit['unit_id']} was reclaimed before completion")
+
+                # Add a small delay to avoid hitting rate limits
+                time.sleep(1)
+        finally:
+            self.fetcher.close_database_connection()
+            self.queue.close_database_connection()
+
+        logger.info(f"Worker {self.worker_id} finished after processing {processed} units")
+        return processed
+
+
+def prepare_season(season, league_ids=None):
+    """Run the global stages once and enqueue the per-league work units."""
+    fetcher = SportsDataFetcher()
+    fetcher.connect_to_database()
+    try:
+        fetcher.fetch_countries()
+        fetcher.fetch_leagues(season=season)
+    finally:
+        fetcher.close_database_connection()
+
+    queue = WorkLeaseQueue()
+    queue.connect_to_database()
+    try:
+        queue.enqueue(season, league_ids)
+    finally:
+        queue.close_database_connection()
+
+
+def worker_main(lease_seconds, max_attempts, poll_interval):
+    """Entry point for locally spawned worker processes."""
+    worker = ShardedIngestWorker(
+        lease_seconds=lease_seconds,
+        max_attempts=max_attempts,
+        poll_interval=poll_interval,
+    )
+    worker.run()
+
+
+def main():
+    """Main function to run sharded ingestion."""
+    parser = argparse.ArgumentParser(description="Sharded league-season ingestion with DB-backed leases")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="Fetch countries and leagues, then enqueue one unit per league")
+    parser.add_argument("--season", type=int, help="Season to enqueue (default: current year)")
+    parser.add_argument("--league", type=int, nargs="+", help="Only enqueue these league IDs")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Number of local worker processes to run (default: 0)")
+    parser.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS,
+                        help=f"Lease length in seconds (default: {DEFAULT_LEASE_SECONDS})")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"Attempts per unit before it is marked failed (default: {DEFAULT_MAX_ATTEMPTS})")
+    parser.add_argument("--poll-interval", type=int,
+                        help="Keep workers polling for new units every N seconds instead of exiting when idle")
+    parser.add_argument("--status", action="store_true", help="Print work unit counts per status")
+
+    args = parser.parse_args()
+    season = args.season or datetime.now().year
+
+    try:
+        if args.enqueue:
+            prepare_season(season, args.league)
+
+        if args.workers:
+            processes = [
+                multiprocessing.Process(
+                    target=worker_main,
+                    args=(args.lease_seconds, args.max_attempts, args.poll_interval),
+                    name=f"ingest-worker-{i + 1}",
+                )
+                for i in range(args.workers)
+            ]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+            failed = [p.name for p in processes if p.exitcode != 0]
+            if failed:
+                logger.error(f"Workers exited with errors: {', '.join(failed)}")
+
+        if args.status or not (args.enqueue or args.workers):
+            queue = WorkLeaseQueue()
+            queue.connect_to_database()
+            try:
+                counts = queue.status_counts(args.season)
+            finally:
+                queue.close_database_connection()
+            for state, units in sorted(counts.items()):
+                print(f"{state}: {units}")
+    except Exception as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,12 @@ import json
 import logging
 from datetime import datetime
 import time
+import threading
+from requests.adapters import HTTPAdapter
+from http_resilience import ResilientSession
+from response_archive import archive_session
+from json_extract import decode_response
+from profile_cache import get_profile_cache, daily_competitor_ids, PREWARM_WORKERS, PREWARM_RATE
 
 # Configure logging
 logging.basicConfig(
@@ -13,21 +19,75 @@ logging.basicConfig(
 )
 logger = logging.getLogger('sportradar_data_fetcher')
 
+# (connect, read) timeouts by endpoint prefix; live polls give up quickly,
+# season summaries and timelines are large
+SPORTRADAR_TIMEOUTS = {
+    "live_summaries": (3.05, 5),
+    "seasons": (3.05, 30),
+    "match_timeline": (3.05, 30),
+}
+
+# Keep-alive connections kept per host; size this to the number of threads
+# making SportRadar calls concurrently so none has to open a new connection
+POOL_SIZE = int(os.getenv("SPORTRADAR_POOL_SIZE", "10"))
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """Return the process-wide HTTP session shared by all SportRadar clients
+    
+    Tennis and cricket clients reuse the same pooled keep-alive connections
+    to api.sportradar.com, so only the first call per connection pays for the
+    TCP and TLS handshake. Responses are requested gzip-compressed.
+    
+    Returns:
+        requests.Session: Shared session
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, pool_block=False)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            })
+            _shared_session = session
+        return _shared_session
+
+
+def close_shared_session():
+    """Close the pooled connections of the shared session"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
+
 class SportRadarAPI:
     """Base class for SportRadar API integration"""
     
-    def __init__(self, api_key=None, config_file='.env.sportradar'):
+    def __init__(self, api_key=None, config_file='.env.sportradar', session=None):
         """Initialize the SportRadar API client
         
         Args:
             api_key (str, optional): API key for SportRadar. If not provided, will try to load from config file
             config_file (str, optional): Path to configuration file containing API keys
+            session (requests.Session, optional): HTTP session to use. Defaults to the pooled session
+                shared by all SportRadar clients
         """
         self.api_key = api_key
+        self.session = session
         self.base_url = "https://api.sportradar.com"
         self.headers = {"Content-Type": "application/json"}
         self.rate_limit_remaining = 1000  # Default value, will be updated with API responses
         self.rate_limit_reset = 0
+        self._http = None
         
         if not api_key:
             self._load_config(config_file)
@@ -79,6 +139,16 @@ class SportRadarAPI:
         if 'X-Rate-Limit-Reset' in response.headers:
             self.rate_limit_reset = int(response.headers['X-Rate-Limit-Reset'])
     
+    @property
+    def http(self):
+        """Retrying HTTP client with a circuit breaker per API (keyed by base URL),
+        recording to or replaying from the response archive when RESPONSE_ARCHIVE is set"""
+        if self._http is None:
+            self._http = archive_session("sportradar", ResilientSession(
+                f"sportradar:{self.base_url}", self.session or get_shared_session(), timeouts=SPORTRADAR_TIMEOUTS
+            ))
+        return self._http
+    
     def _make_request(self, endpoint, params=None):
         """Make a request to the SportRadar API
         
@@ -88,16 +158,20 @@ class SportRadarAPI:
             
         Returns:
             dict: JSON response from the API
+            
+        Raises:
+            http_resilience.CircuitOpenError: If the API is failing and requests are skipped
+            requests.exceptions.RequestException: If the request failed after retrying
         """
         url = f"{self.base_url}/{endpoint}"
         self._handle_rate_limit()
         
         try:
-            response = requests.get(url, headers=self.headers, params=params)
+            response = self.http.get(url, endpoint=endpoint, headers=self.headers, params=params)
             self._update_rate_limit_info(response)
             
             if response.status_code == 200:
-                return response.json()
+                return decode_response(response)
             else:
                 logger.error(f"API request failed: {response.status_code} - {response.text}")
                 response.raise_for_status()
@@ -122,10 +196,16 @@ class SportRadarAPI:
 class TennisAPI(SportRadarAPI):
     """SportRadar Tennis API client"""
     
-    def __init__(self, api_key=None, config_file='.env.sportradar'):
-        """Initialize the Tennis API client"""
-        super().__init__(api_key, config_file)
+    def __init__(self, api_key=None, config_file='.env.sportradar', session=None, profile_cache=None):
+        """Initialize the Tennis API client
+        
+        Args:
+            profile_cache (profile_cache.ProfileCache, optional): Cache for competitor
+                profiles. Defaults to the cache shared by all Tennis clients
+        """
+        super().__init__(api_key, config_file, session)
         self.base_url = "https://api.sportradar.com/tennis/v3"
+        self.profile_cache = profile_cache if profile_cache is not None else get_profile_cache()
     
     def test_connection(self):
         """Test the Tennis API connection"""
@@ -163,15 +243,40 @@ class TennisAPI(SportRadarAPI):
     def get_competitor_profile(self, competitor_id):
         """Get profile information for a specific competitor
         
+        Profiles are served from the profile cache while fresh.
+        
         Args:
             competitor_id (str): Competitor ID
             
         Returns:
             dict: Competitor profile data
         """
+        return self.profile_cache.get_or_fetch(
+            competitor_id, lambda: self._fetch_competitor_profile(competitor_id)
+        )
+    
+    def _fetch_competitor_profile(self, competitor_id):
         endpoint = f"competitors/{competitor_id}/profile"
         return self._make_request(endpoint)
     
+    def prewarm_competitor_profiles(self, date=None, workers=PREWARM_WORKERS, rate=PREWARM_RATE):
+        """Cache the profiles of every competitor playing on a day
+        
+        Args:
+            date (str, optional): Date in YYYY-MM-DD format. Defaults to today.
+            workers (int): Concurrent profile requests
+            rate (float): Profile requests per second across all workers
+            
+        Returns:
+            tuple: (fetched, failed) profile counts
+        """
+        competitor_ids = daily_competitor_ids(self.get_daily_summaries(date))
+        fetched, failed = self.profile_cache.prewarm(
+            competitor_ids, self._fetch_competitor_profile, workers, rate
+        )
+        logger.info(f"Pre-warmed {fetched} of {len(set(competitor_ids))} competitor profiles ({failed} failed)")
+        return fetched, failed
+    
     def get_sport_event_summary(self, event_id):
         """Get summary information for a specific sport event
         
@@ -200,9 +305,9 @@ class TennisAPI(SportRadarAPI):
 class CricketAPI(SportRadarAPI):
     """SportRadar Cricket API client"""
     
-    def __init__(self, api_key=None, config_file='.env.sportradar'):
+    def __init__(self, api_key=None, config_file='.env.sportradar', session=None):
         """Initialize the Cricket API client"""
-        super().__init__(api_key, config_file)
+        super().__init__(api_key, config_file, session)
         self.base_url = "https://api.sportradar.com/cricket/v2"
     
     def test_connection(self):
@@ -314,3 +419,5 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Error: {str(e)}")
         logger.error(f"Error in main execution: {str(e)}")
+    finally:
+        close_shared_session()
@@ -50,7 +50,8 @@ CREATE TABLE tennis_rankings (
     ranking_date DATE NOT NULL,
     points INT,
     movement INT,
-    FOREIGN KEY (player_id) REFERENCES tennis_players(player_id)
+    FOREIGN KEY (player_id) REFERENCES tennis_players(player_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Tennis Matches
@@ -75,7 +76,8 @@ CREATE TABLE tennis_matches (
     FOREIGN KEY (competition_id) REFERENCES tennis_competitions(competition_id),
     FOREIGN KEY (player1_id) REFERENCES tennis_players(player_id),
     FOREIGN KEY (player2_id) REFERENCES tennis_players(player_id),
-    FOREIGN KEY (winner_id) REFERENCES tennis_players(player_id)
+    FOREIGN KEY (winner_id) REFERENCES tennis_players(player_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Tennis Match Sets
@@ -90,7 +92,8 @@ CREATE TABLE tennis_match_sets (
     winner_id VARCHAR(50),
     duration INT, -- in seconds
     FOREIGN KEY (match_id) REFERENCES tennis_matches(match_id),
-    FOREIGN KEY (winner_id) REFERENCES tennis_players(player_id)
+    FOREIGN KEY (winner_id) REFERENCES tennis_players(player_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Tennis Match Statistics
@@ -123,7 +126,8 @@ CREATE TABLE tennis_match_statistics (
     return_points_won INT,
     total_points_won INT,
     FOREIGN KEY (match_id) REFERENCES tennis_matches(match_id),
-    FOREIGN KEY (player_id) REFERENCES tennis_players(player_id)
+    FOREIGN KEY (player_id) REFERENCES tennis_players(player_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Add tables for Cricket data
@@ -215,7 +219,8 @@ CREATE TABLE cricket_matches (
     FOREIGN KEY (away_team_id) REFERENCES cricket_teams(team_id),
     FOREIGN KEY (toss_winner_id) REFERENCES cricket_teams(team_id),
     FOREIGN KEY (match_winner_id) REFERENCES cricket_teams(team_id),
-    FOREIGN KEY (man_of_match_id) REFERENCES cricket_players(player_id)
+    FOREIGN KEY (man_of_match_id) REFERENCES cricket_players(player_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Cricket Match Innings
@@ -232,7 +237,8 @@ CREATE TABLE cricket_innings (
     declared BOOLEAN DEFAULT FALSE,
     FOREIGN KEY (match_id) REFERENCES cricket_matches(match_id),
     FOREIGN KEY (batting_team_id) REFERENCES cricket_teams(team_id),
-    FOREIGN KEY (bowling_team_id) REFERENCES cricket_teams(team_id)
+    FOREIGN KEY (bowling_team_id) REFERENCES cricket_teams(team_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Cricket Batting Statistics
@@ -253,7 +259,8 @@ CREATE TABLE cricket_batting_stats (
     FOREIGN KEY (innings_id) REFERENCES cricket_innings(innings_id),
     FOREIGN KEY (player_id) REFERENCES cricket_players(player_id),
     FOREIGN KEY (bowled_by) REFERENCES cricket_players(player_id),
-    FOREIGN KEY (caught_by) REFERENCES cricket_players(player_id)
+    FOREIGN KEY (caught_by) REFERENCES cricket_players(player_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Cricket Bowling Statistics
@@ -272,7 +279,8 @@ CREATE TABLE cricket_bowling_stats (
     wides INT,
     no_balls INT,
     FOREIGN KEY (innings_id) REFERENCES cricket_innings(innings_id),
-    FOREIGN KEY (player_id) REFERENCES cricket_players(player_id)
+    FOREIGN KEY (player_id) REFERENCES cricket_players(player_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
 -- Cricket Tournament Standings
@@ -290,5 +298,6 @@ CREATE TABLE cricket_standings (
     net_run_rate DECIMAL(5,3),
     group_name VARCHAR(50),
     FOREIGN KEY (season_id) REFERENCES cricket_seasons(season_id),
-    FOREIGN KEY (team_id) REFERENCES cricket_teams(team_id)
+    FOREIGN KEY (team_id) REFERENCES cricket_teams(team_id),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
\ No newline at end of file
@@ -15,6 +15,15 @@ import requests
 import mysql.connector
 from datetime import datetime
 from dotenv import load_dotenv
+from storage import get_backend
+from http_resilience import ResilientSession, CircuitOpenError
+from response_archive import archive_session, configure_archive, RESPONSE_ARCHIVE_DIR
+from json_extract import (
+    decode_response, extract_fixture, extract_event, extract_player_stats, EVENT_TEAM,
+    EVENT_PLAYER, EVENT_ASSIST, EVENT_PLAYER_NAME, EVENT_ASSIST_NAME, EVENT_FIELDS, FIXTURE_ID, FIXTURE_DATE, FIXTURE_STATUS, FIXTURE_ROUND,
+    FIXTURE_LEAGUE, FIXTURE_SEASON, FIXTURE_VENUE, FIXTURE_REFEREE, FIXTURE_HOME_TEAM,
+    FIXTURE_AWAY_TEAM, FIXTURE_HOME_GOALS, FIXTURE_AWAY_GOALS, FIXTURE_SCORES
+)
 
 # Configure logging
 logging.basicConfig(
@@ -36,6 +45,12 @@ API_BASE_URL = "https://v3.football.api-sports.io"
 API_HEADERS = {
     "x-apisports-key": API_KEY,
 }
+# (connect, read) timeouts; list endpoints of large leagues are slow
+API_TIMEOUTS = {
+    "fixtures": (3.05, 30),
+    "players": (3.05, 30),
+}
+API_RATE_LIMIT_WAIT = 60  # The per-minute quota resets within a minute
 
 # Database Configuration
 DB_CONFIG = {
@@ -45,6 +60,55 @@ DB_CONFIG = {
     "database": os.getenv("DB_NAME", "sports_data"),
 }
 
+# Fixture statuses with a final result (Full-Time, After Extra Time, Penalties)
+FINISHED_STATUSES = ("FT", "AET", "PEN")
+# Fixture statuses that void bets on the fixture (Cancelled, Abandoned)
+VOID_STATUSES = ("CANC", "ABD")
+
+# Rows per multi-row upsert statement
+UPSERT_BATCH_SIZE = 500
+
+PLAYER_COLUMNS = (
+    "api_player_id", "name", "firstname", "lastname", "date_of_birth",
+    "nationality", "height", "weight", "photo_url",
+)
+# Squad entries only carry a name and photo, so missing details never overwrite stored ones
+PLAYER_UPDATE = """
+    name = COALESCE(VALUES(name), name),
+    firstname = COALESCE(VALUES(firstname), firstname),
+    lastname = COALESCE(VALUES(lastname), lastname),
+    date_of_birth = COALESCE(VALUES(date_of_birth), date_of_birth),
+    nationality = COALESCE(VALUES(nationality), nationality),
+    height = COALESCE(VALUES(height), height),
+    weight = COALESCE(VALUES(weight), weight),
+    photo_url = COALESCE(VALUES(photo_url), photo_url),
+    updated_at = NOW()
+"""
+# Fixtures per fixtures?ids= request (the API maximum)
+FIXTURE_DETAIL_BATCH_SIZE = 20
+
+EVENT_COLUMNS = (
+    "fixture_id", "team_id", "player_id", "assist_player_id", "event_type",
+    "event_detail", "event_time", "event_time_extra", "comments",
+)
+STATISTIC_COLUMNS = ("fixture_id", "team_id", "stat_type", "stat_value")
+PLAYER_STATISTIC_COLUMNS = (
+    "fixture_id", "player_id", "team_id", "minutes_played", "rating", "shots_total",
+    "shots_on_goal", "goals", "assists", "passes_total", "passes_accuracy", "key_passes",
+    "yellow_cards", "red_cards",
+)
+PLAYER_STATISTIC_UPDATE = ", ".join(
+    f"{column} = VALUES({column})" for column in PLAYER_STATISTIC_COLUMNS[2:]
+) + ", updated_at = NOW()"
+
+TEAM_PLAYER_COLUMNS = ("team_id", "player_id", "jersey_number", "position", "is_captain", "season")
+TEAM_PLAYER_UPDATE = """
+    jersey_number = COALESCE(VALUES(jersey_number), jersey_number),
+    position = COALESCE(VALUES(position), position),
+    is_captain = COALESCE(VALUES(is_captain), is_captain),
+    updated_at = NOW()
+"""
+
 class APIRequestError(Exception):
     """Exception raised for API request errors."""
     pass
@@ -53,32 +117,94 @@ class DatabaseError(Exception):
     """Exception raised for database errors."""
     pass
 
+def _to_int(value):
+    """Parse an API count that may come as a string such as "85" or "85%"."""
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return int(str(value).rstrip("%"))
+    except ValueError:
+        return None
+
+class PlayerBatch:
+    """Players and squad memberships buffered for the next bulk write.
+
+    Players are deduplicated across pages and teams: a player already
+    written or buffered in this run is not written again.
+    """
+    
+    def __init__(self):
+        self.players = {}      # api_player_id -> players row, not written yet
+        self.members = {}      # (team_id, api_player_id) -> (number, position, captain)
+        self.player_ids = {}   # api_player_id -> player_id, known after a write
+    
+    def __len__(self):
+        return max(len(self.players), len(self.members))
+    
+    def add_player(self, api_player_id, row):
+        if api_player_id not in self.player_ids:
+            self.players.setdefault(api_player_id, row)
+    
+    def add_member(self, team_id, api_player_id, number, position, captain):
+        self.members[(team_id, api_player_id)] = (number, position, captain)
+    
+    def clear(self):
+        """Drop the written rows, keeping the known player IDs."""
+        self.players.clear()
+        self.members.clear()
+
 class SportsDataFetcher:
     """Class to fetch sports data from API-Sports and populate the database."""
     
-    def __init__(self):
-        """Initialize the fetcher with API and database connections."""
+    def __init__(self, backend=None, keep_connection=False):
+        """Initialize the fetcher with API and database connections.
+
+        Args:
+            backend (optional): Storage backend from storage.py (default: DB_BACKEND)
+            keep_connection (bool): Keep the database connection open between
+                runs (for long-running processes); close_database_connection()
+                then only closes it when called with force=True
+        """
+        self.backend = backend or get_backend(DB_CONFIG)
+        self.keep_connection = keep_connection
         self.session = requests.Session()
         self.session.headers.update(API_HEADERS)
+        http = ResilientSession("api-sports", self.session, timeouts=API_TIMEOUTS,
+                                rate_limit_wait=API_RATE_LIMIT_WAIT)
+        # Records to or replays from the response archive when RESPONSE_ARCHIVE is set
+        self.http = archive_session("api-sports", http)
         self.db_conn = None
         self.db_cursor = None
+        # Fixtures that reached (or changed) a final or void result since the
+        # last call to process_finalized_fixtures(): fixture_id -> status
+        self.finalized_fixture_ids = {}
+        # Live fixture_id -> {event key: [event_id]} as stored, and the
+        # players seen in live events
+        self.live_event_marks = {}
+        self.live_players = PlayerBatch()
         
     def connect_to_database(self):
         """Establish connection to the database."""
+        if self.keep_connection and self.db_conn is not None and self.db_conn.is_connected():
+            return
         try:
-            self.db_conn = mysql.connector.connect(**DB_CONFIG)
+            self.db_conn = self.backend.connect()
             self.db_cursor = self.db_conn.cursor(dictionary=True)
-            logger.info("Successfully connected to the database")
+            logger.info(f"Successfully connected to the {self.backend.name} database")
         except mysql.connector.Error as err:
             logger.error(f"Database connection error: {err}")
             raise DatabaseError(f"Failed to connect to database: {err}")
     
-    def close_database_connection(self):
+    def close_database_connection(self, force=False):
         """Close the database connection."""
+        if self.keep_connection and not force:
+            return
         if self.db_cursor:
             self.db_cursor.close()
         if self.db_conn:
             self.db_conn.close()
+        self.db_cursor = None
+        self.db_conn = None
         logger.info("Database connection closed")
     
     def log_api_request(self, endpoint, parameters, status, response_time):
@@ -100,30 +226,48 @@ class SportsDataFetcher:
             logger.warning(f"Failed to log API request: {err}")
     
     def make_api_request(self, endpoint, params=None):
-        """Make a request to the API-Sports API with error handling and rate limiting."""
+        """Make a request to the API-Sports API with error handling and rate limiting.
+
+        Transient failures and rate limits are retried a bounded number of
+        times; while API-Sports is failing, requests fail fast with
+        APIRequestError instead of waiting on the connection.
+        """
+        return self._request_api_data(endpoint, params)["response"]
+    
+    def iter_api_pages(self, endpoint, params=None):
+        """Yield the response items of a paginated endpoint one page at a time.
+
+        Pages are requested as they are consumed, so callers can write each
+        page before the next one is fetched.
+        """
+        params = dict(params or {})
+        page = 1
+        while True:
+            params["page"] = page
+            data = self._request_api_data(endpoint, params)
+            yield data["response"]
+            
+            total = (data.get("paging") or {}).get("total") or 1
+            if page >= total:
+                break
+            page += 1
+    
+    def _request_api_data(self, endpoint, params=None):
+        """Request an endpoint and return the whole decoded body."""
         url = f"{API_BASE_URL}/{endpoint}"
-        start_time = time.time()
-        status_code = None
-        
+
+        # Log every attempt, retries included, since each counts against the quota
+        def log_attempt(response, *args, **kwargs):
+            self.log_api_request(endpoint, params, response.status_code, response.elapsed.total_seconds())
+
         try:
-            response = self.session.get(url, params=params)
-            status_code = response.status_code
-            response_time = time.time() - start_time
-            
-            # Log the API request
-            self.log_api_request(endpoint, params, status_code, response_time)
-            
-            # Check for rate limiting
-            if status_code == 429:
-                logger.warning("Rate limit exceeded. Waiting before retrying...")
-                time.sleep(60)  # Wait for 60 seconds before retrying
-                return self.make_api_request(endpoint, params)
+            response = self.http.get(url, endpoint=endpoint, params=params, hooks={"response": log_attempt})
             
             # Check for successful response
             response.raise_for_status()
             
             # Parse JSON response
-            data = response.json()
+            data = decode_response(response)
             
             # Check API response structure
             if "errors" in data and data["errors"]:
@@ -137,12 +281,58 @@ class SportsDataFetcher:
                 raise APIRequestError("API response missing 'response' field")
             
             logger.info(f"Successfully fetched data from {endpoint}")
-            return data["response"]
+            return data
             
+        except CircuitOpenError as err:
+            logger.warning(f"Skipping request to {endpoint}: {err}")
+            raise APIRequestError(f"API-Sports unavailable: {err}")
         except requests.exceptions.RequestException as err:
             logger.error(f"API request error: {err}")
             raise APIRequestError(f"Failed to make API request: {err}")
     
+    def _parse_fixture_date(self, api_fixture_id, value):
+        """Parse an API fixture date, None if it is missing or invalid."""
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except (ValueError, TypeError):
+            logger.warning(f"Invalid date format for fixture {api_fixture_id}: {value}")
+            return None
+    
+    def _track_final_result(self, fixture_id, previous, status, home_score, away_score):
+        """Remember a fixture if its final or void result is new or has changed."""
+        if status not in FINISHED_STATUSES + VOID_STATUSES:
+            return
+        
+        if previous and (previous["status"], previous["home_score"], previous["away_score"]) == (status, home_score, away_score):
+            return
+        
+        self.finalized_fixture_ids[fixture_id] = status
+    
+    def process_finalized_fixtures(self):
+        """Update data derived from final results for the tracked fixtures."""
+        if not self.finalized_fixture_ids:
+            return
+        
+        # Imported here because these modules import this one
+        from standings_engine import StandingsEngine
+        from team_form import FormHeadToHeadMaterializer
+        from bet_settlement import BetSettlementEngine
+        
+        fixture_ids = sorted(self.finalized_fixture_ids)
+        finished_ids = [
+            fixture_id for fixture_id in fixture_ids
+            if self.finalized_fixture_ids[fixture_id] in FINISHED_STATUSES
+        ]
+        self.finalized_fixture_ids.clear()
+        
+        # Void fixtures only refund their bets
+        if finished_ids:
+            StandingsEngine(self.db_conn).recompute_for_fixtures(finished_ids)
+            FormHeadToHeadMaterializer(self.db_conn).apply_fixtures(finished_ids)
+        BetSettlementEngine(self.db_conn).settle_fixtures(fixture_ids)
+    
     def fetch_countries(self):
         """Fetch countries data from API and insert into database."""
         logger.info("Fetching countries data...")
@@ -413,6 +603,180 @@ class SportsDataFetcher:
             self.db_conn.rollback()
             raise
     
+    def _bulk_upsert(self, table, columns, rows, update=None):
+        """Write rows with multi-row INSERT ... ON DUPLICATE KEY UPDATE statements.
+
+        Without update, the rows are plainly inserted.
+        """
+        row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            query = f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES {", ".join([row_placeholder] * len(batch))}
+            """
+            if update:
+                query += f"ON DUPLICATE KEY UPDATE {update}"
+            self.db_cursor.execute(query, [value for row in batch for value in row])
+    
+    def _league_team_ids(self, league_id, season):
+        """Return {api_team_id: team_id} for the teams of a league season."""
+        self.db_cursor.execute(
+            """
+            SELECT t.api_team_id, t.team_id
+            FROM league_teams lt
+            JOIN teams t ON t.team_id = lt.team_id
+            WHERE lt.league_id = %s AND lt.season = %s
+            """,
+            (league_id, season)
+        )
+        return {row["api_team_id"]: row["team_id"] for row in self.db_cursor.fetchall()}
+    
+    def _resolve_player_ids(self, batch, api_player_ids):
+        """Look up the player_id of the given players that aren't known yet, one query per chunk."""
+        missing = sorted(set(api_player_ids) - batch.player_ids.keys())
+        for start in range(0, len(missing), UPSERT_BATCH_SIZE):
+            chunk = missing[start:start + UPSERT_BATCH_SIZE]
+            self.db_cursor.execute(
+                f"SELECT api_player_id, player_id FROM players WHERE api_player_id IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+            batch.player_ids.update((row["api_player_id"], row["player_id"]) for row in self.db_cursor.fetchall())
+    
+    def _write_players(self, batch, season):
+        """Upsert the buffered players and squad memberships of a PlayerBatch."""
+        if batch.players:
+            self._bulk_upsert("players", PLAYER_COLUMNS, list(batch.players.values()), PLAYER_UPDATE)
+        
+        self._resolve_player_ids(batch, {api_player_id for _, api_player_id in batch.members})
+        
+        members = [
+            (team_id, batch.player_ids[api_player_id], number, position, captain, season)
+            for (team_id, api_player_id), (number, position, captain) in batch.members.items()
+            if api_player_id in batch.player_ids
+        ]
+        if members:
+            self._bulk_upsert("team_players", TEAM_PLAYER_COLUMNS, members, TEAM_PLAYER_UPDATE)
+        
+        self.db_conn.commit()
+        written = (len(batch.players), len(members))
+        batch.clear()
+        return written
+    
+    def fetch_players(self, league_id, season):
+        """Fetch the players of a league season with their team, number and position.
+
+        The paginated players endpoint is streamed: players are buffered and
+        written with multi-row upserts every UPSERT_BATCH_SIZE players, so a
+        league with thousands of players takes one statement per batch
+        instead of several per player. Run fetch_teams first; memberships of
+        teams outside the league are skipped.
+        """
+        logger.info(f"Fetching players for league_id={league_id}, season={season}...")
+        
+        try:
+            # Get API league_id
+            self.db_cursor.execute(
+                "SELECT api_league_id FROM leagues WHERE league_id = %s", 
+                (league_id,)
+            )
+            league_result = self.db_cursor.fetchone()
+            
+            if not league_result:
+                logger.error(f"League with ID {league_id} not found in database")
+                return
+            
+            team_ids = self._league_team_ids(league_id, season)
+            if not team_ids:
+                logger.warning(f"No teams stored for league {league_id}, season {season}; fetch teams first")
+            
+            params = {
+                "league": league_result["api_league_id"],
+                "season": season
+            }
+            batch = PlayerBatch()
+            players_written = members_written = 0
+            
+            for items in self.iter_api_pages("players", params):
+                for item in items:
+                    player = item["player"]
+                    batch.add_player(player["id"], (
+                        player["id"],
+                        player.get("name") or f"{player.get('firstname') or ''} {player.get('lastname') or ''}".strip(),
+                        player.get("firstname"),
+                        player.get("lastname"),
+                        (player.get("birth") or {}).get("date"),
+                        player.get("nationality"),
+                        player.get("height"),
+                        player.get("weight"),
+                        player.get("photo")
+                    ))
+                    
+                    # A player who moved during the season has one entry per team
+                    for stats in item.get("statistics") or []:
+                        team_id = team_ids.get((stats.get("team") or {}).get("id"))
+                        if team_id is None:
+                            continue
+                        games = stats.get("games") or {}
+                        batch.add_member(team_id, player["id"], games.get("number"),
+                                         games.get("position"), games.get("captain"))
+                
+                if len(batch) >= UPSERT_BATCH_SIZE:
+                    players, members = self._write_players(batch, season)
+                    players_written += players
+                    members_written += members
+            
+            players, members = self._write_players(batch, season)
+            players_written += players
+            members_written += members
+            logger.info(f"Successfully processed {players_written} players and {members_written} "
+                        f"squad entries for league {league_id}, season {season}")
+            
+        except (APIRequestError, DatabaseError, mysql.connector.Error) as err:
+            logger.error(f"Error fetching players: {err}")
+            self.db_conn.rollback()
+            raise
+    
+    def fetch_squads(self, league_id, season):
+        """Fetch the current squad of every team of a league season.
+
+        Squads add shirt numbers and positions for players who have not
+        played yet. They only carry a player's name and photo, so the
+        upsert keeps the details stored by fetch_players.
+        """
+        logger.info(f"Fetching squads for league_id={league_id}, season={season}...")
+        
+        try:
+            team_ids = self._league_team_ids(league_id, season)
+            batch = PlayerBatch()
+            players_written = members_written = 0
+            
+            for api_team_id, team_id in team_ids.items():
+                for squad in self.make_api_request("players/squads", {"team": api_team_id}):
+                    for player in squad.get("players") or []:
+                        batch.add_player(player["id"], (
+                            player["id"], player.get("name"), None, None, None, None, None, None,
+                            player.get("photo")
+                        ))
+                        batch.add_member(team_id, player["id"], player.get("number"),
+                                         player.get("position"), None)
+                
+                if len(batch) >= UPSERT_BATCH_SIZE:
+                    players, members = self._write_players(batch, season)
+                    players_written += players
+                    members_written += members
+            
+            players, members = self._write_players(batch, season)
+            players_written += players
+            members_written += members
+            logger.info(f"Successfully processed {players_written} players and {members_written} "
+                        f"squad entries from {len(team_ids)} squads of league {league_id}, season {season}")
+            
+        except (APIRequestError, DatabaseError, mysql.connector.Error) as err:
+            logger.error(f"Error fetching squads: {err}")
+            self.db_conn.rollback()
+            raise
+    
     def fetch_fixtures(self, league_id, season, status=None):
         """Fetch fixtures (matches) data for a specific league and season."""
         logger.info(f"Fetching fixtures for league_id={league_id}, season={season}, status={status}...")
@@ -443,11 +807,8 @@ class SportsDataFetcher:
             fixtures_data = self.make_api_request("fixtures", params)
             
             for fixture_data in fixtures_data:
-                fixture = fixture_data["fixture"]
-                league = fixture_data["league"]
-                teams = fixture_data["teams"]
-                goals = fixture_data["goals"]
-                score = fixture_data["score"]
+                row = extract_fixture(fixture_data)
+                api_fixture_id = row[FIXTURE_ID]
                 
                 # Get home and away team IDs
                 home_team_id = None
@@ -456,7 +817,7 @@ class SportsDataFetcher:
                 # Get home team
                 self.db_cursor.execute(
                     "SELECT team_id FROM teams WHERE api_team_id = %s", 
-                    (teams["home"]["id"],)
+                    (row[FIXTURE_HOME_TEAM],)
                 )
                 home_result = self.db_cursor.fetchone()
                 
@@ -466,7 +827,7 @@ class SportsDataFetcher:
                 # Get away team
                 self.db_cursor.execute(
                     "SELECT team_id FROM teams WHERE api_team_id = %s", 
-                    (teams["away"]["id"],)
+                    (row[FIXTURE_AWAY_TEAM],)
                 )
                 away_result = self.db_cursor.fetchone()
                 
@@ -475,22 +836,20 @@ class SportsDataFetcher:
                 
                 # Skip if we can't find both teams
                 if not home_team_id or not away_team_id:
-                    logger.warning(f"Skipping fixture {fixture['id']} - missing team IDs")
+                    logger.warning(f"Skipping fixture {api_fixture_id} - missing team IDs")
                     continue
                 
                 # Check if fixture already exists
                 self.db_cursor.execute(
-                    "SELECT fixture_id FROM fixtures WHERE api_fixture_id = %s", 
-                    (fixture["id"],)
+                    """
+                    SELECT fixture_id, status, home_score, away_score FROM fixtures
+                    WHERE api_fixture_id = %s AND season = %s
+                    """,
+                    (api_fixture_id, season)
                 )
                 result = self.db_cursor.fetchone()
                 
-                fixture_date = None
-                if fixture.get("date"):
-                    try:
-                        fixture_date = datetime.fromisoformat(fixture["date"].replace("Z", "+00:00"))
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid date format for fixture {fixture['id']}: {fixture.get('date')}")
+                fixture_date = self._parse_fixture_date(api_fixture_id, row[FIXTURE_DATE])
                 
                 if result:
                     # Update existing fixture
@@ -504,30 +863,23 @@ class SportsDataFetcher:
                         extratime_home_score = %s, extratime_away_score = %s,
                         penalty_home_score = %s, penalty_away_score = %s,
                         updated_at = NOW() 
-                    WHERE fixture_id = %s
+                    WHERE fixture_id = %s AND season = %s
                     """
                     self.db_cursor.execute(query, (
                         league_id,
                         home_team_id,
                         away_team_id,
                         fixture_date,
-                        fixture.get("status", {}).get("short"),
-                        league.get("round"),
+                        row[FIXTURE_STATUS],
+                        row[FIXTURE_ROUND],
                         season,
-                        fixture.get("venue", {}).get("name"),
-                        fixture.get("referee"),
-                        goals.get("home"),
-                        goals.get("away"),
-                        score.get("halftime", {}).get("home"),
-                        score.get("halftime", {}).get("away"),
-                        score.get("fulltime", {}).get("home"),
-                        score.get("fulltime", {}).get("away"),
-                        score.get("extratime", {}).get("home"),
-                        score.get("extratime", {}).get("away"),
-                        score.get("penalty", {}).get("home"),
-                        score.get("penalty", {}).get("away"),
-                        result["fixture_id"]
+                        row[FIXTURE_VENUE],
+                        row[FIXTURE_REFEREE],
+                        *row[FIXTURE_SCORES],
+                        result["fixture_id"],
+                        season
                     ))
+                    fixture_id = result["fixture_id"]
                 else:
                     # Insert new fixture
                     query = """
@@ -540,34 +892,199 @@ class SportsDataFetcher:
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     """
                     self.db_cursor.execute(query, (
-                        fixture["id"],
+                        api_fixture_id,
                         league_id,
                         home_team_id,
                         away_team_id,
                         fixture_date,
-                        fixture.get("status", {}).get("short"),
-                        league.get("round"),
+                        row[FIXTURE_STATUS],
+                        row[FIXTURE_ROUND],
                         season,
-                        fixture.get("venue", {}).get("name"),
-                        fixture.get("referee"),
-                        goals.get("home"),
-                        goals.get("away"),
-                        score.get("halftime", {}).get("home"),
-                        score.get("halftime", {}).get("away"),
-                        score.get("fulltime", {}).get("home"),
-                        score.get("fulltime", {}).get("away"),
-                        score.get("extratime", {}).get("home"),
-                        score.get("extratime", {}).get("away"),
-                        score.get("penalty", {}).get("home"),
-                        score.get("penalty", {}).get("away")
+                        row[FIXTURE_VENUE],
+                        row[FIXTURE_REFEREE],
+                        *row[FIXTURE_SCORES]
                     ))
+                    fixture_id = self.db_cursor.lastrowid
+                
+                self._track_final_result(
+                    fixture_id, result,
+                    row[FIXTURE_STATUS],
+                    row[FIXTURE_HOME_GOALS],
+                    row[FIXTURE_AWAY_GOALS]
+                )
             
             self.db_conn.commit()
             logger.info(f"Successfully processed {len(fixtures_data)} fixtures for league {league_id}, season {season}")
             
+            self.process_finalized_fixtures()
+            
         except (APIRequestError, DatabaseError) as err:
             logger.error(f"Error fetching fixtures: {err}")
             self.db_conn.rollback()
+            self.finalized_fixture_ids.clear()
+            raise
+    
+    def _detail_fixtures(self, league_id=None, season=None, fixture_ids=None, refresh=False):
+        """Return the stored fixtures whose details should be fetched.
+
+        By default these are the finished fixtures without details; with
+        fixture_ids, exactly those fixtures.
+        """
+        conditions, params = [], []
+        if fixture_ids:
+            conditions.append(f"f.fixture_id IN ({', '.join(['%s'] * len(fixture_ids))})")
+            params.extend(fixture_ids)
+        else:
+            conditions.append(f"f.status IN ({', '.join(['%s'] * len(FINISHED_STATUSES))})")
+            params.extend(FINISHED_STATUSES)
+            if not refresh:
+                conditions.append("f.details_updated_at IS NULL")
+        if league_id:
+            conditions.append("f.league_id = %s")
+            params.append(league_id)
+        if season:
+            conditions.append("f.season = %s")
+            params.append(season)
+        
+        self.db_cursor.execute(
+            f"""
+            SELECT f.fixture_id, f.api_fixture_id, f.home_team_id, f.away_team_id,
+                   h.api_team_id AS home_api_team_id, a.api_team_id AS away_api_team_id
+            FROM fixtures f
+            JOIN teams h ON h.team_id = f.home_team_id
+            JOIN teams a ON a.team_id = f.away_team_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY f.fixture_date
+            """,
+            params
+        )
+        return self.db_cursor.fetchall()
+    
+    def _write_fixture_details(self, fixtures, items, batch):
+        """Write the events and statistics of one fixtures?ids= response in one transaction."""
+        events, statistics, player_stats = [], [], []
+        fetched = []
+        
+        for item in items:
+            fixture = fixtures.get((item.get("fixture") or {}).get("id"))
+            if fixture is None:
+                continue
+            fixture_id = fixture["fixture_id"]
+            team_ids = {
+                fixture["home_api_team_id"]: fixture["home_team_id"],
+                fixture["away_api_team_id"]: fixture["away_team_id"],
+            }
+            fetched.append(fixture_id)
+            
+            for event in item.get("events") or []:
+                row = extract_event(event)
+                team_id = team_ids.get(row[EVENT_TEAM])
+                if team_id is None:
+                    continue
+                for id_field, name_field in ((EVENT_PLAYER, EVENT_PLAYER_NAME), (EVENT_ASSIST, EVENT_ASSIST_NAME)):
+                    if row[id_field]:
+                        batch.add_player(row[id_field], (row[id_field], row[name_field] or "Unknown",
+                                                         None, None, None, None, None, None, None))
+                events.append((fixture_id, team_id, *row[EVENT_FIELDS]))
+            
+            for team_stats in item.get("statistics") or []:
+                team_id = team_ids.get((team_stats.get("team") or {}).get("id"))
+                if team_id is None:
+                    continue
+                for stat in team_stats.get("statistics") or []:
+                    if stat.get("type") and stat.get("value") is not None:
+                        statistics.append((fixture_id, team_id, stat["type"], str(stat["value"])))
+            
+            for team_players in item.get("players") or []:
+                team_id = team_ids.get((team_players.get("team") or {}).get("id"))
+                if team_id is None:
+                    continue
+                for entry in team_players.get("players") or []:
+                    player = entry.get("player") or {}
+                    if not player.get("id"):
+                        continue
+                    batch.add_player(player["id"], (
+                        player["id"], player.get("name") or "Unknown", None, None, None, None, None, None,
+                        player.get("photo")
+                    ))
+                    stats = extract_player_stats((entry.get("statistics") or [None])[0] or {})
+                    player_stats.append((fixture_id, player["id"], team_id, *stats))
+        
+        if not fetched:
+            return 0
+        
+        # Players referenced by events and lineups must exist before their rows;
+        # stored players keep the details written by fetch_players
+        if batch.players:
+            self._bulk_upsert("players", PLAYER_COLUMNS, list(batch.players.values()),
+                              "photo_url = COALESCE(photo_url, VALUES(photo_url))")
+        self._resolve_player_ids(
+            batch,
+            [api_id for row in events for api_id in row[2:4] if api_id] + [row[1] for row in player_stats]
+        )
+        player_id = batch.player_ids.get
+        
+        # Events have no natural key, so each fixture's events are replaced as a whole
+        placeholders = ", ".join(["%s"] * len(fetched))
+        self.db_cursor.execute(f"DELETE FROM events WHERE fixture_id IN ({placeholders})", fetched)
+        self._bulk_upsert("events", EVENT_COLUMNS, [
+            (fixture_id, team_id, player_id(player), player_id(assist), *rest)
+            for fixture_id, team_id, player, assist, *rest in events
+        ])
+        if statistics:
+            self._bulk_upsert("statistics", STATISTIC_COLUMNS, statistics, "stat_value = VALUES(stat_value)")
+        player_stats = [
+            (row[0], player_id(row[1]), row[2], *row[3:10], _to_int(row[10]), *row[11:])
+            for row in player_stats
+            if player_id(row[1])
+        ]
+        if player_stats:
+            self._bulk_upsert("player_statistics", PLAYER_STATISTIC_COLUMNS, player_stats, PLAYER_STATISTIC_UPDATE)
+        
+        self.db_cursor.execute(f"UPDATE fixtures SET details_updated_at = NOW() WHERE fixture_id IN ({placeholders})", fetched)
+        self.db_conn.commit()
+        for fixture_id in fetched:
+            self.live_event_marks.pop(fixture_id, None)
+        batch.clear()
+        return len(fetched)
+    
+    def fetch_fixture_details(self, league_id=None, season=None, fixture_ids=None, refresh=False):
+        """Fetch events, team statistics and player statistics of stored fixtures.
+
+        Details are requested with the multi-id fixtures?ids= form, up to
+        FIXTURE_DETAIL_BATCH_SIZE fixtures per call, and each response is
+        written with bulk statements in one transaction, so both API quota
+        and database round trips scale with batches rather than fixtures.
+        Re-fetching a fixture replaces its events and updates its statistics.
+
+        Args:
+            league_id (int, optional): Only fixtures of this league (internal ID)
+            season (int, optional): Only fixtures of this season
+            fixture_ids (list, optional): Internal fixture IDs to fetch, finished or not
+            refresh (bool): Also re-fetch finished fixtures that already have details
+
+        Returns:
+            int: Number of fixtures whose details were written
+        """
+        logger.info(f"Fetching fixture details for league_id={league_id}, season={season}...")
+        
+        try:
+            fixtures = self._detail_fixtures(league_id, season, fixture_ids, refresh)
+            batch = PlayerBatch()
+            written = 0
+            
+            for start in range(0, len(fixtures), FIXTURE_DETAIL_BATCH_SIZE):
+                chunk = {row["api_fixture_id"]: row for row in fixtures[start:start + FIXTURE_DETAIL_BATCH_SIZE]}
+                items = self.make_api_request("fixtures", {"ids": "-".join(str(api_id) for api_id in chunk)})
+                written += self._write_fixture_details(chunk, items, batch)
+            
+            logger.info(f"Successfully processed details of {written} of {len(fixtures)} fixtures "
+                        f"in {(len(fixtures) + FIXTURE_DETAIL_BATCH_SIZE - 1) // FIXTURE_DETAIL_BATCH_SIZE} requests")
+            return written
+            
+        except (APIRequestError, DatabaseError, mysql.connector.Error) as err:
+            logger.error(f"Error fetching fixture details: {err}")
+            self.db_conn.rollback()
             raise
     
     def fetch_standings(self, league_id, season):
@@ -683,8 +1200,15 @@ class SportsDataFetcher:
             self.db_conn.rollback()
             raise
     
-    def run_full_update(self, season=None):
-        """Run a full update of all data."""
+    def run_full_update(self, season=None, reconcile_standings=False, players=False, details=False):
+        """Run a full update of all data.
+        
+        Standings are computed locally from the stored fixtures. With
+        reconcile_standings=True the API standings are fetched as well and
+        compared against the computed tables. With players=True the players
+        and squads of every league are fetched too, and with details=True
+        the events and statistics of finished fixtures.
+        """
         try:
             # Connect to database
             self.connect_to_database()
@@ -703,7 +1227,7 @@ class SportsDataFetcher:
             self.db_cursor.execute("SELECT league_id FROM leagues")
             leagues = self.db_cursor.fetchall()
             
-            # For each league, fetch teams, fixtures, and standings
+            # For each league, fetch teams and fixtures
             for league in leagues:
                 league_id = league["league_id"]
                 
@@ -713,12 +1237,26 @@ class SportsDataFetcher:
                 # Fetch fixtures
                 self.fetch_fixtures(league_id, season)
                 
-                # Fetch standings
-                self.fetch_standings(league_id, season)
+                if players:
+                    self.fetch_players(league_id, season)
+                    self.fetch_squads(league_id, season)
+                
+                if details:
+                    self.fetch_fixture_details(league_id, season)
                 
                 # Add a small delay to avoid hitting rate limits
                 time.sleep(1)
             
+            # Rebuild standings for all leagues from the stored fixtures
+            from standings_engine import StandingsEngine
+            engine = StandingsEngine(self.db_conn)
+            engine.rebuild()
+            
+            if reconcile_standings:
+                for league in leagues:
+                    engine.reconcile(self, league["league_id"], season)
+                    time.sleep(1)
+            
             logger.info("Full update completed successfully")
             
         except Exception as err:
@@ -727,6 +1265,103 @@ class SportsDataFetcher:
         finally:
             self.close_database_connection()
     
+    def _apply_live_events(self, live_events):
+        """Bring the stored events of live fixtures in line with the API.
+
+        Each live fixture's stored events are kept in memory, keyed on their
+        content, as its high-water mark. Every cycle the API event list is
+        matched against them: only events not seen before are inserted,
+        and only stored events the API no longer reports are deleted. An
+        amended event, such as a goal cancelled by VAR, is one delete and
+        one insert. A quiet minute writes nothing.
+
+        Args:
+            live_events (dict): fixture_id -> ({api_team_id: team_id}, API event list)
+
+        Returns:
+            tuple: (inserted, deleted) event counts
+        """
+        # Forget fixtures that are no longer live
+        for fixture_id in list(self.live_event_marks):
+            if fixture_id not in live_events:
+                del self.live_event_marks[fixture_id]
+        
+        # First sight of a fixture (or a new process): load its stored events once
+        unseen = [fixture_id for fixture_id in live_events if fixture_id not in self.live_event_marks]
+        for fixture_id in unseen:
+            self.live_event_marks[fixture_id] = {}
+        if unseen:
+            self.db_cursor.execute(
+                f"""
+                SELECT event_id, fixture_id, {", ".join(EVENT_COLUMNS[1:])} FROM events
+                WHERE fixture_id IN ({", ".join(["%s"] * len(unseen))})
+                """,
+                unseen
+            )
+            for stored in self.db_cursor.fetchall():
+                key = tuple(stored[column] for column in EVENT_COLUMNS[1:])
+                self.live_event_marks[stored["fixture_id"]].setdefault(key, []).append(stored["event_id"])
+        
+        # Players named in events are stored before the events that reference them
+        batch = self.live_players
+        rows = {}
+        for fixture_id, (team_ids, events) in live_events.items():
+            rows[fixture_id] = []
+            for event in events:
+                row = extract_event(event)
+                team_id = team_ids.get(row[EVENT_TEAM])
+                if team_id is None:
+                    continue
+                for id_field, name_field in ((EVENT_PLAYER, EVENT_PLAYER_NAME), (EVENT_ASSIST, EVENT_ASSIST_NAME)):
+                    if row[id_field]:
+                        batch.add_player(row[id_field], (row[id_field], row[name_field] or "Unknown",
+                                                         None, None, None, None, None, None, None))
+                rows[fixture_id].append((team_id, *row[EVENT_FIELDS]))
+        if batch.players:
+            new_players = list(batch.players)
+            self._bulk_upsert("players", PLAYER_COLUMNS, list(batch.players.values()),
+                              "photo_url = COALESCE(photo_url, VALUES(photo_url))")
+            self._resolve_player_ids(batch, new_players)
+            batch.clear()
+        player_id = batch.player_ids.get
+        
+        inserted = deleted = 0
+        for fixture_id, fixture_rows in rows.items():
+            stored = self.live_event_marks[fixture_id]
+            unmatched = {key: list(event_ids) for key, event_ids in stored.items()}
+            new_keys = []
+            for team_id, api_player_id, api_assist_id, *rest in fixture_rows:
+                key = (team_id, player_id(api_player_id), player_id(api_assist_id), *rest)
+                if unmatched.get(key):
+                    unmatched[key].pop()
+                else:
+                    new_keys.append(key)
+            
+            removed = [event_id for event_ids in unmatched.values() for event_id in event_ids]
+            if removed:
+                self.db_cursor.execute(
+                    f"DELETE FROM events WHERE event_id IN ({', '.join(['%s'] * len(removed))})",
+                    removed
+                )
+                for key, event_ids in unmatched.items():
+                    for event_id in event_ids:
+                        stored[key].remove(event_id)
+                        if not stored[key]:
+                            del stored[key]
+            
+            # One row at a time, so each new event's ID can be kept for later deletes
+            for key in new_keys:
+                self.db_cursor.execute(
+                    f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join(['%s'] * len(EVENT_COLUMNS))})",
+                    (fixture_id, *key)
+                )
+                stored.setdefault(key, []).append(self.db_cursor.lastrowid)
+            
+            inserted += len(new_keys)
+            deleted += len(removed)
+        
+        return inserted, deleted
+    
     def update_live_fixtures(self):
         """Update only live fixtures."""
         try:
@@ -735,23 +1370,22 @@ class SportsDataFetcher:
             
             # Fetch live fixtures from API
             live_fixtures = self.make_api_request("fixtures", {"live": "all"})
+            live_events = {}
             
             for fixture_data in live_fixtures:
-                fixture = fixture_data["fixture"]
-                league = fixture_data["league"]
-                teams = fixture_data["teams"]
-                goals = fixture_data["goals"]
-                score = fixture_data["score"]
+                row = extract_fixture(fixture_data)
+                api_fixture_id = row[FIXTURE_ID]
+                season = row[FIXTURE_SEASON]
                 
                 # Get league_id
                 self.db_cursor.execute(
                     "SELECT league_id FROM leagues WHERE api_league_id = %s", 
-                    (league["id"],)
+                    (row[FIXTURE_LEAGUE],)
                 )
                 league_result = self.db_cursor.fetchone()
                 
                 if not league_result:
-                    logger.warning(f"League with API ID {league['id']} not found in database")
+                    logger.warning(f"League with API ID {row[FIXTURE_LEAGUE]} not found in database")
                     continue
                 
                 league_id = league_result["league_id"]
@@ -763,7 +1397,7 @@ class SportsDataFetcher:
                 # Get home team
                 self.db_cursor.execute(
                     "SELECT team_id FROM teams WHERE api_team_id = %s", 
-                    (teams["home"]["id"],)
+                    (row[FIXTURE_HOME_TEAM],)
                 )
                 home_result = self.db_cursor.fetchone()
                 
@@ -773,7 +1407,7 @@ class SportsDataFetcher:
                 # Get away team
                 self.db_cursor.execute(
                     "SELECT team_id FROM teams WHERE api_team_id = %s", 
-                    (teams["away"]["id"],)
+                    (row[FIXTURE_AWAY_TEAM],)
                 )
                 away_result = self.db_cursor.fetchone()
                 
@@ -782,22 +1416,20 @@ class SportsDataFetcher:
                 
                 # Skip if we can't find both teams
                 if not home_team_id or not away_team_id:
-                    logger.warning(f"Skipping fixture {fixture['id']} - missing team IDs")
+                    logger.warning(f"Skipping fixture {api_fixture_id} - missing team IDs")
                     continue
                 
                 # Check if fixture already exists
                 self.db_cursor.execute(
-                    "SELECT fixture_id FROM fixtures WHERE api_fixture_id = %s", 
-                    (fixture["id"],)
+                    """
+                    SELECT fixture_id, status, home_score, away_score FROM fixtures
+                    WHERE api_fixture_id = %s AND season = %s
+                    """,
+                    (api_fixture_id, season)
                 )
                 result = self.db_cursor.fetchone()
                 
-                fixture_date = None
-                if fixture.get("date"):
-                    try:
-                        fixture_date = datetime.fromisoformat(fixture["date"].replace("Z", "+00:00"))
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid date format for fixture {fixture['id']}: {fixture.get('date')}")
+                fixture_date = self._parse_fixture_date(api_fixture_id, row[FIXTURE_DATE])
                 
                 if result:
                     # Update existing fixture
@@ -809,22 +1441,15 @@ class SportsDataFetcher:
                         extratime_home_score = %s, extratime_away_score = %s,
                         penalty_home_score = %s, penalty_away_score = %s,
                         updated_at = NOW() 
-                    WHERE fixture_id = %s
+                    WHERE fixture_id = %s AND season = %s
                     """
                     self.db_cursor.execute(query, (
-                        fixture.get("status", {}).get("short"),
-                        goals.get("home"),
-                        goals.get("away"),
-                        score.get("halftime", {}).get("home"),
-                        score.get("halftime", {}).get("away"),
-                        score.get("fulltime", {}).get("home"),
-                        score.get("fulltime", {}).get("away"),
-                        score.get("extratime", {}).get("home"),
-                        score.get("extratime", {}).get("away"),
-                        score.get("penalty", {}).get("home"),
-                        score.get("penalty", {}).get("away"),
-                        result["fixture_id"]
+                        row[FIXTURE_STATUS],
+                        *row[FIXTURE_SCORES],
+                        result["fixture_id"],
+                        season
                     ))
+                    fixture_id = result["fixture_id"]
                 else:
                     # Insert new fixture
                     query = """
@@ -837,33 +1462,46 @@ class SportsDataFetcher:
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     """
                     self.db_cursor.execute(query, (
-                        fixture["id"],
+                        api_fixture_id,
                         league_id,
                         home_team_id,
                         away_team_id,
                         fixture_date,
-                        fixture.get("status", {}).get("short"),
-                        league.get("round"),
-                        league.get("season"),
-                        fixture.get("venue", {}).get("name"),
-                        fixture.get("referee"),
-                        goals.get("home"),
-                        goals.get("away"),
-                        score.get("halftime", {}).get("home"),
-                        score.get("halftime", {}).get("away"),
-                        score.get("fulltime", {}).get("home"),
-                        score.get("fulltime", {}).get("away"),
-                        score.get("extratime", {}).get("home"),
-                        score.get("extratime", {}).get("away"),
-                        score.get("penalty", {}).get("home"),
-                        score.get("penalty", {}).get("away")
+                        row[FIXTURE_STATUS],
+                        row[FIXTURE_ROUND],
+                        season,
+                        row[FIXTURE_VENUE],
+                        row[FIXTURE_REFEREE],
+                        *row[FIXTURE_SCORES]
                     ))
+                    fixture_id = self.db_cursor.lastrowid
+                
+                if fixture_data.get("events") is not None:
+                    live_events[fixture_id] = (
+                        {row[FIXTURE_HOME_TEAM]: home_team_id, row[FIXTURE_AWAY_TEAM]: away_team_id},
+                        fixture_data["events"]
+                    )
+                
+                self._track_final_result(
+                    fixture_id, result,
+                    row[FIXTURE_STATUS],
+                    row[FIXTURE_HOME_GOALS],
+                    row[FIXTURE_AWAY_GOALS]
+                )
+            
+            inserted, deleted = self._apply_live_events(live_events)
             
             self.db_conn.commit()
-            logger.info(f"Successfully updated {len(live_fixtures)} live fixtures")
+            logger.info(f"Successfully updated {len(live_fixtures)} live fixtures "
+                        f"({inserted} new and {deleted} removed events)")
+            
+            self.process_finalized_fixtures()
             
         except Exception as err:
             logger.error(f"Error updating live fixtures: {err}")
+            self.finalized_fixture_ids.clear()
+            # The marks may describe writes that are rolled back; reload them next cycle
+            self.live_event_marks.clear()
             raise
         finally:
             self.close_database_connection()
@@ -876,21 +1514,54 @@ def main():
     parser.add_argument("--season", type=int, help="Season to fetch data for (default: current year)")
     parser.add_argument("--country", type=str, help="Country to fetch leagues for")
     parser.add_argument("--league", type=int, help="League ID to fetch data for")
+    parser.add_argument("--reconcile-standings", action="store_true",
+                        help="With --full, compare computed standings against the API standings endpoint")
+    parser.add_argument("--players", action="store_true",
+                        help="With --full or a league and season, also fetch players and squads")
+    parser.add_argument("--details", action="store_true",
+                        help="With --full or a league and season, also fetch events and statistics of finished fixtures")
+    parser.add_argument("--record", action="store_true",
+                        help=f"Archive every API response (directory: {RESPONSE_ARCHIVE_DIR})")
+    parser.add_argument("--replay", type=str, metavar="DAY",
+                        help="Answer requests from the response archive of a day (YYYY-MM-DD) instead of the API")
     
     args = parser.parse_args()
     
+    archive = None
+    if args.replay:
+        archive = configure_archive("replay", day=args.replay)
+    elif args.record:
+        configure_archive("record")
+    
     fetcher = SportsDataFetcher()
     
     try:
-        if args.live:
+        if args.live and archive is not None:
+            # Re-run every recorded live poll of the day, until no live poll is left
+            ticks = 0
+            while archive.remaining("api-sports"):
+                replayed = archive.replayed
+                try:
+                    fetcher.update_live_fixtures()
+                except APIRequestError:
+                    if archive.replayed == replayed:
+                        break
+                    raise
+                ticks += 1
+            logger.info(f"Replayed {ticks} live updates ({archive.replayed} responses)")
+        elif args.live:
             fetcher.update_live_fixtures()
         elif args.full:
-            fetcher.run_full_update(args.season)
+            fetcher.run_full_update(args.season, args.reconcile_standings, args.players, args.details)
         elif args.league and args.season:
             fetcher.connect_to_database()
             fetcher.fetch_teams(args.league, args.season)
             fetcher.fetch_fixtures(args.league, args.season)
-            fetcher.fetch_standings(args.league, args.season)
+            if args.players:
+                fetcher.fetch_players(args.league, args.season)
+                fetcher.fetch_squads(args.league, args.season)
+            if args.details:
+                fetcher.fetch_fixture_details(args.league, args.season)
             fetcher.close_database_connection()
         elif args.country:
             fetcher.connect_to_database()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Standings Engine
+
+This module derives league tables from the finished fixtures already stored
+in the database instead of calling the API-Sports standings endpoint. All
+league-seasons are computed in one vectorized NumPy pass; when fixture
+results change only the affected league-seasons are recomputed. The API
+standings call is kept as an occasional reconciliation check.
+"""
+
+import sys
+import logging
+import argparse
+import numpy as np
+import mysql.connector
+from sports_data_fetcher import (
+    SportsDataFetcher, FINISHED_STATUSES, APIRequestError, DatabaseError
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("standings_engine.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("standings_engine")
+
+# Tiebreakers available for ranking: name -> (column, higher_is_better)
+TIEBREAKERS = {
+    "points": ("points", True),
+    "goal_diff": ("goal_diff", True),
+    "goals_for": ("goals_for", True),
+    "goals_against": ("goals_against", False),
+    "win": ("win", True),
+    "away_goals_for": ("away_goals_for", True),
+}
+
+DEFAULT_TIEBREAKERS = ("points", "goal_diff", "goals_for")
+
+# Only league-phase rounds count towards the table (API-Sports names them
+# "Regular Season - N"); playoff and relegation rounds are excluded
+DEFAULT_ROUND_PREFIXES = ("Regular Season",)
+
+
+class StandingsEngine:
+    """Vectorized standings calculator over the fixtures table."""
+
+    def __init__(self, db_conn, points=(3, 1, 0), tiebreakers=DEFAULT_TIEBREAKERS,
+                 form_length=5, round_prefixes=DEFAULT_ROUND_PREFIXES):
+        """Initialize the engine.
+
+        Args:
+            db_conn: Open database connection
+            points (tuple): Points for a win, draw and loss
+            tiebreakers (tuple): Names from TIEBREAKERS in priority order;
+                the team_id is always used as the final, deterministic key
+            form_length (int): Number of recent results kept in the form string
+            round_prefixes (tuple, optional): Only count fixtures whose round
+                starts with one of these prefixes. None counts every round.
+        """
+        unknown = [name for name in tiebreakers if name not in TIEBREAKERS]
+        if unknown:
+            raise ValueError(f"Unknown tiebreakers: {', '.join(unknown)}")
+
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor(dictionary=True)
+        self.points = points
+        self.tiebreakers = tuple(tiebreakers)
+        self.form_length = form_length
+        self.round_prefixes = round_prefixes
+
+    def load_fixtures(self, groups=None):
+        """Load finished league-phase fixtures into column arrays.
+
+        Args:
+            groups (iterable, optional): (league_id, season) pairs to load.
+                All league-seasons are loaded when omitted.
+
+        Returns:
+            dict: Column name -> NumPy array
+        """
+        query = f"""
+        SELECT f.fixture_id, f.league_id, f.season, f.home_team_id, f.away_team_id,
+               f.home_score, f.away_score, UNIX_TIMESTAMP(f.fixture_date) AS kickoff
+        FROM fixtures f
+        JOIN leagues l ON f.league_id = l.league_id
+        WHERE l.type = 'League'
+          AND f.status IN ({', '.join(['%s'] * len(FINISHED_STATUSES))})
+          AND f.home_score IS NOT NULL AND f.away_score IS NOT NULL
+        """
+        params = list(FINISHED_STATUSES)
+
+        if self.round_prefixes:
+            query += " AND (" + " OR ".join(["f.round LIKE %s"] * len(self.round_prefixes)) + ")"
+            params.extend(f"{prefix}%" for prefix in self.round_prefixes)
+
+        if groups is not None:
+            groups = list(groups)
+            if not groups:
+                return self._empty_fixtures()
+            query += " AND (" + " OR ".join(["(f.league_id = %s AND f.season = %s)"] * len(groups)) + ")"
+            for league_id, season in groups:
+                params.extend((league_id, season))
+
+        cursor = self.db_conn.cursor()
+        cursor.execute(query, tuple(params))
+        rows = cursor.fetchall()
+        cursor.close()
+
+        if not rows:
+            return self._empty_fixtures()
+
+        data = np.array(
+            [tuple(0 if value is None else value for value in row) for row in rows],
+            dtype=np.int64
+        )
+        return {
+            "fixture_id": data[:, 0],
+            "league_id": data[:, 1],
+            "season": data[:, 2],
+            "home_team_id": data[:, 3],
+            "away_team_id": data[:, 4],
+            "home_score": data[:, 5],
+            "away_score": data[:, 6],
+            "kickoff": data[:, 7],
+        }
+
+    @staticmethod
+    def _empty_fixtures():
+        empty = np.zeros(0, dtype=np.int64)
+        return {name: empty for name in (
+            "fixture_id", "league_id", "season", "home_team_id", "away_team_id",
+            "home_score", "away_score", "kickoff"
+        )}
+
+    def compute(self, fixtures):
+        """Compute standings rows from fixture arrays.
+
+        Every fixture is expanded into a home and an away perspective so that
+        per-team aggregates become a single bincount over group indices.
+
+        Returns:
+            list[dict]: One row per (league_id, season, team_id)
+        """
+        if len(fixtures["fixture_id"]) == 0:
+            return []
+
+        league = np.concatenate([fixtures["league_id"], fixtures["league_id"]])
+        season = np.concatenate([fixtures["season"], fixtures["season"]])
+        team = np.concatenate([fixtures["home_team_id"], fixtures["away_team_id"]])
+        goals_for = np.concatenate([fixtures["home_score"], fixtures["away_score"]])
+        goals_against = np.concatenate([fixtures["away_score"], fixtures["home_score"]])
+        kickoff = np.concatenate([fixtures["kickoff"], fixtures["kickoff"]])
+        fixture_id = np.concatenate([fixtures["fixture_id"], fixtures["fixture_id"]])
+        is_away = np.repeat([0, 1], len(fixtures["fixture_id"]))
+
+        keys, group = np.unique(
+            np.stack([league, season, team], axis=1), axis=0, return_inverse=True
+        )
+        group = group.ravel()
+        n_groups = len(keys)
+
+        win = goals_for > goals_against
+        draw = goals_for == goals_against
+        lose = goals_for < goals_against
+
+        def total(values):
+            return np.bincount(group, weights=values, minlength=n_groups).astype(np.int64)
+
+        table = {
+            "played": np.bincount(group, minlength=n_groups).astype(np.int64),
+            "win": total(win),
+            "draw": total(draw),
+            "lose": total(lose),
+            "goals_for": total(goals_for),
+            "goals_against": total(goals_against),
+            "away_goals_for": total(goals_for * is_away),
+        }
+        win_points, draw_points, lose_points = self.points
+        table["points"] = (
+            table["win"] * win_points + table["draw"] * draw_points + table["lose"] * lose_points
+        )
+        table["goal_diff"] = table["goals_for"] - table["goals_against"]
+
+        form = self._form_strings(group, n_groups, win, draw, kickoff, fixture_id)
+        rank = self._ranks(keys, table)
+
+        return [
+            {
+                "league_id": int(keys[i, 0]),
+                "season": int(keys[i, 1]),
+                "team_id": int(keys[i, 2]),
+                "rank": int(rank[i]),
+                "points": int(table["points"][i]),
+                "played": int(table["played"][i]),
+                "win": int(table["win"][i]),
+                "draw": int(table["draw"][i]),
+                "lose": int(table["lose"][i]),
+                "goals_for": int(table["goals_for"][i]),
+                "goals_against": int(table["goals_against"][i]),
+                "goal_diff": int(table["goal_diff"][i]),
+                "form": form[i],
+            }
+            for i in range(n_groups)
+        ]
+
+    def _form_strings(self, group, n_groups, win, draw, kickoff, fixture_id):
+        """Build the last-N results string per team (oldest to newest)."""
+        order = np.lexsort((fixture_id, kickoff, group))
+        sorted_group = group[order]
+        counts = np.bincount(group, minlength=n_groups)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        position = np.arange(len(order)) - starts[sorted_group]
+        recent = position >= counts[sorted_group] - self.form_length
+
+        letters = np.where(win[order], "W", np.where(draw[order], "D", "L"))[recent]
+        recent_groups = sorted_group[recent]
+        boundaries = np.flatnonzero(np.diff(recent_groups)) + 1
+
+        form = [""] * n_groups
+        for group_id, chunk in zip(recent_groups[np.r_[0, boundaries]], np.split(letters, boundaries)):
+            form[group_id] = "".join(chunk)
+        return form
+
+    def _ranks(self, keys, table):
+        """Rank teams within each league-season using the tiebreakers."""
+        league_season = keys[:, 0] * 10000 + keys[:, 1]
+        sort_keys = [keys[:, 2]]  # team_id, lowest priority
+        for name in reversed(self.tiebreakers):
+            column, higher_is_better = TIEBREAKERS[name]
+            sort_keys.append(-table[column] if higher_is_better else table[column])
+        sort_keys.append(league_season)  # highest priority
+        order = np.lexsort(sort_keys)
+
+        sorted_ls = league_season[order]
+        is_start = np.r_[True, sorted_ls[1:] != sorted_ls[:-1]]
+        start_index = np.maximum.accumulate(np.where(is_start, np.arange(len(order)), 0))
+
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - start_index + 1
+        return rank
+
+    def _add_unplayed_teams(self, rows, groups):
+        """Add zero rows for registered teams without a finished fixture yet."""
+        groups = list(groups)
+        if not groups:
+            return rows
+
+        seen = {(row["league_id"], row["season"], row["team_id"]) for row in rows}
+        params = []
+        for league_id, season in groups:
+            params.extend((league_id, season))
+        self.db_cursor.execute(
+            "SELECT league_id, season, team_id FROM league_teams WHERE "
+            + " OR ".join(["(league_id = %s AND season = %s)"] * len(groups)),
+            tuple(params)
+        )
+
+        ranks = {}
+        for row in rows:
+            key = (row["league_id"], row["season"])
+            ranks[key] = max(ranks.get(key, 0), row["rank"])
+
+        for lt in sorted(self.db_cursor.fetchall(), key=lambda r: r["team_id"]):
+            key = (lt["league_id"], lt["season"], lt["team_id"])
+            if key in seen:
+                continue
+            ranks[key[:2]] = ranks.get(key[:2], 0) + 1
+            rows.append({
+                "league_id": lt["league_id"], "season": lt["season"], "team_id": lt["team_id"],
+                "rank": ranks[key[:2]], "points": 0, "played": 0, "win": 0, "draw": 0,
+                "lose": 0, "goals_for": 0, "goals_against": 0, "goal_diff": 0, "form": "",
+            })
+        return rows
+
+    def write(self, rows):
+        """Upsert standings rows keyed on (league_id, team_id, season)."""
+        if not rows:
+            return
+
+        query = """
+        INSERT INTO standings
+        (league_id, team_id, season, `rank`, points, played,
+         win, draw, lose, goals_for, goals_against, goal_diff, form)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            `rank` = VALUES(`rank`), points = VALUES(points), played = VALUES(played),
+            win = VALUES(win), draw = VALUES(draw), lose = VALUES(lose),
+            goals_for = VALUES(goals_for), goals_against = VALUES(goals_against),
+            goal_diff = VALUES(goal_diff), form = VALUES(form), updated_at = NOW()
+        """
+        values = [
+            (row["league_id"], row["team_id"], row["season"], row["rank"], row["points"],
+             row["played"], row["win"], row["draw"], row["lose"], row["goals_for"],
+             row["goals_against"], row["goal_diff"], row["form"])
+            for row in rows
+        ]
+        try:
+            for start in range(0, len(values), 1000):
+                self.db_cursor.executemany(query, values[start:start + 1000])
+            self.db_conn.commit()
+        except mysql.connector.Error as err:
+            logger.error(f"Error writing standings: {err}")
+            self.db_conn.rollback()
+            raise DatabaseError(f"Failed to write standings: {err}")
+
+    def rebuild(self):
+        """Recompute standings for every league-season in one pass."""
+        fixtures = self.load_fixtures()
+        rows = self.compute(fixtures)
+        groups = {(row["league_id"], row["season"]) for row in rows}
+        rows = self._add_unplayed_teams(rows, groups)
+        self.write(rows)
+        logger.info(f"Rebuilt standings for {len(groups)} league-seasons ({len(rows)} rows)")
+        return rows
+
+    def recompute(self, groups):
+        """Recompute standings for the given (league_id, season) pairs only."""
+        groups = sorted(set(groups))
+        if not groups:
+            return []
+        rows = self.compute(self.load_fixtures(groups))
+        rows = self._add_unplayed_teams(rows, groups)
+        self.write(rows)
+        logger.info(f"Recomputed standings for {len(groups)} league-seasons")
+        return rows
+
+    def recompute_for_fixtures(self, fixture_ids):
+        """Recompute the league-seasons that contain the given fixtures."""
+        fixture_ids = list(fixture_ids)
+        if not fixture_ids:
+            return []
+        self.db_cursor.execute(
+            f"SELECT DISTINCT league_id, season FROM fixtures WHERE fixture_id IN ({', '.join(['%s'] * len(fixture_ids))})",
+            tuple(fixture_ids)
+        )
+        groups = [(row["league_id"], row["season"]) for row in self.db_cursor.fetchall()]
+        return self.recompute(groups)
+
+    def reconcile(self, fetcher, league_id, season):
+        """Compare computed standings with the API-Sports standings endpoint.
+
+        Args:
+            fetcher (SportsDataFetcher): Fetcher used for the API call
+            league_id (int): Internal league ID
+            season (int): Season year
+
+        Returns:
+            list[dict]: Mismatching fields per team
+        """
+        self.db_cursor.execute(
+            "SELECT api_league_id FROM leagues WHERE league_id = %s", (league_id,)
+        )
+        league_result = self.db_cursor.fetchone()
+        if not league_result:
+            logger.error(f"League with ID {league_id} not found in database")
+            return []
+
+        standings_data = fetcher.make_api_request(
+            "standings", {"league": league_result["api_league_id"], "season": season}
+        )
+
+        computed = {
+            row["team_id"]: row
+            for row in self._add_unplayed_teams(
+                self.compute(self.load_fixtures([(league_id, season)])), [(league_id, season)]
+            )
+        }
+
+        api_rows = [
+            standing
+            for league_standings in standings_data
+            for group in league_standings.get("league", {}).get("standings", [])
+            for standing in group
+        ]
+        api_team_ids = [s.get("team", {}).get("id") for s in api_rows]
+        team_ids = {}
+        if api_team_ids:
+            self.db_cursor.execute(
+                f"SELECT api_team_id, team_id FROM teams WHERE api_team_id IN ({', '.join(['%s'] * len(api_team_ids))})",
+                tuple(api_team_ids)
+            )
+            team_ids = {row["api_team_id"]: row["team_id"] for row in self.db_cursor.fetchall()}
+
+        mismatches = []
+        for standing in api_rows:
+            team_id = team_ids.get(standing.get("team", {}).get("id"))
+            ours = computed.get(team_id)
+            if ours is None:
+                mismatches.append({"team_id": team_id, "field": "missing", "api": standing.get("rank"), "computed": None})
+                continue
+            expected = {
+                "rank": standing.get("rank"),
+                "points": standing.get("points"),
+                "played": standing.get("all", {}).get("played"),
+                "goal_diff": standing.get("goalsDiff"),
+            }
+            for field, api_value in expected.items():
+                if api_value is not None and api_value != ours[field]:
+                    mismatches.append({"team_id": team_id, "field": field, "api": api_value, "computed": ours[field]})
+
+        if mismatches:
+            logger.warning(f"Standings for league {league_id}, season {season} differ from API: {mismatches}")
+        else:
+            logger.info(f"Standings for league {league_id}, season {season} match the API")
+        return mismatches
+
+
+def main():
+    """Main function to rebuild or reconcile standings."""
+    parser = argparse.ArgumentParser(description="Compute standings from stored fixtures")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild standings for all league-seasons")
+    parser.add_argument("--league", type=int, help="League ID to recompute")
+    parser.add_argument("--season", type=int, help="Season to recompute")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="Compare the computed table for --league/--season with the API")
+    parser.add_argument("--tiebreakers", type=str, default=",".join(DEFAULT_TIEBREAKERS),
+                        help=f"Comma-separated tiebreakers from: {', '.join(TIEBREAKERS)}")
+
+    args = parser.parse_args()
+
+    fetcher = SportsDataFetcher()
+
+    try:
+        fetcher.connect_to_database()
+        engine = StandingsEngine(fetcher.db_conn, tiebreakers=args.tiebreakers.split(","))
+
+        if args.rebuild:
+            engine.rebuild()
+        elif args.league and args.season:
+            if args.reconcile:
+                engine.reconcile(fetcher, args.league, args.season)
+            else:
+                engine.recompute([(args.league, args.season)])
+        else:
+            logger.error("No action specified. Use --rebuild or specify a league and season.")
+    except (APIRequestError, DatabaseError, ValueError) as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+    finally:
+        fetcher.close_database_connection()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Storage Backends
+
+This module lets the fetchers run against either MySQL (the default) or an
+embedded SQLite database created from the same database_schema.sql. The
+embedded backend needs no server, so ingest can run in-process for tests and
+benchmarks, and a snapshot of the MySQL database can be copied to a local file
+for analytical queries (the file can also be opened with DuckDB's sqlite
+extension).
+
+Both backends return connections with the mysql.connector interface used
+throughout the fetchers: cursor(dictionary=True), %s placeholders, lastrowid,
+commit/rollback, and mysql.connector.Error on failure. SQL written for MySQL
+is translated on the fly for SQLite (placeholders, INSERT IGNORE, ON
+DUPLICATE KEY UPDATE, FOR UPDATE) and the MySQL functions the fetchers use
+(NOW, UTC_TIMESTAMP, UNIX_TIMESTAMP, GREATEST, LEAST) are registered.
+
+Select the backend with DB_BACKEND=mysql|sqlite and SQLITE_PATH in .env.
+"""
+
+import os
+import re
+import sys
+import sqlite3
+import logging
+import argparse
+import mysql.connector
+from decimal import Decimal
+from datetime import date, datetime, timezone
+from dotenv import load_dotenv
+
+logger = logging.getLogger("storage")
+
+# Load environment variables
+load_dotenv()
+
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "sports_data.db")
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "database_schema.sql")
+
+SNAPSHOT_BATCH_SIZE = 5000
+
+
+def _parse_datetime(value):
+    text = value.decode()
+    try:
+        value = datetime.fromisoformat(text)
+    except ValueError:
+        return text
+    # MySQL DATETIME has no zone; API timestamps with an offset come back as naive UTC
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter("DATETIME", _parse_datetime)
+sqlite3.register_converter("TIMESTAMP", _parse_datetime)
+
+
+def _split_top_level(body):
+    """Split a column list on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(char)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def mysql_schema_to_sqlite(schema):
+    """Translate the CREATE statements of database_schema.sql to SQLite.
+
+    Returns:
+        list: SQLite statements
+    """
+    schema = re.sub(r"--[^\n]*", "", schema)
+    statements = []
+
+    for statement in schema.split(";"):
+        statement = statement.strip()
+        if not statement:
+            continue
+
+        match = re.match(r"CREATE TABLE (\w+)\s*\((.*)\)\s*$", statement, re.S | re.I)
+        if not match:
+            statements.append(statement)
+            continue
+
+        table, body = match.groups()
+        columns, constraints, indexes = [], [], []
+        for part in _split_top_level(body):
+            part = " ".join(part.split())
+            upper = part.upper()
+            if upper.startswith(("INDEX ", "KEY ")):
+                name, index_columns = re.match(r"(?:INDEX|KEY)\s+(\w+)\s*(\(.*\))", part, re.I).groups()
+                indexes.append(f"CREATE INDEX {name} ON {table} {index_columns}")
+            elif upper.startswith("UNIQUE KEY"):
+                constraints.append("UNIQUE " + part[part.index("("):])
+            elif upper.startswith(("PRIMARY KEY", "FOREIGN KEY", "UNIQUE", "CONSTRAINT")):
+                constraints.append(part)
+            else:
+                part = re.sub(r"\s+ON UPDATE CURRENT_TIMESTAMP", "", part, flags=re.I)
+                if "AUTO_INCREMENT" in upper:
+                    part = re.sub(r"^(\w+)\s+\w+\s+PRIMARY KEY AUTO_INCREMENT",
+                                  r"\1 INTEGER PRIMARY KEY AUTOINCREMENT", part, flags=re.I)
+                columns.append(part)
+
+        # SQLite requires column definitions before table constraints
+        statements.append(f"CREATE TABLE {table} (\n    " + ",\n    ".join(columns + constraints) + "\n)")
+        statements.extend(indexes)
+
+    return statements
+
+
+def mysql_sql_to_sqlite(sql):
+    """Translate a MySQL statement written for mysql.connector to SQLite."""
+    sql = re.sub(r"%([%s])", lambda m: "%" if m.group(1) == "%" else "?", sql)
+    sql = re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", sql, flags=re.I)
+    sql = re.sub(r"\s+FOR\s+UPDATE\b", "", sql, flags=re.I)
+
+    match = re.search(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", sql, re.I)
+    if match:
+        update = re.sub(r"\bVALUES\(\s*`?(\w+)`?\s*\)", r"excluded.\1", sql[match.end():], flags=re.I)
+        sql = sql[:match.start()] + "ON CONFLICT DO UPDATE SET" + update
+    return sql
+
+
+def _translate_error(err):
+    """Map an sqlite3 error to the mysql.connector error the fetchers catch."""
+    if isinstance(err, sqlite3.IntegrityError):
+        return mysql.connector.IntegrityError(msg=str(err))
+    if isinstance(err, sqlite3.OperationalError):
+        return mysql.connector.OperationalError(msg=str(err))
+    return mysql.connector.DatabaseError(msg=str(err))
+
+
+class SQLiteCursor:
+    """Cursor over an SQLite connection with the mysql.connector interface."""
+
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip(self.column_names, row))
+
+    def execute(self, sql, params=()):
+        try:
+            self._cursor.execute(mysql_sql_to_sqlite(sql), tuple(params or ()))
+        except sqlite3.Error as err:
+            raise _translate_error(err) from err
+
+    def executemany(self, sql, seq_params):
+        try:
+            self._cursor.executemany(mysql_sql_to_sqlite(sql), [tuple(params) for params in seq_params])
+        except sqlite3.Error as err:
+            raise _translate_error(err) from err
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """SQLite connection with the subset of the mysql.connector interface the fetchers use."""
+
+    def __init__(self, path):
+        # Like a mysql.connector connection it may be handed between threads
+        # (e.g. resident_worker.py), as long as only one uses it at a time
+        self._conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES,
+                                     uri=path.startswith("file:"), check_same_thread=False)
+        self._conn.create_function("NOW", 0, lambda: datetime.now().isoformat(" ", "seconds"))
+        self._conn.create_function(
+            "UTC_TIMESTAMP", 0,
+            lambda: datetime.now(timezone.utc).replace(tzinfo=None).isoformat(" ", "seconds")
+        )
+        self._conn.create_function("UNIX_TIMESTAMP", 1, self._unix_timestamp)
+        self._conn.create_function("GREATEST", -1, lambda *values: max(values))
+        self._conn.create_function("LEAST", -1, lambda *values: min(values))
+
+    @staticmethod
+    def _unix_timestamp(value):
+        if value is None:
+            return None
+        return int(datetime.fromisoformat(str(value)).timestamp())
+
+    def cursor(self, dictionary=False, **kwargs):
+        return SQLiteCursor(self._conn, dictionary)
+
+    def execute_script(self, sql):
+        """Run SQLite statements without MySQL translation (schema setup)."""
+        self._conn.executescript(sql)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._conn.close()
+
+
+class MySQLBackend:
+    """Storage backend for a MySQL server."""
+
+    name = "mysql"
+
+    def __init__(self, config):
+        """Initialize the backend.
+
+        Args:
+            config (dict): mysql.connector connection arguments (DB_CONFIG)
+        """
+        self.config = config
+
+    def connect(self, **kwargs):
+        """Open a new connection."""
+        return mysql.connector.connect(**self.config, **kwargs)
+
+
+class SQLiteBackend:
+    """Embedded storage backend using SQLite with the same schema."""
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_PATH, schema_file=SCHEMA_FILE):
+        """Initialize the backend.
+
+        Args:
+            path (str): Database file, or ":memory:" for an in-process database
+            schema_file (str): MySQL schema to create the tables from
+        """
+        self.path = path
+        self.schema_file = schema_file
+        self._keeper = None
+        if path == ":memory:":
+            # A named shared-cache database lets every connection of this
+            # backend see the same data; it lives while the keeper is open
+            self.path = f"file:sports_data_{id(self)}?mode=memory&cache=shared"
+            self._keeper = self.connect()
+
+    def create_schema(self, conn):
+        """Create the tables if the database is empty."""
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'countries'")
+        exists = cursor.fetchone()[0]
+        cursor.close()
+        if exists:
+            return
+
+        with open(self.schema_file, "r") as f:
+            statements = mysql_schema_to_sqlite(f.read())
+        for statement in statements:
+            conn.execute_script(statement)
+        conn.commit()
+
+    def connect(self, **kwargs):
+        """Open a connection, creating the schema on first use."""
+        conn = SQLiteConnection(self.path)
+        self.create_schema(conn)
+        return conn
+
+
+def get_backend(mysql_config, backend=DB_BACKEND):
+    """Return the configured storage backend.
+
+    Args:
+        mysql_config (dict): Connection arguments for the MySQL backend
+        backend (str): "mysql" or "sqlite" (default: DB_BACKEND)
+    """
+    if backend == "mysql":
+        return MySQLBackend(mysql_config)
+    if backend == "sqlite":
+        return SQLiteBackend()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def snapshot(mysql_config, path, tables=None):
+    """Copy tables from MySQL into an SQLite file for local analysis.
+
+    Args:
+        mysql_config (dict): Connection arguments for the MySQL source
+        path (str): SQLite file to create (must not exist)
+        tables (list, optional): Tables to copy (default: every table in the schema)
+    """
+    if os.path.exists(path):
+        raise ValueError(f"{path} already exists")
+
+    target = SQLiteBackend(path).connect()
+    source = mysql.connector.connect(**mysql_config)
+    try:
+        if tables is None:
+            listing = target.cursor()
+            listing.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%%'")
+            tables = [row[0] for row in listing.fetchall()]
+
+        for table in tables:
+            reader = source.cursor()
+            reader.execute(f"SELECT * FROM `{table}`")
+            columns = ", ".join(reader.column_names)
+            placeholders = ", ".join(["%s"] * len(reader.column_names))
+            writer = target.cursor()
+
+            count = 0
+            while True:
+                rows = reader.fetchmany(SNAPSHOT_BATCH_SIZE)
+                if not rows:
+                    break
+                writer.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows)
+                count += len(rows)
+            target.commit()
+            reader.close()
+            logger.info(f"Copied {count} rows from {table}")
+    finally:
+        source.close()
+        target.close()
+
+
+def main():
+    """Main function to snapshot the MySQL database into an SQLite file."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Copy the MySQL database into an embedded SQLite file")
+    parser.add_argument("--snapshot", type=str, required=True, metavar="PATH",
+                        help="SQLite file to create")
+    parser.add_argument("--tables", type=str, nargs="+", help="Tables to copy (default: all)")
+
+    args = parser.parse_args()
+
+    # Imported here because sports_data_fetcher imports this module
+    from sports_data_fetcher import DB_CONFIG
+
+    try:
+        snapshot(DB_CONFIG, args.snapshot, args.tables)
+    except (mysql.connector.Error, ValueError) as err:
+        logger.error(f"Error creating snapshot: {err}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Team Form and Head-to-Head Materializations
+
+This module maintains the team_form and head_to_head tables so team and
+fixture pages can read recent form and head-to-head history with a single
+primary-key lookup. The ingest path applies each newly finished fixture
+incrementally; a nightly rebuild recomputes both tables from the fixtures
+table and reports any rows that had drifted.
+"""
+
+import sys
+import logging
+import argparse
+import mysql.connector
+from sports_data_fetcher import SportsDataFetcher, FINISHED_STATUSES, DatabaseError
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler("team_form.log"),
+        logging.StreamHandler(sys.stdout)
+    ]
+)
+logger = logging.getLogger("team_form")
+
+# Number of recent results kept per team and per head-to-head pair
+FORM_LENGTH = 10
+
+
+def _result(goals_for, goals_against):
+    if goals_for > goals_against:
+        return "W"
+    if goals_for < goals_against:
+        return "L"
+    return "D"
+
+
+def _split_ids(value):
+    return [int(fixture_id) for fixture_id in value.split(",")] if value else []
+
+
+class FormState:
+    """Recent results for one team, most recent last."""
+
+    __slots__ = ("form", "fixture_ids", "last_fixture_date")
+
+    def __init__(self, form="", fixture_ids=None, last_fixture_date=None):
+        self.form = form
+        self.fixture_ids = fixture_ids or []
+        self.last_fixture_date = last_fixture_date
+
+    def apply(self, fixture_id, result, fixture_date):
+        self.form = (self.form + result)[-FORM_LENGTH:]
+        self.fixture_ids = (self.fixture_ids + [fixture_id])[-FORM_LENGTH:]
+        self.last_fixture_date = fixture_date
+
+    def row(self, team_id):
+        return (
+            team_id, self.form, ",".join(map(str, self.fixture_ids)),
+            self.form.count("W"), self.form.count("D"), self.form.count("L"),
+            self.last_fixture_date,
+        )
+
+
+class HeadToHeadState:
+    """All-time record between two teams; team_a is the lower team_id."""
+
+    __slots__ = ("played", "team_a_wins", "team_b_wins", "draws", "team_a_goals",
+                 "team_b_goals", "fixture_ids", "last_fixture_date")
+
+    def __init__(self, played=0, team_a_wins=0, team_b_wins=0, draws=0, team_a_goals=0,
+                 team_b_goals=0, fixture_ids=None, last_fixture_date=None):
+        self.played = played
+        self.team_a_wins = team_a_wins
+        self.team_b_wins = team_b_wins
+        self.draws = draws
+        self.team_a_goals = team_a_goals
+        self.team_b_goals = team_b_goals
+        self.fixture_ids = fixture_ids or []
+        self.last_fixture_date = last_fixture_date
+
+    def apply(self, fixture_id, team_a_goals, team_b_goals, fixture_date):
+        self.played += 1
+        self.team_a_goals += team_a_goals
+        self.team_b_goals += team_b_goals
+        if team_a_goals > team_b_goals:
+            self.team_a_wins += 1
+        elif team_a_goals < team_b_goals:
+            self.team_b_wins += 1
+        else:
+            self.draws += 1
+        self.fixture_ids = (self.fixture_ids + [fixture_id])[-FORM_LENGTH:]
+        self.last_fixture_date = fixture_date
+
+    def row(self, pair):
+        return (
+            pair[0], pair[1], self.played, self.team_a_wins, self.team_b_wins, self.draws,
+            self.team_a_goals, self.team_b_goals, ",".join(map(str, self.fixture_ids)),
+            self.last_fixture_date,
+        )
+
+
+class FormHeadToHeadMaterializer:
+    """Maintains the team_form and head_to_head tables."""
+
+    FIXTURE_COLUMNS = "fixture_id, home_team_id, away_team_id, home_score, away_score, fixture_date"
+
+    def __init__(self, db_conn):
+        """Initialize the materializer.
+
+        Args:
+            db_conn: Open database connection
+        """
+        self.db_conn = db_conn
+        self.db_cursor = db_conn.cursor(dictionary=True)
+
+    @staticmethod
+    def _finished_filter():
+        return (
+            f"status IN ({', '.join(['%s'] * len(FINISHED_STATUSES))}) "
+            "AND home_score IS NOT NULL AND away_score IS NOT NULL"
+        )
+
+    @staticmethod
+    def _pair(home_team_id, away_team_id):
+        return (min(home_team_id, away_team_id), max(home_team_id, away_team_id))
+
+    @staticmethod
+    def _sort_key(fixture):
+        return (fixture["fixture_date"] is None, fixture["fixture_date"], fixture["fixture_id"])
+
+    def _compute(self, fixtures, teams=None, pairs=None):
+        """Build form and head-to-head state from fixtures in date order.
+
+        Args:
+            fixtures (list[dict]): Finished fixtures
+            teams (set, optional): Only build form for these teams
+            pairs (set, optional): Only build head-to-head for these pairs
+        """
+        forms = {}
+        h2h = {}
+        for fixture in sorted(fixtures, key=self._sort_key):
+            home, away = fixture["home_team_id"], fixture["away_team_id"]
+            home_goals, away_goals = fixture["home_score"], fixture["away_score"]
+
+            for team_id, goals_for, goals_against in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+                if teams is None or team_id in teams:
+                    forms.setdefault(team_id, FormState()).apply(
+                        fixture["fixture_id"], _result(goals_for, goals_against), fixture["fixture_date"]
+                    )
+
+            pair = self._pair(home, away)
+            if pairs is None or pair in pairs:
+                a_goals, b_goals = (home_goals, away_goals) if home == pair[0] else (away_goals, home_goals)
+                h2h.setdefault(pair, HeadToHeadState()).apply(
+                    fixture["fixture_id"], a_goals, b_goals, fixture["fixture_date"]
+                )
+        return forms, h2h
+
+    def _load_states(self, teams, pairs):
+        """Load stored form and head-to-head rows for the given keys."""
+        forms = {}
+        if teams:
+            self.db_cursor.execute(
+                f"SELECT * FROM team_form WHERE team_id IN ({', '.join(['%s'] * len(teams))})",
+                tuple(teams)
+            )
+            for row in self.db_cursor.fetchall():
+                forms[row["team_id"]] = FormState(
+                    row["form"] or "", _split_ids(row["recent_fixture_ids"]), row["last_fixture_date"]
+                )
+
+        h2h = {}
+        if pairs:
+            params = [team_id for pair in pairs for team_id in pair]
+            self.db_cursor.execute(
+                "SELECT * FROM head_to_head WHERE "
+                + " OR ".join(["(team_a_id = %s AND team_b_id = %s)"] * len(pairs)),
+                tuple(params)
+            )
+            for row in self.db_cursor.fetchall():
+                h2h[(row["team_a_id"], row["team_b_id"])] = HeadToHeadState(
+                    row["played"], row["team_a_wins"], row["team_b_wins"], row["draws"],
+                    row["team_a_goals"], row["team_b_goals"],
+                    _split_ids(row["recent_fixture_ids"]), row["last_fixture_date"]
+                )
+        return forms, h2h
+
+    def _load_team_history(self, teams):
+        """Load the last FORM_LENGTH finished fixtures of each team.
+
+        Home and away sides are queried separately so each half can use an
+        index on its team column.
+        """
+        fixtures = {}
+        for column in ("home_team_id", "away_team_id"):
+            for team_id in teams:
+                self.db_cursor.execute(
+                    f"""
+                    SELECT {self.FIXTURE_COLUMNS} FROM fixtures
+                    WHERE {column} = %s AND {self._finished_filter()}
+                    ORDER BY fixture_date DESC, fixture_id DESC
+                    LIMIT {FORM_LENGTH}
+                    """,
+                    (team_id, *FINISHED_STATUSES)
+                )
+                for row in self.db_cursor.fetchall():
+                    fixtures[row["fixture_id"]] = row
+        return list(fixtures.values())
+
+    def _load_pair_history(self, pairs):
+        """Load every finished meeting between each pair of teams."""
+        fixtures = []
+        for team_a, team_b in pairs:
+            self.db_cursor.execute(
+                f"""
+                SELECT {self.FIXTURE_COLUMNS} FROM fixtures
+                WHERE ((home_team_id = %s AND away_team_id = %s)
+                       OR (home_team_id = %s AND away_team_id = %s))
+                  AND {self._finished_filter()}
+                """,
+                (team_a, team_b, team_b, team_a, *FINISHED_STATUSES)
+            )
+            fixtures.extend(self.db_cursor.fetchall())
+        return fixtures
+
+    def _write(self, forms, h2h):
+        """Upsert form and head-to-head rows."""
+        if forms:
+            self.db_cursor.executemany(
+                """
+                INSERT INTO team_form
+                (team_id, form, recent_fixture_ids, win, draw, lose, last_fixture_date)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    form = VALUES(form), recent_fixture_ids = VALUES(recent_fixture_ids),
+                    win = VALUES(win), draw = VALUES(draw), lose = VALUES(lose),
+                    last_fixture_date = VALUES(last_fixture_date), updated_at = NOW()
+                """,
+                [state.row(team_id) for team_id, state in forms.items()]
+            )
+        if h2h:
+            self.db_cursor.executemany(
+                """
+                INSERT INTO head_to_head
+                (team_a_id, team_b_id, played, team_a_wins, team_b_wins, draws,
+                 team_a_goals, team_b_goals, recent_fixture_ids, last_fixture_date)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    played = VALUES(played), team_a_wins = VALUES(team_a_wins),
+                    team_b_wins = VALUES(team_b_wins), draws = VALUES(draws),
+                    team_a_goals = VALUES(team_a_goals), team_b_goals = VALUES(team_b_goals),
+                    recent_fixture_ids = VALUES(recent_fixture_ids),
+                    last_fixture_date = VALUES(last_fixture_date), updated_at = NOW()
+                """,
+                [state.row(pair) for pair, state in h2h.items()]
+            )
+
+    def apply_fixtures(self, fixture_ids):
+        """Incrementally apply newly finished fixtures.
+
+        Fixtures are applied on top of the stored rows in date order. A team
+        or pair falls back to a targeted recompute from its own fixtures if
+        the fixture was already applied (a corrected result) or is older
+        than the last applied one (an out-of-order finish or backfill).
+        """
+        fixture_ids = list(fixture_ids)
+        if not fixture_ids:
+            return
+
+        self.db_cursor.execute(
+            f"""
+            SELECT {self.FIXTURE_COLUMNS} FROM fixtures
+            WHERE fixture_id IN ({', '.join(['%s'] * len(fixture_ids))}) AND {self._finished_filter()}
+            """,
+            (*fixture_ids, *FINISHED_STATUSES)
+        )
+        fixtures = sorted(self.db_cursor.fetchall(), key=self._sort_key)
+        if not fixtures:
+            return
+
+        teams = {f["home_team_id"] for f in fixtures} | {f["away_team_id"] for f in fixtures}
+        pairs = {self._pair(f["home_team_id"], f["away_team_id"]) for f in fixtures}
+
+        try:
+            forms, h2h = self._load_states(teams, pairs)
+            stale_teams = set()
+            stale_pairs = set()
+
+            for fixture in fixtures:
+                fixture_id = fixture["fixture_id"]
+                fixture_date = fixture["fixture_date"]
+                home, away = fixture["home_team_id"], fixture["away_team_id"]
+                home_goals, away_goals = fixture["home_score"], fixture["away_score"]
+
+                for team_id, goals_for, goals_against in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+                    if team_id in stale_teams:
+                        continue
+                    state = forms.setdefault(team_id, FormState())
+                    if fixture_id in state.fixture_ids or (
+                        state.last_fixture_date and fixture_date and fixture_date < state.last_fixture_date
+                    ):
+                        stale_teams.add(team_id)
+                        continue
+                    state.apply(fixture_id, _result(goals_for, goals_against), fixture_date)
+
+                pair = self._pair(home, away)
+                if pair in stale_pairs:
+                    continue
+                state = h2h.setdefault(pair, HeadToHeadState())
+                if fixture_id in state.fixture_ids or (
+                    state.last_fixture_date and fixture_date and fixture_date < state.last_fixture_date
+                ):
+                    stale_pairs.add(pair)
+                    continue
+                a_goals, b_goals = (home_goals, away_goals) if home == pair[0] else (away_goals, home_goals)
+                state.apply(fixture_id, a_goals, b_goals, fixture_date)
+
+            if stale_teams or stale_pairs:
+                recomputed_forms, _ = self._compute(self._load_team_history(stale_teams), teams=stale_teams)
+                _, recomputed_h2h = self._compute(self._load_pair_history(stale_pairs), pairs=stale_pairs)
+                forms.update(recomputed_forms)
+                h2h.update(recomputed_h2h)
+
+            self._write(forms, h2h)
+            self.db_conn.commit()
+        except mysql.connector.Error as err:
+            logger.error(f"Error updating form and head-to-head: {err}")
+            self.db_conn.rollback()
+            raise DatabaseError(f"Failed to update form and head-to-head: {err}")
+
+        logger.info(f"Applied {len(fixtures)} finished fixtures to form and head-to-head")
+
+    def rebuild(self, verify=True):
+        """Recompute both tables from all finished fixtures.
+
+        Args:
+            verify (bool): Compare the stored rows against the recomputed ones
+                and log how many had drifted before overwriting them
+
+        Returns:
+            dict: Number of drifted team_form and head_to_head rows
+        """
+        self.db_cursor.execute(
+            f"SELECT {self.FIXTURE_COLUMNS} FROM fixtures WHERE {self._finished_filter()}",
+            FINISHED_STATUSES
+        )
+        forms, h2h = self._compute(self.db_cursor.fetchall())
+
+        drift = {"team_form": 0, "head_to_head": 0}
+        if verify:
+            self.db_cursor.execute("SELECT * FROM team_form")
+            stored_forms = {
+                row["team_id"]: (row["team_id"], row["form"], row["recent_fixture_ids"], row["win"],
+                                 row["draw"], row["lose"], row["last_fixture_date"])
+                for row in self.db_cursor.fetchall()
+            }
+            self.db_cursor.execute("SELECT * FROM head_to_head")
+            stored_h2h = {
+                (row["team_a_id"], row["team_b_id"]): (
+                    row["team_a_id"], row["team_b_id"], row["played"], row["team_a_wins"],
+                    row["team_b_wins"], row["draws"], row["team_a_goals"], row["team_b_goals"],
+                    row["recent_fixture_ids"], row["last_fixture_date"])
+                for row in self.db_cursor.fetchall()
+            }
+            drift["team_form"] = (
+                sum(1 for team_id, state in forms.items() if stored_forms.get(team_id) != state.row(team_id))
+                + len(stored_forms.keys() - forms.keys())
+            )
+            drift["head_to_head"] = (
+                sum(1 for pair, state in h2h.items() if stored_h2h.get(pair) != state.row(pair))
+                + len(stored_h2h.keys() - h2h.keys())
+            )
+            if drift["team_form"] or drift["head_to_head"]:
+                logger.warning(
+                    f"Rebuild found drifted rows: {drift['team_form']} team_form, "
+                    f"{drift['head_to_head']} head_to_head"
+                )
+
+        try:
+            self.db_cursor.execute("DELETE FROM team_form")
+            self.db_cursor.execute("DELETE FROM head_to_head")
+            form_items = list(forms.items())
+            for start in range(0, len(form_items), 1000):
+                self._write(dict(form_items[start:start + 1000]), {})
+            h2h_items = list(h2h.items())
+            for start in range(0, len(h2h_items), 1000):
+                self._write({}, dict(h2h_items[start:start + 1000]))
+            self.db_conn.commit()
+        except mysql.connector.Error as err:
+            logger.error(f"Error rebuilding form and head-to-head: {err}")
+            self.db_conn.rollback()
+            raise DatabaseError(f"Failed to rebuild form and head-to-head: {err}")
+
+        logger.info(f"Rebuilt form for {len(forms)} teams and head-to-head for {len(h2h)} pairs")
+        return drift
+
+
+def main():
+    """Main function to rebuild the form and head-to-head tables."""
+    parser = argparse.ArgumentParser(description="Maintain team form and head-to-head tables")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recompute both tables from all finished fixtures (run nightly)")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="Skip comparing stored rows with the recomputed ones")
+
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        logger.error("No action specified. Use --rebuild.")
+        sys.exit(1)
+
+    fetcher = SportsDataFetcher()
+
+    try:
+        fetcher.connect_to_database()
+        FormHeadToHeadMaterializer(fetcher.db_conn).rebuild(verify=not args.no_verify)
+    except DatabaseError as err:
+        logger.error(f"Error in main function: {err}")
+        sys.exit(1)
+    finally:
+        fetcher.close_database_connection()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Live Tennis Score Engine
+
+TennisAPI.get_live_summaries returns the full nested summary of every live
+match on each call. TennisLiveEngine keeps a compact score per match (sets,
+games per set, points, server, tiebreak and status), applies each new
+summary as a delta against it and returns only the transitions:
+
+- "game": a game was won; "break" is set when the receiver won it
+- "tiebreak": a tiebreak started
+- "set": a set was won
+- "match_end": the match finished
+- "point": the point score changed (only when points=True)
+
+A summary whose score hasn't changed since the last one costs one tuple
+comparison. Matches that drop out of the live summaries are forgotten.
+
+Run it directly to follow the live matches and log their transitions:
+
+    python tennis_live.py --interval 10
+"""
+
+import time
+import logging
+import argparse
+import requests
+from json_extract import compile_extractor
+
+logger = logging.getLogger("tennis_live")
+
+POLL_INTERVAL = 10
+SIDES = ("home", "away")
+ENDED_STATUSES = ("closed", "ended")
+
+# Live summary item -> status fields; period_scores is a list and read separately
+STATUS_PATHS = (
+    "sport_event.id",
+    "sport_event_status.status",
+    "sport_event_status.home_score",
+    "sport_event_status.away_score",
+    "sport_event_status.game_state.home_score",
+    "sport_event_status.game_state.away_score",
+    "sport_event_status.game_state.serving",
+    "sport_event_status.game_state.tie_break",
+    "sport_event_status.winner_id",
+)
+(STATUS_MATCH, STATUS_STATUS, STATUS_HOME_SETS, STATUS_AWAY_SETS, STATUS_HOME_POINTS,
+ STATUS_AWAY_POINTS, STATUS_SERVER, STATUS_TIE_BREAK, STATUS_WINNER) = range(len(STATUS_PATHS))
+extract_status = compile_extractor(STATUS_PATHS)
+
+
+class TennisScore:
+    """Compact score of one match."""
+
+    __slots__ = ("key", "status", "sets", "games", "points", "server", "tie_break", "winner_id")
+
+    def __init__(self, row, games):
+        self.status = row[STATUS_STATUS]
+        self.sets = (row[STATUS_HOME_SETS] or 0, row[STATUS_AWAY_SETS] or 0)
+        self.games = games  # ((home, away), ...) per set played
+        self.points = (row[STATUS_HOME_POINTS], row[STATUS_AWAY_POINTS])
+        self.server = row[STATUS_SERVER]
+        self.tie_break = bool(row[STATUS_TIE_BREAK])
+        self.winner_id = row[STATUS_WINNER]
+        self.key = (self.status, self.sets, games, self.points, self.server, self.tie_break, self.winner_id)
+
+    def __str__(self):
+        """Scoreboard such as "6-4 3-2 30-15"."""
+        parts = [f"{home}-{away}" for home, away in self.games]
+        if self.points[0] is not None and self.status not in ENDED_STATUSES:
+            parts.append(f"{self.points[0]}-{self.points[1]}")
+        return " ".join(parts)
+
+
+def _set_games(summary):
+    """Games per set from a summary's period_scores, in set order."""
+    periods = (summary.get("sport_event_status") or {}).get("period_scores") or ()
+    return tuple(
+        (period.get("home_score") or 0, period.get("away_score") or 0)
+        for period in sorted(periods, key=lambda period: period.get("number") or 0)
+    )
+
+
+class TennisLiveEngine:
+    """Class to turn live tennis summaries into score transitions."""
+
+    def __init__(self, points=False):
+        """Initialize the engine.
+
+        Args:
+            points (bool): Also emit a "point" transition for every point score change
+        """
+        self.points = points
+        self.scores = {}  # sport event ID -> TennisScore
+
+    def apply_summary(self, summary):
+        """Apply one live summary and return its transitions.
+
+        The first summary of a match only records its score.
+
+        Args:
+            summary (dict): Item of a TennisAPI.get_live_summaries() result
+
+        Returns:
+            list: Transition dicts with match_id, type, side and score
+        """
+        row = extract_status(summary)
+        match_id = row[STATUS_MATCH]
+        if match_id is None:
+            return []
+
+        score = TennisScore(row, _set_games(summary))
+        previous = self.scores.get(match_id)
+        self.scores[match_id] = score
+        if previous is None or previous.key == score.key:
+            return []
+        return self._transitions(match_id, previous, score)
+
+    def _transitions(self, match_id, previous, score):
+        transitions = []
+
+        def emit(kind, side=None, **fields):
+            transitions.append({"match_id": match_id, "type": kind, "side": side, "score": str(score), **fields})
+
+        if score.games != previous.games:
+            # Games finished since the last summary, per set and side
+            won = []
+            for number, games in enumerate(score.games, 1):
+                before = previous.games[number - 1] if number <= len(previous.games) else (0, 0)
+                for side in range(2):
+                    won.extend([(number, SIDES[side])] * max(games[side] - before[side], 0))
+            for number, side in won:
+                # Who served is only known when exactly one game went by,
+                # and a tiebreak is never a break of serve
+                broke = None
+                if len(won) == 1 and not previous.tie_break and previous.server in SIDES:
+                    broke = previous.server != side
+                emit("game", side, set_number=number, **{"break": broke})
+
+        if score.tie_break and not previous.tie_break:
+            emit("tiebreak", set_number=len(score.games))
+
+        number = sum(previous.sets)
+        for side in range(2):
+            for _ in range(max(score.sets[side] - previous.sets[side], 0)):
+                number += 1
+                emit("set", SIDES[side], set_number=number)
+
+        if score.status in ENDED_STATUSES and previous.status not in ENDED_STATUSES:
+            # Level sets mean a retirement or walkover; winner_id still names the winner
+            side = None
+            if score.sets[0] != score.sets[1]:
+                side = SIDES[0] if score.sets[0] > score.sets[1] else SIDES[1]
+            emit("match_end", side, winner_id=score.winner_id, status=score.status)
+        elif self.points and score.points != previous.points and score.games == previous.games:
+            emit("point", server=score.server)
+
+        return transitions
+
+    def apply(self, live_summaries):
+        """Apply a TennisAPI.get_live_summaries() result.
+
+        Returns:
+            list: Transitions of all matches, in summary order
+        """
+        summaries = live_summaries.get("summaries") or []
+        transitions = []
+        live = set()
+        for summary in summaries:
+            transitions.extend(self.apply_summary(summary))
+            live.add((summary.get("sport_event") or {}).get("id"))
+
+        for match_id in [match_id for match_id in self.scores if match_id not in live]:
+            del self.scores[match_id]
+        return transitions
+
+    def score(self, match_id):
+        """Return the compact score of a live match, None if it isn't followed."""
+        return self.scores.get(match_id)
+
+
+def main():
+    """Main function to follow the live tennis matches."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Log the score transitions of live tennis matches")
+    parser.add_argument("--interval", type=int, default=POLL_INTERVAL,
+                        help=f"Seconds between polls (default: {POLL_INTERVAL})")
+    parser.add_argument("--points", action="store_true", help="Also log every point")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+
+    args = parser.parse_args()
+
+    from sportradar_data_fetcher import TennisAPI, close_shared_session
+
+    api = TennisAPI()
+    engine = TennisLiveEngine(points=args.points)
+    try:
+        while True:
+            try:
+                for transition in engine.apply(api.get_live_summaries()):
+                    logger.info(
+                        f"{transition['match_id']}: {transition['type']} {transition['side'] or ''} "
+                        f"({transition['score']})"
+                    )
+            except requests.exceptions.RequestException as err:
+                logger.error(f"Error fetching live summaries: {err}")
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+    finally:
+        close_shared_session()
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,8 @@ from typing import Dict, List, Any, Optional, Union
 # Import both API clients
 from sports_data_fetcher import APISportsClient
 from sportradar_data_fetcher import TennisAPI, CricketAPI
+from http_resilience import CircuitOpenError
+from tennis_live import TennisLiveEngine
 
 # Configure logging
 logging.basicConfig(
@@ -34,6 +36,7 @@ class UnifiedSportsDataFetcher:
         self.api_sports_client = None
         self.tennis_api = None
         self.cricket_api = None
+        self.tennis_live_engine = TennisLiveEngine()
         
         # Load configuration and initialize API clients
         self._load_config()
@@ -232,6 +235,24 @@ class UnifiedSportsDataFetcher:
             logger.error(f"Error fetching tennis live summaries: {str(e)}")
             return {}
     
+    def get_tennis_live_transitions(self) -> List[Dict[str, Any]]:
+        """
+        Get the tennis score transitions since the previous call: games won,
+        breaks of serve, tiebreaks, sets won and match ends
+        
+        Returns:
+            List[Dict[str, Any]]: Transitions of all live matches
+        """
+        if not self.tennis_api:
+            logger.error("Tennis API client not initialized")
+            return []
+        
+        try:
+            return self.tennis_live_engine.apply(self.tennis_api.get_live_summaries())
+        except Exception as e:
+            logger.error(f"Error fetching tennis live transitions: {str(e)}")
+            return []
+    
     def get_tennis_competitor_profile(self, competitor_id: str) -> Dict[str, Any]:
         """
         Get tennis competitor profile from SportRadar
@@ -252,6 +273,32 @@ class UnifiedSportsDataFetcher:
             logger.error(f"Error fetching tennis competitor profile: {str(e)}")
             return {}
     
+    def prewarm_tennis_competitor_profiles(self, date: Optional[str] = None) -> int:
+        """
+        Cache the profiles of every tennis competitor playing on a day, so
+        get_tennis_competitor_profile doesn't wait on SportRadar while a
+        draw is rendered
+        
+        Args:
+            date (str, optional): Date in YYYY-MM-DD format
+            
+        Returns:
+            int: Number of profiles fetched
+        """
+        if not self.tennis_api:
+            logger.error("Tennis API client not initialized")
+            return 0
+        
+        try:
+            fetched, _ = self.tennis_api.prewarm_competitor_profiles(date)
+            return fetched
+        except CircuitOpenError as e:
+            logger.warning(f"Skipping tennis profile pre-warm: {str(e)}")
+            return 0
+        except Exception as e:
+            logger.error(f"Error pre-warming tennis competitor profiles: {str(e)}")
+            return 0
+    
     # Cricket API methods
     
     def get_cricket_daily_live_schedule(self, date: Optional[str] = None) -> Dict[str, Any]:
@@ -353,6 +400,8 @@ class UnifiedSportsDataFetcher:
                 tennis_live = self.tennis_api.get_live_summaries()
                 if 'summaries' in tennis_live:
                     result['tennis'] = tennis_live['summaries']
+            except CircuitOpenError as e:
+                logger.warning(f"Skipping tennis live matches: {str(e)}")
             except Exception as e:
                 logger.error(f"Error fetching tennis live matches: {str(e)}")
         
@@ -362,6 +411,8 @@ class UnifiedSportsDataFetcher:
                 cricket_live = self.cricket_api.get_daily_live_schedule()
                 if 'sport_events' in cricket_live:
                     result['cricket'] = cricket_live['sport_events']
+            except CircuitOpenError as e:
+                logger.warning(f"Skipping cricket live matches: {str(e)}")
             except Exception as e:
                 logger.error(f"Error fetching cricket live matches: {str(e)}")
         
@@ -410,6 +461,8 @@ class UnifiedSportsDataFetcher:
                     tennis_daily = self.tennis_api.get_daily_summaries(date=date)
                     if 'summaries' in tennis_daily:
                         result['tennis'].extend(tennis_daily['summaries'])
+            except CircuitOpenError as e:
+                logger.warning(f"Skipping tennis upcoming matches: {str(e)}")
             except Exception as e:
                 logger.error(f"Error fetching tennis upcoming matches: {str(e)}")
         
@@ -420,6 +473,8 @@ class UnifiedSportsDataFetcher:
                     cricket_daily = self.cricket_api.get_daily_live_schedule(date=date)
                     if 'sport_events' in cricket_daily:
                         result['cricket'].extend(cricket_daily['sport_events'])
+            except CircuitOpenError as e:
+                logger.warning(f"Skipping cricket upcoming matches: {str(e)}")
             except Exception as e:
                 logger.error(f"Error fetching cricket upcoming matches: {str(e)}")
         
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Sports Data Fetcher - Resident Worker Client
+
+Sends one command to resident_worker.py and prints its reply. It only
+imports the standard library socket module, so it can be started with
+python3 -S for the shortest start-up time:
+
+    python3 -S worker_client.py live
+    python3 -S worker_client.py league 1 2023
+    python3 -S worker_client.py full
+    python3 -S worker_client.py search man u
+
+Exits with 0 on "ok", 2 if the worker was busy and 1 on any error. The
+socket path is taken from WORKER_SOCKET (default /tmp/sports_data_worker.sock).
+"""
+
+import os
+import sys
+import socket
+
+WORKER_SOCKET = os.environ.get("WORKER_SOCKET", "/tmp/sports_data_worker.sock")
+EXIT_CODES = {"ok": 0, "busy": 2}
+
+
+def send_command(command, socket_path=WORKER_SOCKET, timeout=None):
+    """Send a command line to the worker and return its reply line."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(socket_path)
+        client.sendall((command + "\n").encode())
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = client.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+        return reply.decode("utf-8", "replace").strip()
+    finally:
+        client.close()
+
+
+def main():
+    """Main function to send a command."""
+    if len(sys.argv) < 2:
+        sys.stderr.write("usage: worker_client.py live | league ID SEASON | full [SEASON] | search QUERY | ping | shutdown\n")
+        sys.exit(1)
+
+    try:
+        reply = send_command(" ".join(sys.argv[1:]))
+    except OSError as err:
+        sys.stderr.write(f"Cannot reach resident worker on {WORKER_SOCKET}: {err}\n")
+        sys.exit(1)
+
+    print(reply)
+    sys.exit(EXIT_CODES.get(reply.split(" ", 1)[0], 1))
+
+if __name__ == "__main__":
+    main()